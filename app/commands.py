@@ -0,0 +1,210 @@
+import json
+import time
+import click
+from flask.cli import AppGroup
+from sqlalchemy import select, update, type_coerce, LargeBinary, tuple_
+from app.extensions import db
+from app.models.compressed import is_compressed
+from app.models.temp import Resume, UserSite
+from app.utils.site_cache import encode_site
+from app.utils.site_store import get_site_store
+from app.utils.resume_bulk import export_lines, import_lines
+from app.services.password_hasher import calibrate, measure_throughput, PASSWORD_HASH_WORKERS
+
+storage_cli = AppGroup('storage', help='Maintenance of compressed column storage.')
+resumes_cli = AppGroup('resumes', help='Bulk export and import of resumes.')
+passwords_cli = AppGroup('passwords', help='Password hashing settings.')
+
+# (model, primary key columns, compressed column) for each compressed column
+COMPRESSED_COLUMNS = {
+    'resumes.parsed_resume': (Resume, (Resume.user_id, Resume.serial_number), Resume.parsed_resume),
+    'user_sites.html_content': (UserSite, (UserSite.id,), UserSite.html_content),
+}
+
+
+def build_dictionary(samples, size=32768):
+    """Raw-content preset dictionary from sample values.
+
+    Both zlib and zstd favour matches near the end of a raw dictionary, so
+    samples are appended in order of increasing frequency and the result is
+    cut to the last `size` bytes (zlib uses at most 32 KB).
+    """
+    counts = {}
+    for sample in samples:
+        counts[sample] = counts.get(sample, 0) + 1
+    ordered = sorted(counts, key=lambda sample: counts[sample])
+    return b''.join(ordered)[-size:]
+
+
+def compress_column(name, batch_size=500, pause=0.0, echo=print):
+    """Rewrite legacy uncompressed values of a column, one committed batch at a time.
+
+    Walks the table in primary key order, so it can be stopped and rerun
+    safely; rows that are already compressed are skipped. Returns the number
+    of rows rewritten.
+    """
+    model, key_columns, column = COMPRESSED_COLUMNS[name]
+    # Read the stored bytes as-is, bypassing the column's decompression
+    raw_value = type_coerce(column, LargeBinary)
+    last_key = None
+    rewritten = 0
+
+    while True:
+        query = select(*key_columns, raw_value.label('raw')).order_by(*key_columns).limit(batch_size)
+        if last_key is not None:
+            query = query.where(tuple_(*key_columns) > tuple_(*last_key))
+        rows = db.session.execute(query).all()
+        if not rows:
+            break
+
+        for row in rows:
+            if row.raw is None or is_compressed(row.raw):
+                continue
+            key = row[:len(key_columns)]
+            value = column.type.process_result_value(row.raw, db.engine.dialect)
+            db.session.execute(
+                update(model)
+                .where(*(key_column == key_value for key_column, key_value in zip(key_columns, key)))
+                .values({column.key: value})
+                .execution_options(synchronize_session=False)
+            )
+            rewritten += 1
+        db.session.commit()
+
+        last_key = rows[-1][:len(key_columns)]
+        echo(f"{name}: {rewritten} rows compressed so far")
+        if pause:
+            # Leave room for regular traffic and replication to keep up
+            time.sleep(pause)
+
+    return rewritten
+
+
+@storage_cli.command('compress')
+@click.option('--column', 'columns', multiple=True, type=click.Choice(sorted(COMPRESSED_COLUMNS)),
+              help='Column to backfill; defaults to all compressed columns.')
+@click.option('--batch-size', default=500, show_default=True)
+@click.option('--pause', default=0.0, show_default=True, help='Seconds to sleep between batches.')
+def compress_command(columns, batch_size, pause):
+    """Compress rows written before compressed storage was enabled."""
+    for name in columns or sorted(COMPRESSED_COLUMNS):
+        total = compress_column(name, batch_size=batch_size, pause=pause, echo=click.echo)
+        click.echo(f"{name}: done, {total} rows compressed")
+
+
+@storage_cli.command('build-dictionary')
+@click.argument('output', type=click.Path(dir_okay=False))
+@click.option('--samples', default=200, show_default=True, help='Rows sampled from each column.')
+@click.option('--size', default=32768, show_default=True)
+def build_dictionary_command(output, samples, size):
+    """Build a new compression dictionary from stored resumes and sites.
+
+    Save it as app/models/dictionaries/resume_v<N>.dict and bump
+    CURRENT_DICTIONARY_ID; existing dictionaries must never change.
+    """
+    values = []
+    for name, (model, key_columns, column) in COMPRESSED_COLUMNS.items():
+        for value in db.session.execute(select(column).limit(samples)).scalars():
+            if value is None:
+                continue
+            text = value if isinstance(value, str) else json.dumps(value, separators=(',', ':'))
+            values.append(text.encode('utf-8'))
+    with open(output, 'wb') as f:
+        f.write(build_dictionary(values, size=size))
+    click.echo(f"Wrote {output} from {len(values)} samples")
+
+
+@storage_cli.command('prune-sites')
+@click.option('--min-age', default=3600, show_default=True,
+              help='Only delete pages older than this many seconds.')
+def prune_sites_command(min_age):
+    """Delete pages in the site store that no site serves any more."""
+    store = get_site_store()
+    if store is None:
+        click.echo("No site store configured (SITE_STORE=database)")
+        return
+    keep = set(db.session.execute(select(UserSite.etag).where(UserSite.etag.isnot(None))).scalars())
+    deleted = store.prune(keep, min_age=min_age)
+    click.echo(f"Deleted {deleted} files, {len(keep)} pages kept")
+
+
+@storage_cli.command('restore-sites')
+@click.option('--batch-size', default=100, show_default=True)
+def restore_sites_command(batch_size):
+    """Copy pages from the site store back into user_sites rows.
+
+    Needed before downgrading below the site store migration, which makes
+    html_content required again.
+    """
+    store = get_site_store()
+    if store is None:
+        click.echo("No site store configured (SITE_STORE=database)")
+        return
+    restored = missing = 0
+    last_id = 0
+    while True:
+        rows = db.session.execute(
+            select(UserSite.id, UserSite.etag)
+            .where(UserSite.html_content.is_(None), UserSite.id > last_id)
+            .order_by(UserSite.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        for row in rows:
+            html = store.read(row.etag) if row.etag else None
+            if html is None:
+                missing += 1
+                continue
+            encoded = encode_site(html)
+            db.session.execute(
+                update(UserSite)
+                .where(UserSite.id == row.id)
+                .values(html_content=html, html_gzip=encoded['html_gzip'], html_brotli=encoded['html_brotli'])
+                .execution_options(synchronize_session=False)
+            )
+            restored += 1
+        db.session.commit()
+        last_id = rows[-1].id
+    click.echo(f"Restored {restored} pages, {missing} missing from the store")
+
+
+@resumes_cli.command('export')
+@click.argument('output', type=click.File('w'))
+@click.option('--user-id', 'user_ids', multiple=True, type=int,
+              help='Export only these users; defaults to every resume.')
+@click.option('--batch-size', default=None, type=int, help='Rows fetched per round trip.')
+def export_command(output, user_ids, batch_size):
+    """Write resumes to OUTPUT as NDJSON ('-' for stdout)."""
+    count = 0
+    for line in export_lines(user_ids=list(user_ids) or None, batch_size=batch_size):
+        output.write(line)
+        count += 1
+    click.echo(f"Exported {count} resumes", err=True)
+
+
+@resumes_cli.command('import')
+@click.argument('input', type=click.File('r'))
+@click.option('--user-id', default=None, type=int,
+              help='Import everything for this user; defaults to the user_id on each line.')
+@click.option('--batch-size', default=None, type=int, help='Rows inserted per commit.')
+def import_command(input, user_id, batch_size):
+    """Import NDJSON resumes from INPUT ('-' for stdin)."""
+    report = import_lines(user_id, input, batch_size=batch_size)
+    for error in report.errors:
+        click.echo(f"line {error['line']}: {error['error']}", err=True)
+    click.echo(f"Imported {report.imported} resumes, {report.error_count} lines failed", err=True)
+
+
+@passwords_cli.command('calibrate')
+@click.option('--algorithm', type=click.Choice(['scrypt', 'pbkdf2']), default='scrypt', show_default=True)
+@click.option('--target-ms', default=100.0, show_default=True, help='Acceptable time for one hash.')
+@click.option('--workers', default=PASSWORD_HASH_WORKERS, show_default=True,
+              help='Pool size used to measure throughput.')
+def calibrate_command(algorithm, target_ms, workers):
+    """Pick a PASSWORD_HASH_METHOD cost for a target latency on this machine."""
+    method, elapsed_ms = calibrate(algorithm, target_ms)
+    click.echo(f"PASSWORD_HASH_METHOD={method}")
+    click.echo(f"One hash: {elapsed_ms:.1f} ms")
+    for pool_size in sorted({1, workers}):
+        click.echo(f"Throughput with {pool_size} worker(s): {measure_throughput(method, pool_size):.1f} hashes/s")
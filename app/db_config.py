@@ -0,0 +1,156 @@
+import os
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+
+def _env_int(name, default):
+    return int(os.getenv(name, default))
+
+
+def get_db_settings():
+    """Connection pool and timeout settings, configurable through the environment."""
+    return {
+        'pool_size': _env_int('DB_POOL_SIZE', 5),
+        'max_overflow': _env_int('DB_MAX_OVERFLOW', 10),
+        'pool_timeout': _env_int('DB_POOL_TIMEOUT', 30),  # Seconds to wait for a free connection
+        'pool_recycle': _env_int('DB_POOL_RECYCLE', 1800),  # Seconds before a connection is replaced
+        'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', '1') == '1',
+        'connect_timeout': _env_int('DB_CONNECT_TIMEOUT', 10),
+        'statement_timeout_ms': _env_int('DB_STATEMENT_TIMEOUT_MS', 0),  # 0 disables the limit
+    }
+
+
+def _connect_args(backend, settings):
+    """Driver arguments applying connect and per-statement timeouts for each backend."""
+    timeout_ms = settings['statement_timeout_ms']
+    if backend == 'postgresql':
+        args = {'connect_timeout': settings['connect_timeout']}
+        if timeout_ms:
+            args['options'] = f"-c statement_timeout={timeout_ms}"
+        return args
+    if backend in ('mysql', 'mariadb'):
+        args = {'connect_timeout': settings['connect_timeout']}
+        if timeout_ms:
+            # MAX_EXECUTION_TIME only bounds SELECTs; read_timeout also covers writes
+            args['init_command'] = f"SET SESSION MAX_EXECUTION_TIME={timeout_ms}"
+            args['read_timeout'] = max(1, timeout_ms // 1000)
+        return args
+    return {}
+
+
+def get_engine_options(database_uri, settings=None):
+    """Build SQLALCHEMY_ENGINE_OPTIONS for a database URI."""
+    settings = settings or get_db_settings()
+    backend = make_url(database_uri).get_backend_name()
+
+    if backend == 'sqlite':
+        # SQLite uses its own single-file pools; sizing options do not apply
+        return {'pool_pre_ping': settings['pool_pre_ping']}
+
+    return {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': settings['pool_size'],
+        'max_overflow': settings['max_overflow'],
+        'pool_timeout': settings['pool_timeout'],
+        'pool_recycle': settings['pool_recycle'],
+        'pool_pre_ping': settings['pool_pre_ping'],
+        'connect_args': _connect_args(backend, settings),
+    }
+
+
+class PoolMetrics:
+    """Thread-safe counters describing how a connection pool is being used."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.connects = 0
+        self.overflow_events = 0
+        self.timeouts = 0
+        self.invalidations = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def increment(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def record_wait(self, seconds):
+        with self._lock:
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'checkouts': self.checkouts,
+                'connects': self.connects,
+                'overflow_events': self.overflow_events,
+                'timeouts': self.timeouts,
+                'invalidations': self.invalidations,
+                'wait_avg_ms': round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                'wait_max_ms': round(self.wait_max * 1000, 3),
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records checkout wait time, overflow connections and timeouts."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+        # recreate() hands its listeners to the new pool; adding ours again
+        # would count every invalidation twice after dispose()
+        if kwargs.get('_dispatch') is None:
+            event.listen(self, 'invalidate', self._on_invalidate)
+
+    def recreate(self):
+        # Keep counting across dispose()/recreate() instead of starting over
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            self.metrics.increment('timeouts')
+            raise
+        finally:
+            self.metrics.record_wait(time.perf_counter() - start)
+        self.metrics.increment('checkouts')
+        return connection
+
+    def _create_connection(self):
+        # Counted here rather than in a 'connect' listener, which recreate()
+        # would carry over bound to the disposed pool and its overflow count
+        record = super()._create_connection()
+        self.metrics.increment('connects')
+        if self.overflow() > 0:
+            self.metrics.increment('overflow_events')
+        return record
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        self.metrics.increment('invalidations')
+
+
+def pool_status(engine):
+    """Current gauges and counters for an engine's connection pool."""
+    pool = engine.pool
+    status = {'pool': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            'size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'checked_in': pool.checkedin(),
+            'overflow': max(pool.overflow(), 0),
+        })
+    metrics = getattr(pool, 'metrics', None)
+    if metrics is not None:
+        status.update(metrics.snapshot())
+    return status
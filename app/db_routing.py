@@ -0,0 +1,151 @@
+import os
+import threading
+import time
+from functools import wraps
+from flask import g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError
+
+REPLICA_BIND = 'replica'
+LAST_WRITE_COOKIE = 'db_last_write'
+LAST_WRITE_HEADER = 'X-Last-Write'
+
+# Seconds after a user's own write during which their reads stay on the primary
+READ_YOUR_WRITES_WINDOW = float(os.getenv('READ_YOUR_WRITES_SECONDS', '10'))
+# Seconds a replica health check result is trusted
+REPLICA_HEALTH_TTL = float(os.getenv('REPLICA_HEALTH_TTL', '5'))
+
+_health_lock = threading.Lock()
+_replica_health = {'healthy': True, 'checked_at': 0.0}
+
+
+def get_replica_binds(engine_options):
+    """SQLALCHEMY_BINDS entry for the read replica, if REPLICA_DATABASE_URL is set."""
+    url = os.getenv('REPLICA_DATABASE_URL')
+    if not url:
+        return {}
+    return {REPLICA_BIND: {'url': url, **engine_options}}
+
+
+def _check_replica(engine):
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        return True
+    except Exception as e:
+        print(f"Read replica unavailable, using primary: {str(e)}")
+        return False
+
+
+def replica_healthy(engine):
+    """Cached replica health; refreshed at most every REPLICA_HEALTH_TTL seconds."""
+    now = time.monotonic()
+    if now - _replica_health['checked_at'] < REPLICA_HEALTH_TTL:
+        return _replica_health['healthy']
+    with _health_lock:
+        if now - _replica_health['checked_at'] >= REPLICA_HEALTH_TTL:
+            _replica_health['healthy'] = _check_replica(engine)
+            _replica_health['checked_at'] = time.monotonic()
+    return _replica_health['healthy']
+
+
+def mark_replica_unhealthy():
+    """Route reads to the primary until the next health check."""
+    with _health_lock:
+        _replica_health['healthy'] = False
+        _replica_health['checked_at'] = time.monotonic()
+
+
+def recent_own_write():
+    """Whether the client wrote within the read-your-writes window."""
+    if not has_request_context():
+        return False
+    value = request.headers.get(LAST_WRITE_HEADER) or request.cookies.get(LAST_WRITE_COOKIE)
+    try:
+        last_write = float(value)
+    except (TypeError, ValueError):
+        return False
+    return 0 <= time.time() - last_write < READ_YOUR_WRITES_WINDOW
+
+
+def read_only(f):
+    """Serve a view's queries from the read replica when it is configured and healthy.
+
+    Falls back to the primary when the client wrote recently (read-your-writes)
+    or the replica failed its health check, and retries a query that fails on
+    the replica once on the primary.
+    """
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        g.db_read_only = not recent_own_write()
+        return f(*args, **kwargs)
+    return decorated
+
+
+class RoutingSession(Session):
+    """Session that sends reads from read_only views to the replica bind."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and self._use_replica():
+            engine = self._db.engines.get(REPLICA_BIND)
+            if engine is not None and replica_healthy(engine):
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def execute(self, *args, **kwargs):
+        return self._with_primary_fallback(super().execute, *args, **kwargs)
+
+    def scalar(self, *args, **kwargs):
+        return self._with_primary_fallback(super().scalar, *args, **kwargs)
+
+    def scalars(self, *args, **kwargs):
+        return self._with_primary_fallback(super().scalars, *args, **kwargs)
+
+    def _with_primary_fallback(self, method, *args, **kwargs):
+        """Run a query, retrying it once on the primary if the replica fails it."""
+        on_replica = self._use_replica() and REPLICA_BIND in self._db.engines
+        try:
+            return method(*args, **kwargs)
+        except DBAPIError as e:
+            if not on_replica or not _replica_health['healthy']:
+                raise
+            print(f"Read replica query failed, retrying on primary: {str(e)}")
+            mark_replica_unhealthy()
+            self.rollback()
+            return method(*args, **kwargs)
+
+    def _use_replica(self):
+        return (
+            has_request_context()
+            and g.get('db_read_only', False)
+            and not g.get('db_wrote', False)
+        )
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _record_flush(session, flush_context):
+    if has_request_context():
+        g.db_wrote = True
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _record_bulk_write(orm_execute_state):
+    # Core-style UPDATE/INSERT/DELETE through the session bypass flush
+    if has_request_context() and not orm_execute_state.is_select:
+        g.db_wrote = True
+
+
+def init_db_routing(app):
+    """Mark responses to requests that wrote, so the client's next reads hit the primary."""
+    @app.after_request
+    def set_last_write(response):
+        if g.get('db_wrote') and response.status_code < 400:
+            now = f"{time.time():.3f}"
+            response.set_cookie(
+                LAST_WRITE_COOKIE, now,
+                max_age=int(READ_YOUR_WRITES_WINDOW) + 1,
+                httponly=True, samesite='Lax'
+            )
+            response.headers[LAST_WRITE_HEADER] = now
+        return response
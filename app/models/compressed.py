@@ -0,0 +1,135 @@
+import json
+import os
+import zlib
+from functools import lru_cache
+from sqlalchemy.dialects import mysql
+from sqlalchemy.types import TypeDecorator, LargeBinary
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional; zlib is always available
+    zstandard = None
+
+# Stored values start with MAGIC, a codec byte and a dictionary id byte.
+# Anything else is a legacy uncompressed row and is read as UTF-8 text.
+MAGIC = b'\x00\xc7'
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+
+# Dictionaries are frozen once rows reference them; add a new id instead of editing one.
+# resume_v1.dict is a hand-assembled placeholder of common resume and page text; build
+# resume_v2.dict from production rows with `flask storage build-dictionary` to replace it.
+DICTIONARY_DIR = os.path.join(os.path.dirname(__file__), 'dictionaries')
+CURRENT_DICTIONARY_ID = 1
+
+# STORAGE_COMPRESSION: 'zstd', 'zlib' or 'none' (write uncompressed)
+COMPRESSION = os.getenv('STORAGE_COMPRESSION', 'zstd' if zstandard else 'zlib')
+COMPRESSION_LEVEL = int(os.getenv('STORAGE_COMPRESSION_LEVEL', '6'))
+# Values shorter than this are not worth the header and are stored as plain text
+MIN_COMPRESS_BYTES = int(os.getenv('STORAGE_COMPRESSION_MIN_BYTES', '128'))
+
+
+@lru_cache(maxsize=None)
+def load_dictionary(dictionary_id):
+    """Raw bytes of a preset compression dictionary; id 0 means no dictionary."""
+    if dictionary_id == 0:
+        return b''
+    with open(os.path.join(DICTIONARY_DIR, f"resume_v{dictionary_id}.dict"), 'rb') as f:
+        return f.read()
+
+
+@lru_cache(maxsize=None)
+def _zstd_dictionary(dictionary_id):
+    return zstandard.ZstdCompressionDict(
+        load_dictionary(dictionary_id), dict_type=zstandard.DICT_TYPE_RAWCONTENT
+    )
+
+
+def compress(data: bytes, codec=None, dictionary_id=CURRENT_DICTIONARY_ID) -> bytes:
+    """Compress bytes into the stored format, or return them unchanged when compression is off."""
+    codec = codec or COMPRESSION
+    if codec == 'none' or len(data) < MIN_COMPRESS_BYTES:
+        return data
+
+    if codec == 'zstd' and zstandard is not None:
+        compressor = zstandard.ZstdCompressor(
+            level=COMPRESSION_LEVEL, dict_data=_zstd_dictionary(dictionary_id),
+            write_content_size=True
+        )
+        return MAGIC + bytes([CODEC_ZSTD, dictionary_id]) + compressor.compress(data)
+
+    zdict = load_dictionary(dictionary_id)
+    compressor = zlib.compressobj(COMPRESSION_LEVEL, zlib.DEFLATED, -15, zdict=zdict) if zdict \
+        else zlib.compressobj(COMPRESSION_LEVEL, zlib.DEFLATED, -15)
+    return MAGIC + bytes([CODEC_ZLIB, dictionary_id]) + compressor.compress(data) + compressor.flush()
+
+
+def is_compressed(value) -> bool:
+    return isinstance(value, (bytes, bytearray, memoryview)) and bytes(value[:2]) == MAGIC
+
+
+def decompress(value) -> bytes:
+    """Inverse of compress; legacy uncompressed values are returned as bytes."""
+    if isinstance(value, str):
+        return value.encode('utf-8')
+    value = bytes(value)
+    if not is_compressed(value):
+        return value
+
+    codec, dictionary_id, body = value[2], value[3], value[4:]
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise Exception("Row is zstd-compressed but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor(dict_data=_zstd_dictionary(dictionary_id)).decompress(body)
+    if codec == CODEC_ZLIB:
+        zdict = load_dictionary(dictionary_id)
+        decompressor = zlib.decompressobj(-15, zdict=zdict) if zdict else zlib.decompressobj(-15)
+        return decompressor.decompress(body) + decompressor.flush()
+    raise Exception(f"Unknown compression codec: {codec}")
+
+
+class _CompressedBinary(TypeDecorator):
+    impl = LargeBinary
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        # A plain MySQL BLOB caps out at 64 KB
+        if dialect.name in ('mysql', 'mariadb'):
+            return dialect.type_descriptor(mysql.LONGBLOB())
+        return dialect.type_descriptor(LargeBinary())
+
+
+class CompressedText(_CompressedBinary):
+    """Text column stored compressed in a binary column.
+
+    Reads rows written before compression (plain text) transparently.
+    """
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return compress(value.encode('utf-8'))
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return decompress(value).decode('utf-8')
+
+
+class CompressedJSON(_CompressedBinary):
+    """JSON column stored compressed in a binary column.
+
+    Reads rows written before compression (plain JSON text) transparently.
+    """
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return compress(json.dumps(value, separators=(',', ':')).encode('utf-8'))
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return json.loads(decompress(value))
@@ -1,6 +1,11 @@
 from typing import Dict, Any, List
 from app.extensions import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from app.models.compressed import CompressedJSON, CompressedText
+from app.services.password_hasher import hash_password, verify_password
+from app.utils.site_cache import encode_site
+from app.utils import site_store
+from app.utils.site_store import get_site_store
+from sqlalchemy.dialects import mysql
 from flask_sqlalchemy import SQLAlchemy 
 from flask import Flask
 from datetime import datetime
@@ -19,6 +24,10 @@ class User(db.Model):
     city = db.Column(db.String(100))
     bio = db.Column(db.String(200))
     country = db.Column(db.String(100))
+    # Last serial number handed out to this user's resumes, see allocate_resume_serial
+    last_resume_serial = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # Subscription plan, selects the LLM token budget (see llm_budget.PLAN_BUDGETS)
+    plan = db.Column(db.String(20), nullable=False, default='free', server_default='free')
 
 
     resumes = db.relationship('Resume', back_populates='user', lazy='dynamic')
@@ -30,11 +39,15 @@ class User(db.Model):
     
 
     def set_password(self, password):
-        self.password = generate_password_hash(password)
+        self.password = hash_password(password)
 
 
     def check_password(self, password):
-        return check_password_hash(self.password, password)
+        """Check a password, upgrading the stored hash if the hashing parameters changed."""
+        matches, new_hash = verify_password(self.password, password)
+        if new_hash:
+            self.password = new_hash
+        return matches
     
 
 class Resume(db.Model):
@@ -43,14 +56,55 @@ class Resume(db.Model):
     user_id = db.Column(db.ForeignKey('users.id'), primary_key=True)
     serial_number = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
-    extracted_text = db.Column(db.String(5000), nullable=True)
+    # Large payloads are deferred: loaded on first access or via with_content()
+    extracted_text = db.deferred(db.Column(db.String(5000), nullable=True))
     template = db.Column(db.Integer, nullable=False)
-    parsed_resume = db.Column(db.JSON, nullable=False)
+    parsed_resume = db.deferred(db.Column(CompressedJSON, nullable=False))
+    # Latest entry in resume_versions; 0 until history is first recorded
+    version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     user = db.relationship('User', back_populates='resumes')
     
-    updated_at = db.Column(db.DateTime, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False, onupdate=datetime.utcnow)
     created_at = db.Column(db.DateTime, nullable=False)
 
+    __table_args__ = (
+        # Resumes are saved by title, see upsert_resume
+        db.UniqueConstraint('user_id', 'title', name='uq_resumes_user_title'),
+        # Keyset pagination of the resume list
+        db.Index('ix_resumes_user_created', 'user_id', 'created_at', 'serial_number'),
+    )
+
+    @classmethod
+    def with_content(cls):
+        """Query that loads parsed_resume together with the row in one SELECT."""
+        return cls.query.options(db.undefer(cls.parsed_resume))
+
+    @classmethod
+    def exists_for(cls, user_id, serial_number):
+        """Check whether a resume exists without loading any of its columns."""
+        return db.session.query(
+            db.exists().where(cls.user_id == user_id, cls.serial_number == serial_number)
+        ).scalar()
+
+
+class ResumeVersion(db.Model):
+    __tablename__ = 'resume_versions'
+
+    user_id = db.Column(db.Integer, primary_key=True)
+    resume_serial = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, primary_key=True)
+    # Snapshots hold the full resume; other versions a JSON patch from the previous one
+    is_snapshot = db.Column(db.Boolean, nullable=False, default=False)
+    payload = db.Column(db.JSON, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.ForeignKeyConstraint(
+            ['user_id', 'resume_serial'], ['resumes.user_id', 'resumes.serial_number'],
+            ondelete='CASCADE'
+        ),
+    )
+
 
 class JobDescription(db.Model):
     __tablename__ = 'job_descriptions'
@@ -63,6 +117,15 @@ class JobDescription(db.Model):
     created_at = db.Column(db.DateTime, nullable=False)
 
 
+class RevokedToken(db.Model):
+    __tablename__ = 'revoked_tokens'
+
+    # jti claim of a token revoked before it expired
+    jti = db.Column(db.String(32), primary_key=True)
+    # Rows can be purged once the token would have expired anyway
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+
 class UserSite(db.Model):
     __tablename__ = 'user_sites'
     
@@ -70,14 +133,65 @@ class UserSite(db.Model):
     user_id = db.Column(db.Integer, nullable=False)
     resume_serial = db.Column(db.Integer, nullable=False)
     subdomain = db.Column(db.String(100), nullable=False, unique=True)
-    html_content = db.Column(db.Text, nullable=False)
+    # Deferred so metadata lookups never pull the page; see with_content()
+    # Empty when the page lives in the site store (see app/utils/site_store.py)
+    html_content = db.deferred(db.Column(CompressedText, nullable=True))
+    # Content hash (the page's key in the site store) and precompressed bodies, set by set_html()
+    etag = db.Column(db.String(64))
+    html_gzip = db.deferred(db.Column(db.LargeBinary().with_variant(mysql.LONGBLOB(), 'mysql', 'mariadb')))
+    html_brotli = db.deferred(db.Column(db.LargeBinary().with_variant(mysql.LONGBLOB(), 'mysql', 'mariadb')))
+    # site_fingerprint() of the resume and theme the page was rendered from
+    fingerprint = db.Column(db.String(64))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Indexed for the subdomain map's change polling (site_router.SubdomainMap.poll)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     
     __table_args__ = (
         db.UniqueConstraint('user_id', 'resume_serial', name='uix_user_resume'),
     )
     
+    @classmethod
+    def with_content(cls):
+        """Query that loads html_content together with the row in one SELECT."""
+        return cls.query.options(db.undefer(cls.html_content), db.undefer(cls.html_gzip), db.undefer(cls.html_brotli))
+
+    def set_html(self, html):
+        """Store a generated page with its ETag and precompressed variants.
+
+        With a site store configured the files go there as well; call
+        publish_site() once the row is committed. Only when the store is
+        durable (SITE_STORE_DURABLE) does the row keep just the hash.
+        """
+        store = get_site_store()
+        encoded = encode_site(html)
+        if store is not None:
+            store.put(html, encoded)
+            if site_store.SITE_STORE_DURABLE:
+                self.etag = encoded['etag']
+                self.html_content = self.html_gzip = self.html_brotli = None
+                return
+        self.html_content = html
+        self.etag = encoded['etag']
+        self.html_gzip = encoded['html_gzip']
+        self.html_brotli = encoded['html_brotli']
+
+    def get_html(self):
+        """The stored page, from the row or the site store; None if it is missing."""
+        if self.html_content is not None:
+            return self.html_content
+        store = get_site_store()
+        if store is None or self.etag is None:
+            return None
+        return store.read(self.etag)
+
+    @classmethod
+    def matches_subdomain(cls, subdomain):
+        """Case-insensitive subdomain filter, served by ix_user_sites_subdomain_lower."""
+        return db.func.lower(cls.subdomain) == subdomain.lower()
+
     def __repr__(self):
-        return f'<UserSite {self.subdomain}>' 
+        return f'<UserSite {self.subdomain}>'
+
 
+# Case-insensitive subdomain lookups in serve_site
+db.Index('ix_user_sites_subdomain_lower', db.func.lower(UserSite.subdomain), unique=True)
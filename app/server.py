@@ -1,15 +1,29 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from app.extensions import db
+from app.db_config import pool_status
+from app.db_routing import read_only
 from app.utils.pdf_validator import PDFValidator
 from app.utils.job_validator import JobValidator
-from app.utils.parse_pdf import parse_pdf_file
+from app.utils.parse_pdf import parse_pdf_sections, parse_pdf_guarded
 from app.services.resume_ai import ResumeAI
+from app.services.password_hasher import verify_password, PasswordHasherBusy
+from app.services.llm_budget import llm_budget
+from app.web import schedule_site_regeneration
 from app.response_template.resume_schema import RESUME_TEMPLATE
 from app.models.temp import User, Resume, JobDescription
 from app.utils.feedback_validator import FeedbackValidator
-from app.utils.jwt_utils import generate_token, token_required
+from app.utils.jwt_utils import generate_token, token_required, revoke_token
 from app.utils.profile_validator import ProfileValidator
+from app.utils.resume_serial import SAVE_RETRIES
+from app.utils.resume_upsert import upsert_resume
+from app.utils.resume_history import list_versions, materialize_version, schedule_history
+from app.utils.resume_bulk import export_lines, import_lines
+from app.utils.pagination import encode_cursor, decode_cursor, parse_page_size
+from app.utils.user_cache import get_user, invalidate_user
+from sqlalchemy import and_, or_, func, select, update
+from sqlalchemy.exc import IntegrityError
 import datetime
+import os
 
 # Create blueprint
 api = Blueprint('api', __name__)
@@ -18,7 +32,27 @@ api = Blueprint('api', __name__)
 def index():
     return "Flask App is Running!"
 
+@api.route('/api/health/db', methods=['GET'])
+def db_health():
+    """Connection pool gauges and counters for each database engine"""
+    try:
+        pools = {
+            bind or "default": pool_status(engine)
+            for bind, engine in db.engines.items()
+        }
+        return jsonify({
+            "status": 200,
+            "data": pools
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            "error": "Failed to read pool status",
+            "details": str(e)
+        }), 500
+
 @api.route('/api/pdfupload', methods=['POST'])
+@llm_budget
 def upload_pdf():
     """Upload PDF and process resume"""
     
@@ -31,17 +65,37 @@ def upload_pdf():
     pdf_file = request.files['file']
     
     try:
-        # Parse PDF to text
-        extracted_text = parse_pdf_file(pdf_file)
+        extraction = None
+        if os.getenv('PDF_HARDENED_EXTRACTION', '1') == '1':
+            # Extract in a separate, resource-limited process
+            extraction = parse_pdf_guarded(pdf_file)
+            if not extraction['text'].strip():
+                return jsonify({
+                    "error": "Could not extract text from PDF",
+                    "details": extraction['details'] or extraction['reason']
+                }), 422
+            extracted_text, sections = extraction['text'], extraction['sections']
+        else:
+            # Parse PDF to text and layout-detected sections
+            extracted_text, sections = parse_pdf_sections(pdf_file)
         
         # Process with ResumeAI - only parse
-        resume_processor = ResumeAI(extracted_text)
+        resume_processor = ResumeAI(extracted_text, sections)
         parsed_resume = resume_processor.parse()
         
-        return jsonify({
+        response = {
             "status": 200,
             "data": parsed_resume
-        }), 200
+        }
+        if extraction and extraction['partial']:
+            # Let the client know only part of the document was read
+            response["extraction"] = {
+                "partial": True,
+                "reason": extraction['reason'],
+                "pages_extracted": extraction['pages_extracted'],
+                "pages_total": extraction['pages_total']
+            }
+        return jsonify(response), 200
     
     except Exception as e:
         return jsonify({
@@ -50,6 +104,7 @@ def upload_pdf():
         }), 500
 
 @api.route('/api/job_description_upload', methods=['POST'])
+@llm_budget
 def analyze_with_job():
     """Analyze resume with job description"""
     # Validate request
@@ -75,6 +130,7 @@ def analyze_with_job():
         }), 500
 
 @api.route('/api/feedback', methods=['PUT'])
+@llm_budget
 def process_feedback():
     """Process feedback and updated resume data."""
     # Validate request
@@ -117,29 +173,33 @@ def register():
     # Validate input
     if not data or 'email' not in data or 'password' not in data:
         return jsonify({"error": "Email and password required"}), 400
-        
-    # Check if user already exists
-    if User.query.filter_by(email=data['email']).first():
-        return jsonify({"error": "Email already registered"}), 400
     
-    # Create new user
+    # Create new user; the unique email constraint rejects duplicates
     user = User(
         email=data['email'],
         username=data['email'],  # Use email as username if not provided
         updated_at=datetime.datetime.utcnow(),
         created_at=datetime.datetime.utcnow()
     )
-    user.set_password(data['password'])
+    try:
+        user.set_password(data['password'])
+    except PasswordHasherBusy as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
     
     try:
         db.session.add(user)
         db.session.commit()
+        # Drop any stale email mapping left by an earlier account
+        invalidate_user(user.id, user.email)
         
         return jsonify({
             "status": 201,
             "user": {"email": user.email}
         }), 201
         
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({"error": "Email already registered"}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": "Registration failed"}), 500
@@ -152,11 +212,34 @@ def login():
     if not data or 'email' not in data or 'password' not in data:
         return jsonify({"error": "Email and password required"}), 400
         
-    # Find user by email
-    user = User.query.filter_by(email=data['email']).first()
-    if not user or not user.check_password(data['password']):
+    # Find user by email; the hash is read here only, never cached
+    user = db.session.execute(
+        select(User.id, User.email, User.password).where(User.email == data['email'])
+    ).first()
+    if not user:
+        return jsonify({"error": "Invalid email or password"}), 401
+    try:
+        matches, new_hash = verify_password(user.password, data['password'])
+    except PasswordHasherBusy as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
+    if not matches:
         return jsonify({"error": "Invalid email or password"}), 401
     
+    if new_hash:
+        # Hashing parameters changed since this password was stored; upgrade it
+        try:
+            db.session.execute(
+                update(User)
+                .where(User.id == user.id, User.password == user.password)
+                .values(password=new_hash)
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+        except Exception as e:
+            # The old hash still works; try again on the next login
+            db.session.rollback()
+            print(f"Failed to upgrade password hash: {str(e)}")
+    
     # Generate token
     token = generate_token(user.id, user.email)
     
@@ -166,6 +249,28 @@ def login():
         "token": token
     }), 200
 
+@api.route('/api/logout', methods=['POST'])
+@token_required
+def logout():
+    """Revoke the token used for this request"""
+    try:
+        if not revoke_token(request.token, request.user):
+            return jsonify({
+                "error": "This token cannot be revoked; it stays valid until it expires"
+            }), 400
+        db.session.commit()
+        
+        return jsonify({
+            "status": 200,
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            "error": "Failed to log out",
+            "details": str(e)
+        }), 500
+
 @api.route('/api/save_resume', methods=['PUT'])
 @token_required
 def save_resume():
@@ -191,36 +296,21 @@ def save_resume():
     resume_data = data['updated_resume']
     
     try:
-        # Check if resume with same title exists for this user
-        existing_resume = Resume.query.filter_by(
-            user_id=user_id,
-            title=resume_title
-        ).first()
+        for attempt in range(SAVE_RETRIES):
+            try:
+                # Insert or update by (user_id, title) without a separate lookup
+                upsert_resume(user_id, resume_title, resume_data, template=1)
+                db.session.commit()
+                break
+            except IntegrityError:
+                # A concurrent save from another tab or device won the race; try again
+                db.session.rollback()
+                if attempt == SAVE_RETRIES - 1:
+                    raise
         
-        if existing_resume:
-            # Update existing resume
-            existing_resume.parsed_resume = resume_data
-            # existing_resume.template = template
-            existing_resume.template = 1
-            db.session.commit()
-        else:
-            # Create new resume entry
-            # Get the next serial number for this user
-            existing_count = Resume.query.filter_by(user_id=user_id).count()
-            now = datetime.datetime.now(datetime.UTC)  # Using timezone-aware datetime
-            
-            resume = Resume(
-                user_id=user_id,
-                serial_number=existing_count + 1,  # Increment from existing count
-                title=resume_title,
-                parsed_resume=resume_data,
-                # template=template,
-                template=1,
-                updated_at=now,
-                created_at=now
-            )
-            db.session.add(resume)
-            db.session.commit()
+        # Record the saved version, then keep the resume's personal site in step (SITE_REGENERATE_ON_SAVE)
+        schedule_history(user_id, resume_title)
+        schedule_site_regeneration(user_id, resume_title)
         
         return jsonify({
             "status": 200,
@@ -235,24 +325,110 @@ def save_resume():
 
 @api.route('/api/get_resume_list', methods=['GET'])
 @token_required
+@read_only
 def get_resume_list():
-    """Get list of resumes for the current user"""
+    """Get the resumes for the current user, a page at a time when asked
+    
+    Query parameters:
+    - limit: page size (default 50, max 200)
+    - order: 'asc' (oldest first, default) or 'desc'
+    - cursor: next_cursor from the previous page
+    
+    Without limit or cursor every resume is returned in the original
+    response shape, with no pagination object.
+    """
     user_id = request.user.get('user_id')
     
+    # Validate paging parameters
+    order = request.args.get('order', 'asc').lower()
+    if order not in ('asc', 'desc'):
+        return jsonify({"error": "order must be 'asc' or 'desc'"}), 400
+    paginate = 'limit' in request.args or 'cursor' in request.args
+    position = None
+    try:
+        limit = parse_page_size(request.args.get('limit'))
+        cursor = request.args.get('cursor')
+        position = decode_cursor(cursor) if cursor else None
+        if position is not None:
+            if position.get('order') != order:
+                raise ValueError("Cursor was issued for a different order")
+            after_created = datetime.datetime.fromisoformat(position['created_at'])
+            after_serial = int(position['serial'])
+    except (ValueError, KeyError, TypeError) as e:
+        return jsonify({"error": "Invalid pagination parameters", "details": str(e)}), 400
+    
     try:
-        # Query resumes for this user
-        resumes = Resume.query.filter_by(user_id=user_id).all()
+        # Only the listed columns are loaded, never the resume JSON or extracted text
+        query = db.session.query(
+            Resume.serial_number,
+            Resume.title,
+            Resume.created_at
+        ).filter(Resume.user_id == user_id)
+        
+        # Keyset pagination on (created_at, serial_number)
+        if position is not None:
+            if order == 'asc':
+                query = query.filter(or_(
+                    Resume.created_at > after_created,
+                    and_(Resume.created_at == after_created, Resume.serial_number > after_serial)
+                ))
+            else:
+                query = query.filter(or_(
+                    Resume.created_at < after_created,
+                    and_(Resume.created_at == after_created, Resume.serial_number < after_serial)
+                ))
+        
+        if order == 'asc':
+            query = query.order_by(Resume.created_at.asc(), Resume.serial_number.asc())
+        else:
+            query = query.order_by(Resume.created_at.desc(), Resume.serial_number.desc())
+        
+        if not paginate:
+            return jsonify({
+                "status": 200,
+                "data": [{
+                    "resume_id": row.serial_number,
+                    "resume_title": row.title,
+                    "created_at": row.created_at.isoformat()
+                } for row in query.all()]
+            }), 200
+        
+        # Fetch one extra row to know whether another page exists
+        rows = query.limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
         
         # Format response
         resume_list = [{
-            "resume_id": resume.serial_number,
-            "resume_title": resume.title,
-            "created_at": resume.created_at.isoformat()
-        } for resume in resumes]
+            "resume_id": row.serial_number,
+            "resume_title": row.title,
+            "created_at": row.created_at.isoformat()
+        } for row in rows]
+        
+        next_cursor = None
+        if has_more:
+            last = rows[-1]
+            next_cursor = encode_cursor({
+                "created_at": last.created_at.isoformat(),
+                "serial": last.serial_number,
+                "order": order
+            })
+        
+        # The total is a hint for the first page only, later pages skip the count
+        total = None
+        if position is None:
+            total = len(rows) if not has_more else db.session.query(
+                func.count(Resume.serial_number)
+            ).filter(Resume.user_id == user_id).scalar()
         
         return jsonify({
             "status": 200,
-            "data": resume_list
+            "data": resume_list,
+            "pagination": {
+                "limit": limit,
+                "next_cursor": next_cursor,
+                "total": total
+            }
         }), 200
         
     except Exception as e:
@@ -263,13 +439,14 @@ def get_resume_list():
 
 @api.route('/api/get_resume/<int:resume_id>', methods=['GET'])
 @token_required
+@read_only
 def get_resume(resume_id):
     """Get a specific resume by ID"""
     user_id = request.user.get('user_id')
     
     try:
         # Query resume and verify ownership
-        resume = Resume.query.filter_by(
+        resume = Resume.with_content().filter_by(
             serial_number=resume_id,
             user_id=user_id
         ).first()
@@ -293,6 +470,122 @@ def get_resume(resume_id):
             "details": str(e)
         }), 500
 
+@api.route('/api/export_resumes', methods=['GET'])
+@token_required
+@read_only
+def export_resumes():
+    """Stream all of the user's resumes as NDJSON, one resume per line"""
+    user_id = request.user.get('user_id')
+    
+    return Response(
+        stream_with_context(export_lines(user_ids=[user_id])),
+        mimetype='application/x-ndjson',
+        headers={"Content-Disposition": "attachment; filename=resumes.ndjson"}
+    )
+
+@api.route('/api/import_resumes', methods=['POST'])
+@token_required
+def import_resumes():
+    """Import resumes from an NDJSON body
+    
+    Each line is an object with "title" and "resume" and optionally
+    "template" and "created_at", as produced by /api/export_resumes.
+    Invalid lines are reported and skipped; valid lines are imported.
+    """
+    user_id = request.user.get('user_id')
+    
+    try:
+        # Read the body line by line instead of loading it into memory
+        report = import_lines(user_id, request.stream)
+        
+        return jsonify({
+            "status": 200,
+            "data": report.to_dict()
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            "error": "Failed to import resumes",
+            "details": str(e)
+        }), 500
+
+@api.route('/api/get_resume/<int:resume_id>/versions', methods=['GET'])
+@token_required
+@read_only
+def get_resume_versions(resume_id):
+    """Get a page of a resume's saved versions, newest first
+    
+    Query parameters:
+    - limit: page size (default 50, max 200)
+    - cursor: next_cursor from the previous page
+    """
+    user_id = request.user.get('user_id')
+    
+    try:
+        limit = parse_page_size(request.args.get('limit'))
+        cursor = request.args.get('cursor')
+        before = int(decode_cursor(cursor)['version']) if cursor else None
+    except (ValueError, KeyError, TypeError) as e:
+        return jsonify({"error": "Invalid pagination parameters", "details": str(e)}), 400
+    
+    try:
+        if not Resume.exists_for(user_id, resume_id):
+            return jsonify({
+                "error": "Resume not found or access denied"
+            }), 404
+        
+        rows = list_versions(user_id, resume_id, limit + 1, before=before)
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        
+        return jsonify({
+            "status": 200,
+            "data": [{
+                "version": row.version,
+                "is_snapshot": row.is_snapshot,
+                "created_at": row.created_at.isoformat()
+            } for row in rows],
+            "pagination": {
+                "limit": limit,
+                "next_cursor": encode_cursor({"version": rows[-1].version}) if has_more else None
+            }
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            "error": "Failed to fetch resume versions",
+            "details": str(e)
+        }), 500
+
+@api.route('/api/get_resume/<int:resume_id>/versions/<int:version>', methods=['GET'])
+@token_required
+@read_only
+def get_resume_version(resume_id, version):
+    """Get a resume as it was at a saved version"""
+    user_id = request.user.get('user_id')
+    
+    try:
+        resume = materialize_version(user_id, resume_id, version)
+        if resume is None:
+            return jsonify({
+                "error": "Resume version not found or access denied"
+            }), 404
+        
+        return jsonify({
+            "status": 200,
+            "data": {
+                "resume": resume,
+                "version": version
+            }
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            "error": "Failed to fetch resume version",
+            "details": str(e)
+        }), 500
+
 @api.route('/api/put_profile', methods=['PUT'])
 @token_required
 def put_profile():
@@ -308,21 +601,30 @@ def put_profile():
         return jsonify({"error": message}), status_code
     
     try:
-        user = User.query.get(user_id)
+        user = get_user(user_id)
         if not user:
             return jsonify({"error": "User not found"}), 404
         
         # Update allowed fields
         fields = ['first_name', 'last_name', 'email', 'city', 'country', 'bio']
-        for field in fields:
-            if field in message:  # message contains validated data
-                setattr(user, field, message[field])
-            
+        values = {field: message[field] for field in fields if field in message}  # message contains validated data
+        if values:
+            db.session.execute(
+                update(User)
+                .where(User.id == user_id)
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
         db.session.commit()
+        invalidate_user(user_id, user['email'], values.get('email'))
         return jsonify({
             "status": 200,
         }), 200
         
+    except IntegrityError:
+        # Another account took the email after validation
+        db.session.rollback()
+        return jsonify({"error": "Email already in use"}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({
@@ -333,12 +635,13 @@ def put_profile():
 
 @api.route('/api/get_profile', methods=['GET'])
 @token_required
+@read_only
 def get_profile():
     """Get user profile"""
     user_id = request.user.get('user_id')
     
     try:
-        user = User.query.get(user_id)
+        user = get_user(user_id)
         if not user:
             return jsonify({"error": "User not found"}), 404
         
@@ -346,12 +649,12 @@ def get_profile():
             "status": 200,
             "data": {
                 "profile": {
-                    "first_name": user.first_name,
-                    "last_name": user.last_name,
-                    "email": user.email,
-                    "city": user.city,
-                    "country": user.country,
-                    "bio": user.bio
+                    "first_name": user['first_name'],
+                    "last_name": user['last_name'],
+                    "email": user['email'],
+                    "city": user['city'],
+                    "country": user['country'],
+                    "bio": user['bio']
                 }
             }
         }), 200
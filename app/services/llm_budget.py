@@ -0,0 +1,154 @@
+import json
+import math
+import os
+import time
+import uuid
+from functools import wraps
+from flask import g, has_request_context, request, jsonify
+from app.utils.jwt_utils import verify_token
+from app.utils.rate_limiter import limiter
+from app.utils.user_cache import get_user
+
+# Token budgets per plan as {window seconds: tokens}; every window must have room
+# for a call to start. Override with LLM_PLAN_BUDGETS (same JSON shape).
+DEFAULT_PLAN_BUDGETS = {
+    'anonymous': {'3600': 20000, '86400': 60000},
+    'free': {'3600': 60000, '86400': 250000},
+    'pro': {'3600': 600000, '86400': 4000000},
+}
+PLAN_BUDGETS = json.loads(os.getenv('LLM_PLAN_BUDGETS') or 'null') or DEFAULT_PLAN_BUDGETS
+# Plans that only get part of the concurrency gate, so paying users keep headroom
+SHARED_PLANS = ('anonymous', 'free')
+
+# Budgets and concurrency slots live in the rate limiter's store
+# (RATE_LIMIT_STORAGE_URL). With a SQLite or Redis store they hold across every
+# worker sharing it; with the default in-memory store each worker process
+# enforces them on its own, so N workers allow N times as much.
+# In-flight LLM calls
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', '8'))
+# Share of LLM_MAX_CONCURRENCY anonymous and free users may occupy
+LLM_SHARED_CONCURRENCY = float(os.getenv('LLM_SHARED_CONCURRENCY', '0.5'))
+# Seconds a request may queue for a slot before it is shed with 503
+LLM_QUEUE_TIMEOUT = float(os.getenv('LLM_QUEUE_TIMEOUT', '2'))
+# Seconds after which a slot held by a worker that died is given back
+LLM_SLOT_LEASE = float(os.getenv('LLM_SLOT_LEASE', '300'))
+LLM_BUDGETS_ENABLED = os.getenv('LLM_BUDGETS_ENABLED', '1') == '1'
+
+
+def record_usage(prompt_tokens, completion_tokens):
+    """Add tokens reported by a completion to the current request's bill."""
+    if has_request_context() and 'llm_usage' in g:
+        g.llm_usage += prompt_tokens + completion_tokens
+
+
+class ConcurrencyGate:
+    """Caps in-flight LLM calls, keeping a reserved share of slots for paying plans.
+
+    Slots are leases in the rate limiter's store, so the cap covers every
+    worker sharing that store. A worker that waits polls the store until a
+    slot frees up.
+    """
+
+    def __init__(self, capacity, shared_fraction, key='llm', lease=LLM_SLOT_LEASE,
+                 rate_limiter=limiter, poll_interval=0.05, timer=time.time):
+        self.capacity = capacity
+        self.shared_capacity = max(1, int(capacity * shared_fraction))
+        self.key = key
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self._limiter = rate_limiter
+        self._timer = timer
+
+    @property
+    def in_flight(self):
+        return self._limiter.backend.slots_in_use(self.key, self._timer())
+
+    def _try_acquire(self, token, limit):
+        try:
+            return self._limiter.backend.acquire_slot(self.key, token, limit, self._timer(), self.lease)
+        except Exception as e:
+            print(f"Concurrency gate backend unavailable, allowing request: {str(e)}")
+            return True
+
+    def acquire(self, priority, timeout):
+        """Wait up to timeout seconds for a slot; returns its token, or None if none freed up."""
+        limit = self.capacity if priority else self.shared_capacity
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + timeout
+        while not self._try_acquire(token, limit):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            time.sleep(min(self.poll_interval, remaining))
+        return token
+
+    def release(self, token):
+        try:
+            self._limiter.backend.release_slot(self.key, token)
+        except Exception as e:
+            # The lease runs out on its own
+            print(f"Concurrency gate backend unavailable: {str(e)}")
+
+
+gate = ConcurrencyGate(LLM_MAX_CONCURRENCY, LLM_SHARED_CONCURRENCY)
+
+
+def _caller():
+    """(budget key, plan) for the caller; these endpoints accept an optional token."""
+    auth_header = request.headers.get('Authorization', '')
+    if auth_header.startswith('Bearer '):
+        try:
+            payload = verify_token(auth_header.split(" ")[1])
+            request.user = payload
+            user = get_user(payload['user_id'])
+            if user:
+                return f"user:{user['id']}", user.get('plan') or 'free'
+        except Exception:
+            pass  # Treated like an anonymous caller
+    return f"ip:{request.remote_addr}", 'anonymous'
+
+
+def _budgets(plan):
+    return {int(window): tokens for window, tokens in (PLAN_BUDGETS.get(plan) or PLAN_BUDGETS['free']).items()}
+
+
+def llm_budget(f):
+    """Admission control for views that call the LLM.
+
+    A call may start while every rolling-window budget of the caller's plan
+    still has tokens left and a concurrency slot frees up within
+    LLM_QUEUE_TIMEOUT. The prompt and completion tokens the calls actually
+    used are charged afterwards, so a large call can overdraw a budget and
+    delay the next one.
+    """
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        if not LLM_BUDGETS_ENABLED:
+            return f(*args, **kwargs)
+
+        key, plan = _caller()
+        budgets = _budgets(plan)
+        for window, tokens in budgets.items():
+            # Zero cost only asks whether the bucket is out of tokens
+            result = limiter.hit(f"llm:{key}:{window}", tokens, window, cost=0)
+            if not result.allowed:
+                return jsonify({
+                    "error": "LLM usage budget exceeded. Try again later.",
+                    "retry_after": math.ceil(result.retry_after)
+                }), 429, {"Retry-After": str(math.ceil(result.retry_after))}
+
+        slot = gate.acquire(priority=plan not in SHARED_PLANS, timeout=LLM_QUEUE_TIMEOUT)
+        if slot is None:
+            return jsonify({
+                "error": "The AI service is busy. Try again shortly."
+            }), 503, {"Retry-After": "5"}
+
+        g.llm_usage = 0
+        try:
+            return f(*args, **kwargs)
+        finally:
+            gate.release(slot)
+            if g.llm_usage:
+                for window, tokens in budgets.items():
+                    limiter.hit(f"llm:{key}:{window}", tokens, window, cost=g.llm_usage, force=True)
+    return decorated
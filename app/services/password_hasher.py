@@ -0,0 +1,145 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from werkzeug.security import generate_password_hash, check_password_hash
+
+# werkzeug method string, e.g. "scrypt:32768:8:1" or "pbkdf2:sha256:600000";
+# see `flask passwords calibrate` to pick a cost for a target latency
+PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+# hashlib's scrypt and PBKDF2 release the GIL, so threads use every core;
+# 'process' isolates hashing completely at the cost of pickling each call
+PASSWORD_HASH_POOL = os.getenv('PASSWORD_HASH_POOL', 'thread')
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', str(os.cpu_count() or 1)))
+# Hashes allowed to wait for a worker before new ones are turned away
+PASSWORD_HASH_MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', str(PASSWORD_HASH_WORKERS * 4)))
+PASSWORD_HASH_TIMEOUT = float(os.getenv('PASSWORD_HASH_TIMEOUT', '5'))
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing pool is saturated; the request should be retried later."""
+
+
+class PasswordHasher:
+    """Runs password hashing in a bounded worker pool instead of the request thread."""
+
+    def __init__(self, method=None, pool=None, workers=None, max_pending=None, timeout=None):
+        self.method = method or PASSWORD_HASH_METHOD
+        self.pool_type = pool or PASSWORD_HASH_POOL
+        self.workers = workers or PASSWORD_HASH_WORKERS
+        self.timeout = timeout or PASSWORD_HASH_TIMEOUT
+        max_pending = PASSWORD_HASH_MAX_PENDING if max_pending is None else max_pending
+        self._slots = threading.BoundedSemaphore(self.workers + max_pending)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def _get_executor(self):
+        # Created lazily so forked app servers start their own pool
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    executor_class = ProcessPoolExecutor if self.pool_type == 'process' else ThreadPoolExecutor
+                    self._executor = executor_class(max_workers=self.workers)
+        return self._executor
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PasswordHasherBusy("Too many password checks in progress, try again shortly")
+        try:
+            return self._get_executor().submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        """Hash a password with the configured method."""
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, stored_hash, password):
+        """Check a password; returns (matches, new hash or None).
+
+        A new hash is returned when the password matches but was hashed with
+        different parameters, so the caller can store the upgraded hash.
+        """
+        if not stored_hash:
+            return False, None
+        if not self._run(check_password_hash, stored_hash, password):
+            return False, None
+        if self.needs_rehash(stored_hash):
+            return True, self.hash(password)
+        return True, None
+
+    def needs_rehash(self, stored_hash):
+        return stored_hash.split('$', 1)[0] != self.method
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+_hasher = PasswordHasher()
+
+
+def get_password_hasher():
+    return _hasher
+
+
+def hash_password(password):
+    return _hasher.hash(password)
+
+
+def verify_password(stored_hash, password):
+    return _hasher.verify(stored_hash, password)
+
+
+def _time_method(method, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        generate_password_hash('calibration-password', method)
+    return (time.perf_counter() - start) / rounds
+
+
+def calibrate(algorithm='scrypt', target_ms=100.0, rounds=3, max_memory_mb=64):
+    """Find the strongest cost for an algorithm that hashes within target_ms on this machine.
+
+    Returns (method string, measured milliseconds). scrypt doubles N while
+    each hash fits in max_memory_mb (128 * N * r bytes, per concurrent hash);
+    PBKDF2 scales iterations linearly from a measured baseline.
+    """
+    target = target_ms / 1000
+    if algorithm == 'pbkdf2':
+        baseline_iterations = 100_000
+        per_iteration = _time_method(f"pbkdf2:sha256:{baseline_iterations}", rounds) / baseline_iterations
+        # Round down to a whole thousand so the setting reads cleanly
+        iterations = max(1000, int(target / per_iteration) // 1000 * 1000)
+        method = f"pbkdf2:sha256:{iterations}"
+        return method, _time_method(method, rounds) * 1000
+
+    if algorithm != 'scrypt':
+        raise ValueError(f"Unsupported algorithm: {algorithm}")
+    n = 1024
+    method = f"scrypt:{n}:8:1"
+    elapsed = _time_method(method, rounds)
+    while 128 * (n * 2) * 8 <= max_memory_mb * 1024 * 1024:
+        candidate = f"scrypt:{n * 2}:8:1"
+        candidate_elapsed = _time_method(candidate, rounds)
+        if candidate_elapsed > target:
+            break
+        n, method, elapsed = n * 2, candidate, candidate_elapsed
+    return method, elapsed * 1000
+
+
+def measure_throughput(method, workers, count=None):
+    """Hashes per second a pool of `workers` threads sustains with a method."""
+    hasher = PasswordHasher(method=method, pool='thread', workers=workers, max_pending=count or workers * 4)
+    count = count or workers * 4
+    try:
+        start = time.perf_counter()
+        threads = [threading.Thread(target=hasher.hash, args=('calibration-password',)) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return count / (time.perf_counter() - start)
+    finally:
+        hasher.shutdown()
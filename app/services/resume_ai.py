@@ -4,22 +4,51 @@ import os
 import json
 from app.response_template.resume_schema import RESUME_TEMPLATE
 from app.response_template.analysis_schema import ANALYSIS_TEMPLATE
+from app.utils.section_segmenter import HEADER_SECTION, extract_skills, sections_text
+from app.services.llm_budget import record_usage
 
 class ResumeAI:
-    def __init__(self, extracted_text: str):
+    def __init__(self, extracted_text: str, sections: dict = None):
         """Initialize an AI-processed resume instance"""
         self.extracted_text = extracted_text
+        self.sections = sections or {}
         self.parsed_resume = None
         self.analysis = None
         self.client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
         self.timestamp = datetime.now(UTC).isoformat()
         self.resume_id = None
+        # Tokens used by this instance's completions, as reported by the API
+        self.usage = {'prompt_tokens': 0, 'completion_tokens': 0}
+
+    def _complete(self, messages: list):
+        """Run a chat completion and record the tokens it used"""
+        response = self.client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=messages,
+            temperature=0.7
+        )
+        usage = getattr(response, 'usage', None)
+        if usage is not None:
+            prompt_tokens = usage.prompt_tokens or 0
+            completion_tokens = usage.completion_tokens or 0
+            self.usage['prompt_tokens'] += prompt_tokens
+            self.usage['completion_tokens'] += completion_tokens
+            record_usage(prompt_tokens, completion_tokens)
+        return response
 
     def parse(self) -> dict:
         """Parse resume text into structured format using OpenAI"""
+        # Skills found by layout segmentation are filled in without the LLM
+        skills = extract_skills(self.sections)
+        template = RESUME_TEMPLATE
+        resume_text = self.extracted_text
+        if skills:
+            template = {k: v for k, v in RESUME_TEMPLATE.items() if k != 'skills'}
+            resume_text = sections_text(self.sections, exclude=('skills',))
+
         prompt = f"""
         Please analyze this resume text and fill in the data according to this structure:
-        {json.dumps(RESUME_TEMPLATE, indent=2)}
+        {json.dumps(template, indent=2)}
 
         Important instructions:
         1. Follow the exact schema structure
@@ -29,21 +58,17 @@ class ResumeAI:
         5. Leave optional fields empty if not found in resume
 
         Resume text:
-        {self.extracted_text}
+        {resume_text}
 
         Return only the filled JSON structure.
         """
 
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", 
-                     "content": "You are a precise resume parser that extracts structured data."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7
-            )
+            response = self._complete([
+                {"role": "system", 
+                 "content": "You are a precise resume parser that extracts structured data."},
+                {"role": "user", "content": prompt}
+            ])
             
             # Get content
             content = response.choices[0].message.content
@@ -53,11 +78,56 @@ class ResumeAI:
             
             # Store the parsed result
             self.parsed_resume = json.loads(cleaned_content)
+            if skills:
+                self.parsed_resume['skills'] = skills
             return self.parsed_resume
             
         except Exception as e:
             raise Exception(f"Resume parsing failed: {str(e)}")
 
+    def parse_section(self, section: str) -> dict:
+        """Parse a single segmented section into its part of the resume schema"""
+        if section not in self.sections:
+            raise Exception(f"Section '{section}' was not found in the resume")
+
+        if section == 'skills':
+            return {"skills": extract_skills(self.sections)}
+
+        # The header block holds the contact details that make up userInfo
+        key = 'userInfo' if section == HEADER_SECTION else section
+        if key not in RESUME_TEMPLATE:
+            raise Exception(f"Section '{section}' has no matching schema entry")
+
+        prompt = f"""
+        Please analyze this resume section and fill in the data according to this structure:
+        {json.dumps({key: RESUME_TEMPLATE[key]}, indent=2)}
+
+        Important instructions:
+        1. Follow the exact schema structure
+        2. Create as many entries in arrays as found in the section
+        3. Use "YYYY-MM" format for all dates
+        4. Leave fields empty if not found in the section
+
+        Resume section:
+        {self.sections[section]}
+
+        Return only the filled JSON structure.
+        """
+
+        try:
+            response = self._complete([
+                {"role": "system",
+                 "content": "You are a precise resume parser that extracts structured data."},
+                {"role": "user", "content": prompt}
+            ])
+
+            content = response.choices[0].message.content
+            cleaned_content = content.replace("```json", "").replace("```", "").strip()
+            return json.loads(cleaned_content)
+
+        except Exception as e:
+            raise Exception(f"Section parsing failed: {str(e)}")
+
     def analyze(self, job_description: str) -> dict:
         """Analyze the parsed resume against job description"""
         if not self.parsed_resume:
@@ -83,14 +153,10 @@ class ResumeAI:
         """
         
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are an expert resume analyst."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7
-            )
+            response = self._complete([
+                {"role": "system", "content": "You are an expert resume analyst."},
+                {"role": "user", "content": prompt}
+            ])
             
             # Clean and parse response
             content = response.choices[0].message.content
@@ -146,14 +212,10 @@ class ResumeAI:
         """
         
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are an expert resume writer."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7
-            )
+            response = self._complete([
+                {"role": "system", "content": "You are an expert resume writer."},
+                {"role": "user", "content": prompt}
+            ])
             
             content = response.choices[0].message.content
             cleaned_content = content.replace("```json", "").replace("```", "").strip()
@@ -0,0 +1,101 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache, meta, nodes
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'templates', 'sites')
+# Compiled template bytecode is kept here so new worker processes skip compilation
+# (defaults to the system temp directory)
+SITE_TEMPLATE_CACHE_DIR = os.getenv('SITE_TEMPLATE_CACHE_DIR') or None
+
+# Resume.template -> theme file in app/templates/sites
+SITE_THEMES = {
+    1: 'classic.html',
+    2: 'minimal.html',
+}
+DEFAULT_THEME = 1
+# Bump when sanitizing or rendering changes so existing sites are regenerated
+SITE_GENERATOR_VERSION = 1
+
+
+class SiteTemplateRegistry:
+    """Personal-site themes, compiled once and rendered from the compiled template objects."""
+
+    def __init__(self, themes=None, template_dir=TEMPLATE_DIR, cache_dir=SITE_TEMPLATE_CACHE_DIR):
+        self.themes = themes or SITE_THEMES
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        self.environment = Environment(
+            loader=FileSystemLoader(template_dir),
+            bytecode_cache=FileSystemBytecodeCache(cache_dir),
+            # Resume content is user supplied; escape it like Flask does for HTML
+            autoescape=True,
+            # Theme files only change with a deploy
+            auto_reload=False
+        )
+        self._templates = {}
+        self._versions = {}
+        self._fields = {}
+
+    def load(self):
+        """Compile every theme up front."""
+        for theme_id, name in self.themes.items():
+            source, _, _ = self.environment.loader.get_source(self.environment, name)
+            self._versions[theme_id] = hashlib.sha256(f"{name}\0{source}".encode('utf-8')).hexdigest()
+            self._templates[theme_id] = self.environment.get_template(name)
+            self._fields[theme_id] = self._referenced_fields(source)
+        return self
+
+    def _referenced_fields(self, source):
+        # Top-level variables plus every attribute or constant key looked up on anything
+        ast = self.environment.parse(source)
+        fields = set(meta.find_undeclared_variables(ast))
+        fields.update(node.attr for node in ast.find_all(nodes.Getattr))
+        fields.update(
+            node.arg.value for node in ast.find_all(nodes.Getitem)
+            if isinstance(node.arg, nodes.Const) and isinstance(node.arg.value, str)
+        )
+        return frozenset(fields)
+
+    def rendered_fields(self, theme_id):
+        """Keys a theme can read from the resume; anything else never reaches the page."""
+        if not self._templates:
+            self.load()
+        return self._fields.get(theme_id) or self._fields[DEFAULT_THEME]
+
+    def version(self, theme_id):
+        """Hash of the theme source a theme id renders with."""
+        if not self._templates:
+            self.load()
+        return self._versions.get(theme_id) or self._versions[DEFAULT_THEME]
+
+    def get(self, theme_id):
+        """Compiled template for a theme id, falling back to the default theme."""
+        if not self._templates:
+            self.load()
+        return self._templates.get(theme_id) or self._templates[DEFAULT_THEME]
+
+    def render(self, theme_id, context):
+        return self.get(theme_id).render(context)
+
+
+registry = SiteTemplateRegistry()
+
+
+def render_site(resume_data, theme_id=DEFAULT_THEME, generation_date=None):
+    """Render a sanitized resume into a personal-site HTML page with a theme."""
+    context = dict(resume_data)
+    context['generation_date'] = generation_date or datetime.now().strftime("%B %d, %Y")
+    return registry.render(theme_id, context)
+
+
+def site_fingerprint(parsed_resume, theme_id=DEFAULT_THEME):
+    """Hash of everything a generated page depends on: the resume, its theme and the generator.
+
+    A site whose stored fingerprint matches does not need to be rendered again.
+    """
+    canonical = json.dumps(parsed_resume, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    digest = hashlib.sha256(f"{SITE_GENERATOR_VERSION}\0{registry.version(theme_id)}\0".encode('utf-8'))
+    digest.update(canonical.encode('utf-8'))
+    return digest.hexdigest()
@@ -0,0 +1,90 @@
+import contextlib
+import pytest
+from sqlalchemy import event
+from app import create_app
+from app.extensions import db
+from app.utils.jwt_utils import generate_token, clear_token_cache
+from app.utils.user_cache import clear_user_cache
+from app.utils.rate_limiter import limiter
+from app.utils.site_cache import clear_site_cache
+from app.utils import resume_history, site_store
+from app.utils.site_router import site_map
+import datetime
+
+# A generated personal-site page, large enough to be worth compressing
+SITE_HTML = "<html><body>" + "Portfolio " * 200 + "</body></html>"
+
+@pytest.fixture
+def db_app(tmp_path, monkeypatch):
+    """Flask app backed by an in-memory SQLite database"""
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite://'
+    })
+
+    clear_user_cache()
+    clear_token_cache()
+    limiter.backend.clear()
+    clear_site_cache()
+    site_map.clear()
+    # Record resume history inline so tests see it as soon as the save returns
+    monkeypatch.setattr(resume_history, 'HISTORY_ASYNC', False)
+    monkeypatch.setattr(site_store, '_store', site_store.LocalSiteStore(str(tmp_path / 'site_store')))
+    with app.app_context():
+        db.create_all(bind_key=None)
+        yield app
+        db.session.remove()
+        db.drop_all(bind_key=None)
+
+@pytest.fixture
+def make_user(db_app):
+    """Factory creating a user and returning (user, auth headers)"""
+    from app.models.temp import User
+
+    def _make_user(email="sqlite_user@example.com"):
+        now = datetime.datetime.utcnow()
+        user = User(email=email, username=email, updated_at=now, created_at=now)
+        user.set_password("testpassword123")
+        db.session.add(user)
+        db.session.commit()
+        headers = {"Authorization": f"Bearer {generate_token(user.id, user.email)}"}
+        return user, headers
+
+    return _make_user
+
+@pytest.fixture
+def site_html():
+    """Page content make_site stores by default"""
+    return SITE_HTML
+
+@pytest.fixture
+def make_site(db_app):
+    """Factory storing a generated site and publishing it like generate_personal_site"""
+    from app.models.temp import UserSite
+
+    def _make_site(subdomain="jane-doe", html=SITE_HTML, publish=True, user_id=1):
+        site = UserSite(user_id=user_id, resume_serial=1, subdomain=subdomain)
+        site.set_html(html)
+        db.session.add(site)
+        db.session.commit()
+        if publish:
+            site_store.publish_site(subdomain, site.etag)
+        return site
+
+    return _make_site
+
+@pytest.fixture
+def record_queries(db_app):
+    """Context manager collecting (statement, parameters) for every query run inside it"""
+    @contextlib.contextmanager
+    def _record_queries():
+        statements = []
+        def listener(connection, cursor, statement, parameters, context, executemany):
+            statements.append((statement, parameters))
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+
+    return _record_queries
@@ -0,0 +1,94 @@
+import datetime
+import json
+import random
+import pytest
+from sqlalchemy import text
+from app.commands import compress_column
+from app.extensions import db
+from app.models import compressed
+from app.models.temp import Resume
+from app.utils.resume_upsert import upsert_resume
+from app.response_template.resume_schema import RESUME_TEMPLATE
+
+def _raw_parsed_resume(user_id):
+    return db.session.execute(
+        text("SELECT parsed_resume FROM resumes WHERE user_id = :user_id"), {'user_id': user_id}
+    ).scalar()
+
+WORDS = ["built", "led", "designed", "shipped", "scaled", "migrated", "reduced", "latency", "billing",
+         "platform", "team", "customers", "pipeline", "service", "analytics", "mobile", "revenue", "cloud"]
+
+def _sample_resume(seed):
+    """Resume JSON in the schema's shape with content that differs per seed"""
+    rng = random.Random(seed)
+    def sentence():
+        return " ".join(rng.choice(WORDS) for _ in range(12)).capitalize() + "."
+    return dict(
+        RESUME_TEMPLATE,
+        summary=sentence(),
+        workExperience=[
+            dict(RESUME_TEMPLATE['workExperience'][0], companyName=f"Company {rng.randint(1, 10**6)}",
+                 jobTitle=rng.choice(WORDS).title(), description=sentence())
+            for _ in range(3)
+        ],
+        skills=rng.sample(WORDS, 6),
+    )
+
+@pytest.mark.parametrize('codec', ['zlib', 'zstd'])
+def test_compress_round_trip(codec):
+    """Test both codecs round trip resume JSON"""
+    if codec == 'zstd' and compressed.zstandard is None:
+        pytest.skip("zstandard is not installed")
+    data = json.dumps(_sample_resume(0), separators=(',', ':')).encode()
+
+    stored = compressed.compress(data, codec=codec)
+
+    assert compressed.is_compressed(stored)
+    assert compressed.decompress(stored) == data
+
+def test_built_dictionary_helps_unseen_resumes(db_app, make_user, monkeypatch, tmp_path):
+    """Test a dictionary from build-dictionary shrinks resumes that were not sampled"""
+    user, _ = make_user()
+    for seed in range(20):
+        upsert_resume(user.id, f"Resume {seed}", _sample_resume(seed))
+    db.session.commit()
+    path = tmp_path / 'resume_v99.dict'
+
+    result = db_app.test_cli_runner().invoke(args=['storage', 'build-dictionary', str(path)])
+    assert result.exit_code == 0, result.output
+
+    dictionary = path.read_bytes()
+    monkeypatch.setattr(compressed, 'load_dictionary', lambda dictionary_id: dictionary if dictionary_id else b'')
+    unseen = json.dumps(_sample_resume(1000), separators=(',', ':')).encode()
+    with_dictionary = compressed.compress(unseen, codec='zlib', dictionary_id=99)
+    without_dictionary = compressed.compress(unseen, codec='zlib', dictionary_id=0)
+
+    assert compressed.decompress(with_dictionary) == unseen
+    assert len(with_dictionary) < len(without_dictionary) * 0.8
+
+def test_small_values_stay_plain():
+    """Test values below the size threshold are stored uncompressed"""
+    assert compressed.compress(b'{"a":1}') == b'{"a":1}'
+    assert compressed.decompress(b'{"a":1}') == b'{"a":1}'
+
+def test_legacy_rows_are_read_and_backfilled(make_user):
+    """Test uncompressed rows are readable and the backfill compresses them"""
+    user, _ = make_user()
+    now = datetime.datetime.utcnow()
+    legacy = dict(RESUME_TEMPLATE, summary="Written before compression")
+    db.session.execute(
+        text("INSERT INTO resumes (user_id, serial_number, title, template, parsed_resume, version, "
+             "created_at, updated_at) VALUES (:user_id, 1, 'Legacy', 1, :content, 0, :now, :now)"),
+        {'user_id': user.id, 'content': json.dumps(legacy), 'now': now}
+    )
+    db.session.commit()
+
+    assert Resume.with_content().filter_by(user_id=user.id).one().parsed_resume == legacy
+    assert not compressed.is_compressed(_raw_parsed_resume(user.id))
+
+    assert compress_column('resumes.parsed_resume', echo=lambda message: None) == 1
+    assert compress_column('resumes.parsed_resume', echo=lambda message: None) == 0
+
+    db.session.expire_all()
+    assert compressed.is_compressed(_raw_parsed_resume(user.id))
+    assert Resume.with_content().filter_by(user_id=user.id).one().parsed_resume == legacy
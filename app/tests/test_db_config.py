@@ -0,0 +1,84 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from app.db_config import get_engine_options, InstrumentedQueuePool, pool_status
+
+def _settings(**overrides):
+    settings = {
+        'pool_size': 3, 'max_overflow': 2, 'pool_timeout': 5, 'pool_recycle': 600,
+        'pool_pre_ping': True, 'connect_timeout': 4, 'statement_timeout_ms': 2500,
+    }
+    settings.update(overrides)
+    return settings
+
+def test_engine_options_postgresql():
+    """Test pool sizing and statement timeout options for PostgreSQL"""
+    options = get_engine_options('postgresql://user@localhost/resume_app', _settings())
+
+    assert options['poolclass'] is InstrumentedQueuePool
+    assert options['pool_size'] == 3
+    assert options['max_overflow'] == 2
+    assert options['pool_recycle'] == 600
+    assert options['pool_pre_ping'] is True
+    assert options['connect_args'] == {'connect_timeout': 4, 'options': '-c statement_timeout=2500'}
+
+def test_engine_options_mysql_and_sqlite():
+    """Test dialect specific statement timeouts and SQLite defaults"""
+    options = get_engine_options('mysql+pymysql://user@localhost/resume_app', _settings())
+    assert options['connect_args']['init_command'] == "SET SESSION MAX_EXECUTION_TIME=2500"
+
+    options = get_engine_options('sqlite://', _settings())
+    assert 'pool_size' not in options
+
+def test_pool_metrics(tmp_path):
+    """Test checkouts, overflow connections and pool timeouts are counted"""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=1, pool_timeout=0.1
+    )
+
+    first = engine.connect()
+    second = engine.connect()  # Beyond pool_size, so an overflow connection
+    with pytest.raises(PoolTimeoutError):
+        engine.connect()
+
+    status = pool_status(engine)
+    assert status['checked_out'] == 2
+    assert status['checkouts'] == 2
+    assert status['overflow_events'] == 1
+    assert status['timeouts'] == 1
+    assert status['wait_max_ms'] >= 100
+
+    first.execute(text("SELECT 1"))
+    first.close()
+    second.close()
+    assert pool_status(engine)['checked_out'] == 0
+
+def test_pool_metrics_after_dispose(tmp_path):
+    """Test dispose() keeps the counters and does not count connections twice"""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=1
+    )
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    engine.dispose()
+
+    first = engine.connect()
+    second = engine.connect()
+    first.invalidate()
+    first.close()
+    second.close()
+
+    status = pool_status(engine)
+    assert status['checkouts'] == 3
+    assert status['connects'] == 3
+    assert status['overflow_events'] == 1
+    assert status['invalidations'] == 1
+
+def test_db_health_endpoint(db_app):
+    """Test the pool status endpoint"""
+    response = db_app.test_client().get('/api/health/db')
+
+    assert response.status_code == 200
+    assert 'default' in response.get_json()['data']
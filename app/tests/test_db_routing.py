@@ -0,0 +1,94 @@
+import datetime
+import time
+import pytest
+from sqlalchemy import text
+from app import create_app
+from app.extensions import db
+from app.models.temp import User
+from app.utils.jwt_utils import generate_token
+from app import db_routing
+from app.utils import resume_history
+from app.utils.user_cache import clear_user_cache
+
+def _add_user(session, first_name):
+    now = datetime.datetime.utcnow()
+    user = User(id=1, email="replica@example.com", username="replica@example.com",
+                password="x", first_name=first_name, updated_at=now, created_at=now)
+    session.add(user)
+
+@pytest.fixture
+def replica_app(tmp_path, monkeypatch):
+    """App whose primary and replica databases hold different profile data"""
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'primary.db'}",
+        'SQLALCHEMY_BINDS': {'replica': f"sqlite:///{tmp_path / 'replica.db'}"},
+    })
+    db_routing._replica_health.update(healthy=True, checked_at=0.0)
+    monkeypatch.setattr(resume_history, 'HISTORY_ASYNC', False)
+
+    with app.app_context():
+        db.create_all(bind_key=None)
+        db.metadata.create_all(db.engines['replica'])
+        _add_user(db.session, "Primary")
+        db.session.commit()
+        with db.engines['replica'].begin() as connection:
+            connection.execute(User.__table__.insert().values(
+                id=1, email="replica@example.com", username="replica@example.com", password="x",
+                first_name="Replica", last_resume_serial=0,
+                updated_at=datetime.datetime.utcnow(), created_at=datetime.datetime.utcnow()
+            ))
+        db.session.remove()
+        yield app
+        db.session.remove()
+        db.drop_all(bind_key=None)
+
+def _profile_name(client, **headers):
+    # Profiles are cached; these tests are about where uncached reads go
+    clear_user_cache()
+    token = generate_token(1, "replica@example.com")
+    response = client.get('/api/get_profile', headers={"Authorization": f"Bearer {token}", **headers})
+    db.session.remove()
+    assert response.status_code == 200
+    return response.get_json()['data']['profile']['first_name']
+
+def test_read_only_view_uses_replica(replica_app):
+    """Test read-only views are served from the replica"""
+    assert _profile_name(replica_app.test_client()) == "Replica"
+
+def test_recent_write_reads_from_primary(replica_app):
+    """Test a client that just wrote reads its own data from the primary"""
+    client = replica_app.test_client()
+    recent = {db_routing.LAST_WRITE_HEADER: f"{time.time():.3f}"}
+    stale = {db_routing.LAST_WRITE_HEADER: f"{time.time() - 3600:.3f}"}
+
+    assert _profile_name(client, **recent) == "Primary"
+    assert _profile_name(client, **stale) == "Replica"
+
+def test_unhealthy_replica_falls_back_to_primary(replica_app):
+    """Test reads go to the primary while the replica is marked unhealthy"""
+    db_routing.mark_replica_unhealthy()
+
+    assert _profile_name(replica_app.test_client()) == "Primary"
+
+def test_failed_replica_query_retries_on_primary(replica_app):
+    """Test a query that fails on the replica is answered by the primary and the replica marked down"""
+    with replica_app.app_context():
+        with db.engines['replica'].begin() as connection:
+            connection.execute(text("DROP TABLE users"))
+
+    assert _profile_name(replica_app.test_client()) == "Primary"
+    assert db_routing._replica_health['healthy'] is False
+
+def test_write_marks_response(replica_app):
+    """Test writes return the last-write marker used for read-your-writes"""
+    token = generate_token(1, "replica@example.com")
+    response = replica_app.test_client().put(
+        '/api/save_resume',
+        json={"resume_title": "Main", "updated_resume": {"summary": "x"}},
+        headers={"Authorization": f"Bearer {token}"}
+    )
+
+    assert response.status_code == 200
+    assert db_routing.LAST_WRITE_HEADER in response.headers
+    assert db_routing.LAST_WRITE_COOKIE in response.headers.get('Set-Cookie', '')
@@ -0,0 +1,52 @@
+import datetime
+from sqlalchemy import inspect
+from app.extensions import db
+from app.models.temp import Resume, UserSite
+
+def _add_resume(user):
+    """Store a resume and site for the user, returning the user id"""
+    user_id = user.id
+    now = datetime.datetime.utcnow()
+    db.session.add(Resume(
+        user_id=user_id, serial_number=1, title="Main", template=1,
+        extracted_text="text " * 500, parsed_resume={"summary": "x" * 1000},
+        created_at=now, updated_at=now
+    ))
+    db.session.add(UserSite(
+        user_id=user_id, resume_serial=1, subdomain="jane-doe", html_content="<html></html>"
+    ))
+    db.session.commit()
+    db.session.expunge_all()
+    return user_id
+
+def test_heavy_columns_are_deferred(make_user):
+    """Test plain queries leave large payload columns unloaded"""
+    user, _ = make_user()
+    user_id = _add_resume(user)
+
+    resume = Resume.query.filter_by(user_id=user_id, serial_number=1).one()
+    site = UserSite.query.filter_by(subdomain="jane-doe").one()
+
+    assert {'parsed_resume', 'extracted_text'} <= inspect(resume).unloaded
+    assert 'html_content' in inspect(site).unloaded
+    # Still available on access
+    assert resume.parsed_resume == {"summary": "x" * 1000}
+
+def test_with_content_loads_payload(make_user):
+    """Test with_content() loads the payload in the same query"""
+    user, _ = make_user()
+    user_id = _add_resume(user)
+
+    resume = Resume.with_content().filter_by(user_id=user_id, serial_number=1).one()
+    site = UserSite.with_content().filter_by(subdomain="jane-doe").one()
+
+    assert 'parsed_resume' not in inspect(resume).unloaded
+    assert 'html_content' not in inspect(site).unloaded
+
+def test_existence_helpers(make_user):
+    """Test existence checks without loading rows"""
+    user, _ = make_user()
+    user_id = _add_resume(user)
+
+    assert Resume.exists_for(user_id, 1) is True
+    assert Resume.exists_for(user_id, 2) is False
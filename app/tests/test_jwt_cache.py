@@ -0,0 +1,55 @@
+import datetime
+import time
+import jwt
+import pytest
+from app.utils import jwt_utils
+from app.utils.jwt_utils import generate_token, verify_token, clear_token_cache
+
+def test_verified_tokens_skip_decode(monkeypatch):
+    """Test a token is decoded once and then served from the cache"""
+    token = generate_token(1, "cache@example.com")
+    calls = []
+    decode = jwt.decode
+    monkeypatch.setattr(jwt_utils.jwt, 'decode', lambda *args, **kwargs: calls.append(1) or decode(*args, **kwargs))
+    monkeypatch.setattr(jwt_utils, 'JWT_REVOCATION_ENABLED', False)
+
+    for _ in range(3):
+        assert verify_token(token)['user_id'] == 1
+    assert len(calls) == 1
+
+def test_cached_token_expires_with_exp(monkeypatch):
+    """Test a cached token is rejected once its exp has passed"""
+    monkeypatch.setattr(jwt_utils, 'JWT_REVOCATION_ENABLED', False)
+    token = jwt.encode({'user_id': 1, 'exp': time.time() + 1}, jwt_utils.JWT_SECRET, algorithm=jwt_utils.JWT_ALGORITHM)
+    verify_token(token)
+
+    time.sleep(1.1)
+    with pytest.raises(Exception, match='expired'):
+        verify_token(token)
+
+def test_logout_revokes_token(db_app, make_user):
+    """Test a logged out token is refused, also after the revocation set reloads"""
+    user, headers = make_user()
+    other_headers = {"Authorization": f"Bearer {generate_token(user.id, user.email)}"}
+    client = db_app.test_client()
+    assert client.get('/api/get_profile', headers=headers).status_code == 200
+
+    assert client.post('/api/logout', headers=headers).status_code == 200
+
+    response = client.get('/api/get_profile', headers=headers)
+    assert response.status_code == 401
+    assert response.json['error'] == 'Token has been revoked'
+    assert client.get('/api/get_profile', headers=other_headers).status_code == 200
+    clear_token_cache()
+    assert client.get('/api/get_profile', headers=headers).status_code == 401
+
+def test_logout_with_legacy_token_is_a_client_error(db_app, make_user):
+    """Test logging out with a token issued without a jti returns 400, not 500"""
+    user, _ = make_user()
+    payload = {'user_id': user.id, 'email': user.email, 'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=1)}
+    token = jwt.encode(payload, jwt_utils.JWT_SECRET, algorithm=jwt_utils.JWT_ALGORITHM)
+
+    response = db_app.test_client().post('/api/logout', headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 400
+    assert "cannot be revoked" in response.json['error']
@@ -0,0 +1,105 @@
+from types import SimpleNamespace
+from app.services import llm_budget
+from app.services.llm_budget import ConcurrencyGate, llm_budget as budgeted, record_usage
+from app.services.resume_ai import ResumeAI
+from app.utils.rate_limiter import RateLimiter, MemoryBackend, SQLiteBackend
+
+def _add_llm_route(app, prompt_tokens=300, completion_tokens=200):
+    @app.route('/llm_test')
+    @budgeted
+    def llm_test():
+        record_usage(prompt_tokens, completion_tokens)
+        return {"ok": True}
+
+def test_budget_charges_actual_tokens_and_rejects_when_spent(db_app, make_user, monkeypatch):
+    """Test actual usage is charged per user and a spent budget returns 429 with Retry-After"""
+    monkeypatch.setattr(llm_budget, 'PLAN_BUDGETS', {'anonymous': {'60': 600}, 'free': {'60': 600}})
+    _add_llm_route(db_app)
+    client = db_app.test_client()
+    _, headers = make_user()
+
+    # The second call starts with 100 tokens left and overdraws the budget
+    assert client.get('/llm_test', headers=headers).status_code == 200
+    assert client.get('/llm_test', headers=headers).status_code == 200
+    limited = client.get('/llm_test', headers=headers)
+    assert limited.status_code == 429
+    assert 0 < int(limited.headers['Retry-After']) <= 60
+
+    # Anonymous callers draw from their own budget
+    assert client.get('/llm_test').status_code == 200
+
+def test_plan_from_user_record(db_app, make_user, monkeypatch):
+    """Test a user's plan selects their budget"""
+    from app.extensions import db
+    monkeypatch.setattr(llm_budget, 'PLAN_BUDGETS', {'free': {'60': 100}, 'pro': {'60': 100000}})
+    _add_llm_route(db_app)
+    client = db_app.test_client()
+    user, headers = make_user()
+    user.plan = 'pro'
+    db.session.commit()
+
+    for _ in range(5):
+        assert client.get('/llm_test', headers=headers).status_code == 200
+
+def test_gate_reserves_slots_for_paying_plans():
+    """Test shared plans are shed at their share of the gate while paying plans still get in"""
+    gate = ConcurrencyGate(capacity=4, shared_fraction=0.5, rate_limiter=RateLimiter(MemoryBackend()))
+    first = gate.acquire(priority=False, timeout=0)
+    second = gate.acquire(priority=False, timeout=0)
+    assert first and second
+    assert gate.acquire(priority=False, timeout=0) is None
+    assert gate.acquire(priority=True, timeout=0)
+
+    gate.release(first)
+    gate.release(second)
+    assert gate.acquire(priority=False, timeout=0)
+
+def test_gate_is_shared_by_workers(tmp_path):
+    """Test workers sharing a store share the cap, and a dead worker's slot is given back"""
+    now = [1000.0]
+    path = str(tmp_path / 'limits.db')
+    workers = [
+        ConcurrencyGate(capacity=2, shared_fraction=1, lease=60,
+                        rate_limiter=RateLimiter(SQLiteBackend(path)), timer=lambda: now[0])
+        for _ in range(2)
+    ]
+
+    held = workers[0].acquire(priority=False, timeout=0)
+    assert workers[1].acquire(priority=False, timeout=0)
+    assert workers[1].acquire(priority=False, timeout=0) is None
+    assert workers[1].in_flight == 2
+
+    workers[0].release(held)
+    assert workers[1].acquire(priority=False, timeout=0)
+
+    # Neither slot is released; both leases run out
+    now[0] += 61
+    assert workers[0].in_flight == 0
+    assert workers[0].acquire(priority=False, timeout=0)
+
+def test_gate_full_returns_503(db_app, monkeypatch):
+    """Test a caller who cannot get a slot in time gets 503 with Retry-After"""
+    gate = ConcurrencyGate(capacity=2, shared_fraction=0.5, rate_limiter=RateLimiter(MemoryBackend()))
+    gate.acquire(priority=False, timeout=0)
+    monkeypatch.setattr(llm_budget, 'gate', gate)
+    monkeypatch.setattr(llm_budget, 'LLM_QUEUE_TIMEOUT', 0)
+    _add_llm_route(db_app)
+
+    response = db_app.test_client().get('/llm_test')
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '5'
+    assert gate.in_flight == 1
+
+def test_resume_ai_records_completion_usage(monkeypatch):
+    """Test ResumeAI adds the usage reported by each completion"""
+    monkeypatch.setenv('OPENAI_API_KEY', 'test-key')
+    response = SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content='{}'))],
+        usage=SimpleNamespace(prompt_tokens=120, completion_tokens=30)
+    )
+    processor = ResumeAI("text")
+    processor.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=lambda **kwargs: response)))
+
+    processor._complete([{"role": "user", "content": "hi"}])
+    processor._complete([{"role": "user", "content": "hi"}])
+    assert processor.usage == {'prompt_tokens': 240, 'completion_tokens': 60}
@@ -0,0 +1,73 @@
+import threading
+import pytest
+from werkzeug.security import generate_password_hash
+from app.extensions import db
+from app.models.temp import User
+from app.services import password_hasher
+from app.services.password_hasher import PasswordHasher, PasswordHasherBusy, calibrate
+
+def test_verify_and_rehash():
+    """Test verification and rehashing when the configured method changes"""
+    hasher = PasswordHasher(method='pbkdf2:sha256:2000', workers=2)
+    old_hash = generate_password_hash('secret', 'pbkdf2:sha256:1000')
+
+    assert hasher.verify(old_hash, 'wrong') == (False, None)
+    matches, new_hash = hasher.verify(old_hash, 'secret')
+    assert matches
+    assert new_hash.startswith('pbkdf2:sha256:2000$')
+    assert hasher.verify(new_hash, 'secret') == (True, None)
+    hasher.shutdown()
+
+def test_saturated_pool_rejects():
+    """Test hashing is refused instead of queueing without bound"""
+    hasher = PasswordHasher(method='pbkdf2:sha256:1000', workers=1, max_pending=0, timeout=0.01)
+    release = threading.Event()
+    started = threading.Event()
+
+    def slow(*args):
+        started.set()
+        release.wait()
+    worker = threading.Thread(target=hasher._run, args=(slow,))
+    worker.start()
+    started.wait()
+
+    with pytest.raises(PasswordHasherBusy):
+        hasher.hash('secret')
+    release.set()
+    worker.join()
+    hasher.shutdown()
+
+def test_login_upgrades_stored_hash(db_app, make_user, monkeypatch):
+    """Test logging in stores a hash made with the current parameters"""
+    user, _ = make_user()
+    db.session.execute(db.update(User).where(User.id == user.id).values(
+        password=generate_password_hash('testpassword123', 'pbkdf2:sha256:1000')
+    ))
+    db.session.commit()
+    monkeypatch.setattr(password_hasher._hasher, 'method', 'pbkdf2:sha256:2000')
+
+    response = db_app.test_client().post('/api/login', json={"email": user.email, "password": "testpassword123"})
+
+    assert response.status_code == 200
+    stored = db.session.execute(db.select(User.password).where(User.id == user.id)).scalar()
+    assert stored.startswith('pbkdf2:sha256:2000$')
+
+def test_login_busy_returns_503(db_app, make_user, monkeypatch):
+    """Test a saturated hashing pool sheds logins with Retry-After"""
+    user, _ = make_user()
+    def busy(*args):
+        raise PasswordHasherBusy("busy")
+    monkeypatch.setattr('app.server.verify_password', busy)
+
+    response = db_app.test_client().post('/api/login', json={"email": user.email, "password": "testpassword123"})
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+
+def test_calibrate_pbkdf2_targets_latency():
+    """Test calibration returns a usable method string"""
+    method, elapsed_ms = calibrate('pbkdf2', target_ms=5, rounds=1)
+
+    assert method.startswith('pbkdf2:sha256:')
+    assert int(method.rsplit(':', 1)[1]) >= 1000
+    assert elapsed_ms > 0
@@ -0,0 +1,52 @@
+import os
+from app.utils import pdf_guard
+from app.utils.pdf_guard import extract_pdf_guarded, REASON_MAX_OBJECTS, REASON_ERROR, REASON_TIMEOUT
+
+TEST_FILE = os.path.join(os.path.dirname(__file__), 'test_data/sample_resume.pdf')
+
+def _sample_bytes():
+    with open(TEST_FILE, 'rb') as f:
+        return f.read()
+
+def test_guarded_extraction_complete():
+    """Test a normal PDF is fully extracted within the limits"""
+    result = extract_pdf_guarded(_sample_bytes())
+
+    assert result['partial'] is False
+    assert result['reason'] is None
+    assert result['pages_total'] == 1
+    assert result['pages_extracted'] == 1
+    assert "Homer Simpson" in result['text']
+    assert "Springfield Inn" in result['sections']['workExperience']
+
+def test_guarded_extraction_max_objects():
+    """Test documents with too many objects are refused before extraction"""
+    result = extract_pdf_guarded(_sample_bytes(), {'max_objects': 10})
+
+    assert result['partial'] is True
+    assert result['reason'] == REASON_MAX_OBJECTS
+    assert result['pages_extracted'] == 0
+    assert result['text'] == ""
+
+def test_guarded_extraction_timeout():
+    """Test extraction that exceeds the wall-clock limit returns instead of hanging"""
+    result = extract_pdf_guarded(_sample_bytes(), {'timeout': 0})
+
+    assert result['partial'] is True
+    assert result['reason'] == REASON_TIMEOUT
+
+def test_guarded_extraction_broken_pdf():
+    """Test a corrupt document yields a structured error result"""
+    result = extract_pdf_guarded(b"%PDF-1.4\nnot really a pdf")
+
+    assert result['partial'] is True
+    assert result['reason'] == REASON_ERROR
+    assert result['details']
+
+def test_default_start_method_does_not_fork_the_worker(monkeypatch):
+    """Test extraction children are not forked from the threaded app process by default"""
+    monkeypatch.delenv('PDF_EXTRACT_START_METHOD', raising=False)
+    assert pdf_guard._context().get_start_method() in ('forkserver', 'spawn')
+
+    monkeypatch.setenv('PDF_EXTRACT_START_METHOD', 'fork')
+    assert pdf_guard._context().get_start_method() == 'fork'
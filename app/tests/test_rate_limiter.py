@@ -0,0 +1,77 @@
+from flask import Flask
+from app.utils import rate_limiter
+from app.utils.rate_limiter import RateLimiter, MemoryBackend, SQLiteBackend, rate_limit
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+    def __call__(self):
+        return self.now
+
+def test_token_bucket_burst_and_refill():
+    """Test a full bucket allows a burst, then refills at the configured rate"""
+    clock = FakeClock()
+    limiter = RateLimiter(MemoryBackend(), timer=clock)
+
+    results = [limiter.hit('k', limit=6, period=60) for _ in range(7)]
+    assert [r.allowed for r in results] == [True] * 6 + [False]
+    assert [r.remaining for r in results[:6]] == [5, 4, 3, 2, 1, 0]
+    assert results[-1].retry_after == 10
+
+    clock.now += 10
+    assert limiter.hit('k', limit=6, period=60).allowed
+    assert not limiter.hit('k', limit=6, period=60).allowed
+
+def test_forced_cost_is_charged_as_debt():
+    """Test forced hits go over the limit and delay later requests"""
+    clock = FakeClock()
+    limiter = RateLimiter(MemoryBackend(), timer=clock)
+
+    assert not limiter.hit('k', limit=10, period=10, cost=15, force=True).allowed
+    clock.now += 5
+    assert not limiter.hit('k', limit=10, period=10).allowed
+    clock.now += 1
+    assert limiter.hit('k', limit=10, period=10).allowed
+
+def test_memory_backend_is_bounded():
+    """Test the in-process backend evicts least recently used keys"""
+    backend = MemoryBackend(max_keys=3)
+    limiter = RateLimiter(backend, timer=FakeClock())
+    for i in range(10):
+        limiter.hit(f"key{i}", limit=1, period=60)
+
+    assert len(backend._states) == 3
+
+def test_sqlite_backend_is_shared(tmp_path):
+    """Test limiters in different workers share state through SQLite"""
+    clock = FakeClock()
+    path = str(tmp_path / 'limits.db')
+    worker_a = RateLimiter(SQLiteBackend(path), timer=clock)
+    worker_b = RateLimiter(SQLiteBackend(path), timer=clock)
+
+    assert worker_a.hit('k', limit=2, period=60).allowed
+    assert worker_b.hit('k', limit=2, period=60).allowed
+    assert not worker_a.hit('k', limit=2, period=60).allowed
+
+def test_decorator_headers_without_auth(monkeypatch):
+    """Test the decorator works on an unauthenticated route and sets RateLimit headers"""
+    monkeypatch.setattr(rate_limiter.limiter, '_backend', MemoryBackend())
+    app = Flask(__name__)
+
+    @app.route('/ping')
+    @rate_limit(2, 60)
+    def ping():
+        return {"ok": True}
+
+    client = app.test_client()
+    first = client.get('/ping')
+    assert first.status_code == 200
+    assert first.headers['RateLimit-Limit'] == '2'
+    assert first.headers['RateLimit-Remaining'] == '1'
+    assert first.headers['RateLimit-Policy'] == '2;w=60'
+
+    client.get('/ping')
+    limited = client.get('/ping')
+    assert limited.status_code == 429
+    assert limited.headers['Retry-After'] == '30'
+    assert limited.json['retry_after'] == 30
@@ -0,0 +1,81 @@
+import json
+from app.extensions import db
+from app.models.temp import Resume, ResumeVersion
+from app.utils import resume_bulk
+from app.utils.resume_bulk import import_lines, export_lines
+from sqlalchemy.exc import IntegrityError
+
+def _line(title, **extra):
+    return json.dumps(dict({"title": title, "resume": {"summary": title}}, **extra))
+
+def test_import_batches_and_reports_bad_lines(make_user):
+    """Test valid lines are imported across batches and bad lines are reported"""
+    user, _ = make_user()
+    lines = [_line(f"Resume {i}") for i in range(7)] + [
+        "not json",
+        json.dumps({"title": "No content"}),
+        _line("Resume 0"),
+        "",
+        _line("Dated", created_at="2020-01-02T03:04:05"),
+    ]
+
+    report = import_lines(user.id, lines, batch_size=3)
+
+    assert report.imported == 8
+    assert [error["line"] for error in report.errors] == [8, 9, 10]
+    resumes = Resume.query.filter_by(user_id=user.id).order_by(Resume.serial_number).all()
+    assert [r.serial_number for r in resumes] == list(range(1, 9))
+    assert resumes[-1].created_at.year == 2020
+    assert ResumeVersion.query.filter_by(user_id=user.id).count() == 8
+
+def test_row_retry_reports_unexpected_errors(make_user, monkeypatch):
+    """Test a row failing for another reason during the per-row retry is reported, not raised"""
+    user, _ = make_user()
+    insert_batch = resume_bulk._insert_batch
+
+    def flaky_insert_batch(owner_id, batch):
+        if len(batch) > 1:
+            raise IntegrityError("INSERT", {}, Exception("concurrent save"))
+        if batch[0][1]['title'] == "Broken":
+            raise Exception("Payload could not be stored")
+        return insert_batch(owner_id, batch)
+
+    monkeypatch.setattr(resume_bulk, '_insert_batch', flaky_insert_batch)
+    report = import_lines(user.id, [_line("First"), _line("Broken"), _line("Last")])
+
+    assert report.imported == 2
+    assert report.errors == [{"line": 2, "error": "Payload could not be stored"}]
+    assert {r.title for r in Resume.query.filter_by(user_id=user.id)} == {"First", "Last"}
+
+def test_export_round_trips_through_import(make_user):
+    """Test an export can be imported for another user unchanged"""
+    source, _ = make_user("source@example.com")
+    target, _ = make_user("target@example.com")
+    import_lines(source.id, [_line(f"Resume {i}", template=2) for i in range(5)])
+
+    exported = list(export_lines(user_ids=[source.id], batch_size=2))
+    report = import_lines(target.id, exported)
+
+    assert report.imported == 5
+    copied = Resume.with_content().filter_by(user_id=target.id).order_by(Resume.serial_number).all()
+    assert [(r.title, r.template, r.parsed_resume) for r in copied] == [
+        (f"Resume {i}", 2, {"summary": f"Resume {i}"}) for i in range(5)
+    ]
+
+def test_bulk_endpoints(db_app, make_user):
+    """Test the NDJSON export and import endpoints"""
+    user, headers = make_user()
+    client = db_app.test_client()
+    body = "\n".join([_line("First"), _line("Second"), "{"]) + "\n"
+
+    response = client.post('/api/import_resumes', data=body, headers=headers,
+                           content_type='application/x-ndjson')
+    assert response.status_code == 200
+    assert response.json["data"]["imported"] == 2
+    assert response.json["data"]["error_count"] == 1
+
+    response = client.get('/api/export_resumes', headers=headers)
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [line["title"] for line in lines] == ["First", "Second"]
@@ -0,0 +1,119 @@
+import json
+from app.extensions import db
+from app.models.temp import Resume, ResumeVersion
+from app.utils import resume_history
+from app.utils.json_patch import make_patch, apply_patch
+from app.utils.resume_upsert import upsert_resume
+
+def _resume(revision):
+    return {
+        "contact": {"name": "Jane Doe", "email": "jane@example.com"},
+        "summary": f"Engineer, revision {revision}",
+        "skills": ["Python", "SQL"] + (["Go"] if revision % 2 else []),
+        "experience": [
+            {"company": "Acme", "highlights": [f"Shipped feature {i}" for i in range(revision % 5 + 1)]}
+        ] + [
+            {"company": f"Company {i}", "highlights": ["Built and operated services for millions of users"] * 3}
+            for i in range(5)
+        ]
+    }
+
+def test_patch_round_trip():
+    """Test make_patch and apply_patch reproduce the target document"""
+    source = {"a": 1, "b/c": [1, 2, 3], "d": {"e": "x"}, "gone": True}
+    target = {"a": 2, "b/c": [1, 5], "d": {"e": "x", "f": None}, "list": []}
+
+    patch = make_patch(source, target)
+
+    assert apply_patch(source, patch) == target
+    assert source["b/c"] == [1, 2, 3]
+    assert make_patch(target, target) == []
+
+def test_versions_materialize_and_stay_small(make_user, monkeypatch):
+    """Test every saved version can be rebuilt and history is far smaller than full copies"""
+    monkeypatch.setattr(resume_history, 'SNAPSHOT_INTERVAL', 5)
+    user, _ = make_user()
+
+    for revision in range(12):
+        upsert_resume(user.id, "Main", _resume(revision))
+        db.session.commit()
+        resume_history.schedule_history(user.id, "Main")
+
+    resume = Resume.with_content().filter_by(user_id=user.id, title="Main").one()
+    assert resume.version == 12
+    assert resume.parsed_resume == _resume(11)
+    for version in range(1, 13):
+        assert resume_history.materialize_version(user.id, resume.serial_number, version) == _resume(version - 1)
+    assert resume_history.materialize_version(user.id, resume.serial_number, 13) is None
+
+    versions = ResumeVersion.query.filter_by(user_id=user.id).all()
+    assert [v.version for v in versions if v.is_snapshot] == [1, 6, 11]
+    stored = sum(len(json.dumps(v.payload)) for v in versions if not v.is_snapshot)
+    full_copies = sum(len(json.dumps(_resume(r))) for r in range(12) if r not in (0, 5, 10))
+    assert stored < full_copies / 3
+
+def test_unchanged_save_records_no_version(make_user):
+    """Test saving identical content does not add a version"""
+    user, _ = make_user()
+
+    for _ in range(3):
+        upsert_resume(user.id, "Main", _resume(1))
+        db.session.commit()
+        resume_history.schedule_history(user.id, "Main")
+
+    assert ResumeVersion.query.filter_by(user_id=user.id).count() == 1
+
+def test_history_save_is_a_single_update(make_user, record_queries):
+    """Test a save with history is one UPDATE that advances the version, with no read first"""
+    user, _ = make_user()
+    user_id = user.id
+    upsert_resume(user_id, "Main", _resume(1))
+    db.session.commit()
+
+    with record_queries() as statements:
+        upsert_resume(user_id, "Main", _resume(2))
+        db.session.commit()
+
+    assert [statement.split()[0] for statement, _ in statements] == ["UPDATE"]
+    assert Resume.query.filter_by(user_id=user_id).one().version == 2
+
+def test_history_coalesces_unrecorded_saves(make_user):
+    """Test saves made before the recorder runs are recorded once, as a patch on the last recorded version"""
+    user, _ = make_user()
+    user_id = user.id
+    upsert_resume(user_id, "Main", _resume(1))
+    db.session.commit()
+    resume_history.schedule_history(user_id, "Main")
+
+    for revision in (2, 3):
+        upsert_resume(user_id, "Main", _resume(revision))
+        db.session.commit()
+    assert resume_history.record_saved_version(user_id, "Main") == 3
+    assert resume_history.record_saved_version(user_id, "Main") is None
+
+    versions = ResumeVersion.query.filter_by(user_id=user_id).order_by(ResumeVersion.version).all()
+    assert [(v.version, v.is_snapshot) for v in versions] == [(1, True), (3, False)]
+    assert resume_history.materialize_version(user_id, 1, 3) == _resume(3)
+
+def test_version_endpoints(db_app, make_user):
+    """Test listing versions and fetching an old version through the API"""
+    user, headers = make_user()
+    other, other_headers = make_user("other@example.com")
+    client = db_app.test_client()
+    for revision in range(3):
+        client.put('/api/save_resume', json={"resume_title": "Main", "updated_resume": _resume(revision)},
+                   headers=headers)
+
+    response = client.get('/api/get_resume/1/versions?limit=2', headers=headers)
+    assert response.status_code == 200
+    assert [v["version"] for v in response.json["data"]] == [3, 2]
+    cursor = response.json["pagination"]["next_cursor"]
+    response = client.get(f'/api/get_resume/1/versions?limit=2&cursor={cursor}', headers=headers)
+    assert [v["version"] for v in response.json["data"]] == [1]
+
+    response = client.get('/api/get_resume/1/versions/1', headers=headers)
+    assert response.status_code == 200
+    assert response.json["data"]["resume"] == _resume(0)
+
+    assert client.get('/api/get_resume/1/versions', headers=other_headers).status_code == 404
+    assert client.get('/api/get_resume/1/versions/1', headers=other_headers).status_code == 404
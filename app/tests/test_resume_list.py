@@ -0,0 +1,86 @@
+import datetime
+import pytest
+from app.extensions import db
+from app.models.temp import Resume
+from app.utils.pagination import encode_cursor, decode_cursor
+
+@pytest.fixture
+def listed_user(make_user):
+    """User with five resumes, two of them sharing a creation time"""
+    user, headers = make_user()
+    base = datetime.datetime(2026, 1, 1, 12, 0, 0)
+    offsets = [0, 1, 1, 2, 3]
+    for serial, offset in enumerate(offsets, start=1):
+        created = base + datetime.timedelta(days=offset)
+        db.session.add(Resume(
+            user_id=user.id, serial_number=serial, title=f"Resume {serial}",
+            parsed_resume={"summary": "x" * 100}, template=1,
+            created_at=created, updated_at=created
+        ))
+    db.session.commit()
+    return user, headers
+
+def _collect(client, headers, **params):
+    """Follow cursors until the last page, returning ids and the first page"""
+    ids, first_page, cursor = [], None, None
+    while True:
+        query = dict(params)
+        if cursor:
+            query['cursor'] = cursor
+        response = client.get('/api/get_resume_list', query_string=query, headers=headers)
+        assert response.status_code == 200
+        body = response.get_json()
+        first_page = first_page or body
+        ids.extend(item['resume_id'] for item in body['data'])
+        cursor = body['pagination']['next_cursor']
+        if not cursor:
+            return ids, first_page
+
+def test_cursor_round_trip():
+    """Test cursors decode to the values they were built from"""
+    values = {"created_at": "2026-01-01T12:00:00", "serial": 3, "order": "asc"}
+    assert decode_cursor(encode_cursor(values)) == values
+
+def test_resume_list_pages_ascending(db_app, listed_user):
+    """Test paging oldest-first visits every resume exactly once"""
+    _, headers = listed_user
+    ids, first_page = _collect(db_app.test_client(), headers, limit=2)
+
+    assert ids == [1, 2, 3, 4, 5]
+    assert first_page['pagination']['total'] == 5
+    assert set(first_page['data'][0]) == {"resume_id", "resume_title", "created_at"}
+
+def test_resume_list_pages_descending(db_app, listed_user):
+    """Test paging newest-first with ties on created_at"""
+    _, headers = listed_user
+    ids, _ = _collect(db_app.test_client(), headers, limit=2, order='desc')
+
+    assert ids == [5, 4, 3, 2, 1]
+
+def test_resume_list_without_paging_keeps_legacy_shape(db_app, listed_user):
+    """Test a request without limit or cursor returns every resume and no pagination object"""
+    user, headers = listed_user
+    for serial in range(6, 56):
+        db.session.add(Resume(
+            user_id=user.id, serial_number=serial, title=f"Resume {serial}",
+            parsed_resume={"summary": "x"}, template=1,
+            created_at=datetime.datetime(2026, 2, 1), updated_at=datetime.datetime(2026, 2, 1)
+        ))
+    db.session.commit()
+
+    response = db_app.test_client().get('/api/get_resume_list', headers=headers)
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert set(body) == {"status", "data"}
+    assert [item['resume_id'] for item in body['data']] == list(range(1, 56))
+    assert set(body['data'][0]) == {"resume_id", "resume_title", "created_at"}
+
+def test_resume_list_rejects_bad_cursor(db_app, listed_user):
+    """Test malformed cursors and parameters are rejected"""
+    _, headers = listed_user
+    client = db_app.test_client()
+
+    assert client.get('/api/get_resume_list?cursor=%%%', headers=headers).status_code == 400
+    assert client.get('/api/get_resume_list?limit=0', headers=headers).status_code == 400
+    assert client.get('/api/get_resume_list?order=sideways', headers=headers).status_code == 400
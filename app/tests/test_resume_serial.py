@@ -0,0 +1,46 @@
+from app.extensions import db
+from app.models.temp import Resume
+from app.utils.resume_serial import allocate_resume_serial
+
+def _save(client, headers, title):
+    return client.put(
+        '/api/save_resume',
+        json={"resume_title": title, "updated_resume": {"userInfo": {"firstName": "Test"}}},
+        headers=headers
+    )
+
+def test_allocate_resume_serial(make_user):
+    """Test serials are handed out sequentially and in blocks"""
+    user, _ = make_user()
+
+    assert allocate_resume_serial(user.id) == 1
+    assert allocate_resume_serial(user.id) == 2
+    assert allocate_resume_serial(user.id, count=3) == 3
+    assert allocate_resume_serial(user.id) == 6
+
+def test_allocate_resume_serial_unknown_user(db_app):
+    """Test allocation for a missing user fails instead of returning a serial"""
+    try:
+        allocate_resume_serial(12345)
+        assert False, "Expected an exception"
+    except Exception as e:
+        assert str(e) == "User not found"
+
+def test_save_resume_does_not_reuse_serials(db_app, make_user):
+    """Test serial numbers stay unique after a resume is deleted"""
+    user, headers = make_user()
+    client = db_app.test_client()
+
+    assert _save(client, headers, "First").status_code == 200
+    assert _save(client, headers, "Second").status_code == 200
+
+    # Deleting the newest resume must not free its serial number
+    Resume.query.filter_by(user_id=user.id, title="Second").delete()
+    db.session.commit()
+
+    assert _save(client, headers, "Third").status_code == 200
+    # Saving an existing title updates it in place
+    assert _save(client, headers, "First").status_code == 200
+
+    serials = {r.title: r.serial_number for r in Resume.query.filter_by(user_id=user.id)}
+    assert serials == {"First": 1, "Third": 3}
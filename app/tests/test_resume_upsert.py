@@ -0,0 +1,72 @@
+from app.extensions import db
+from app.models.temp import Resume
+from app.utils.resume_upsert import upsert_resume
+
+def test_upsert_resume_insert_then_update(make_user):
+    """Test saving the same title twice updates the row and refreshes updated_at"""
+    user, _ = make_user()
+
+    upsert_resume(user.id, "Main", {"summary": "v1"})
+    db.session.commit()
+    first = Resume.query.filter_by(user_id=user.id, title="Main").one()
+    created_at, updated_at = first.created_at, first.updated_at
+
+    upsert_resume(user.id, "Main", {"summary": "v2"})
+    db.session.commit()
+    db.session.expire_all()
+
+    resumes = Resume.query.filter_by(user_id=user.id).all()
+    assert len(resumes) == 1
+    assert resumes[0].serial_number == 1
+    assert resumes[0].parsed_resume == {"summary": "v2"}
+    assert resumes[0].created_at == created_at
+    assert resumes[0].updated_at >= updated_at
+
+def test_upsert_resume_separate_titles(make_user):
+    """Test new titles get their own serial numbers"""
+    user, _ = make_user()
+
+    upsert_resume(user.id, "First", {"summary": "a"})
+    upsert_resume(user.id, "Second", {"summary": "b"})
+    db.session.commit()
+
+    serials = {r.title: r.serial_number for r in Resume.query.filter_by(user_id=user.id)}
+    assert serials == {"First": 1, "Second": 2}
+
+def test_save_resume_endpoint_upserts(db_app, make_user):
+    """Test the save endpoint keeps a single row per title"""
+    user, headers = make_user()
+    client = db_app.test_client()
+
+    for summary in ("draft", "final"):
+        response = client.put(
+            '/api/save_resume',
+            json={"resume_title": "Autosaved", "updated_resume": {"summary": summary}},
+            headers=headers
+        )
+        assert response.status_code == 200
+
+    resume = Resume.query.filter_by(user_id=user.id, title="Autosaved").one()
+    assert resume.parsed_resume == {"summary": "final"}
+
+def test_insert_on_conflict_updates_existing(make_user):
+    """Test a racing insert of an existing title updates instead of failing"""
+    import datetime
+    from app.utils.resume_upsert import _insert_on_conflict_update
+
+    user, _ = make_user()
+    upsert_resume(user.id, "Raced", {"summary": "first"})
+    db.session.commit()
+
+    now = datetime.datetime.utcnow()
+    db.session.execute(_insert_on_conflict_update('sqlite', {
+        'user_id': user.id, 'serial_number': 99, 'title': "Raced",
+        'parsed_resume': {"summary": "second"}, 'template': 1, 'version': 1,
+        'updated_at': now, 'created_at': now,
+    }, history=True))
+    db.session.commit()
+
+    resume = Resume.query.filter_by(user_id=user.id, title="Raced").one()
+    assert resume.serial_number == 1
+    assert resume.parsed_resume == {"summary": "second"}
+    assert resume.version == 2
@@ -0,0 +1,50 @@
+import copy
+import bleach
+from app.utils import sanitizer
+from app.utils.sanitizer import clean_text, sanitize
+
+RESUME = {
+    "userInfo": {"firstName": "Jane", "lastName": "<script>alert(1)</script>Doe", "email": "jane@example.com"},
+    "summary": "Fish & chips <b>enthusiast</b>",
+    "workExperience": [{"company": "Acme", "fromDate": "2020-01", "isPresent": True, "notes": "<i>internal</i>"}],
+    "skills": ["Python", "C<sup>++</sup>"],
+    "rawText": "<p>not rendered</p>"
+}
+
+def _legacy_sanitize(data):
+    if isinstance(data, dict):
+        return {k: _legacy_sanitize(v) for k, v in data.items()}
+    if isinstance(data, list):
+        return [_legacy_sanitize(i) for i in data]
+    if isinstance(data, str):
+        return bleach.clean(data, strip=True)
+    return data
+
+def test_matches_bleach():
+    """Test the fast path and the bleach path agree with bleach.clean on every string"""
+    samples = ["plain text", "2020-01", "", "line\r\nbreak", "tab\there", "nul\x00byte", "form\x0cfeed",
+               "a & b", "x < y", "<a href='javascript:alert(1)'>link</a>", "naïve café 履歴書"]
+    for text in samples:
+        assert clean_text(text) == bleach.clean(text, strip=True), text
+    assert sanitize(RESUME) == _legacy_sanitize(RESUME)
+
+def test_markup_is_memoized():
+    """Test strings that need bleach are cleaned once and then served from the cache"""
+    sanitizer._bleach_clean.cache_clear()
+    for _ in range(3):
+        clean_text("<b>bold</b> claim")
+    clean_text("no markup")
+    info = sanitizer._bleach_clean.cache_info()
+    assert (info.misses, info.hits) == (1, 2)
+
+def test_fields_whitelist_and_in_place():
+    """Test unrendered keys are dropped and in-place sanitizing reuses the input objects"""
+    fields = {"userInfo", "firstName", "lastName", "summary", "workExperience", "company", "fromDate", "isPresent", "skills"}
+    data = copy.deepcopy(RESUME)
+    result = sanitize(data, fields=fields, in_place=True)
+
+    assert result is data
+    assert result["workExperience"][0] == {"company": "Acme", "fromDate": "2020-01", "isPresent": True}
+    assert "rawText" not in result and "email" not in result["userInfo"]
+    assert result["userInfo"]["lastName"] == "alert(1)Doe"
+    assert result["skills"] == ["Python", "C++"]
@@ -0,0 +1,97 @@
+import os
+from app.utils.parse_pdf import parse_pdf_file, parse_pdf_sections
+from app.utils.section_segmenter import segment_lines, extract_skills, sections_text, HEADER_SECTION
+
+def _line(text, size=10.0, bold=False, x=None, y=None):
+    return {'page': 0, 'x': x, 'y': y, 'size': size, 'bold': bold, 'text': text}
+
+def test_segment_lines_styled_headings():
+    """Test headings are detected from font size and weight"""
+    lines = [
+        _line("Jane Roe", size=16.0, bold=True),
+        _line("jane@example.com"),
+        _line("Experience", size=14.0, bold=True),
+        _line("Acme Corp - Engineer"),
+        _line("Built things"),
+        _line("Skills", bold=True),
+        _line("Python, SQL"),
+    ]
+
+    sections = segment_lines(lines)
+
+    assert sections[HEADER_SECTION] == "Jane Roe\njane@example.com"
+    assert sections['workExperience'] == "Acme Corp - Engineer\nBuilt things"
+    assert sections['skills'] == "Python, SQL"
+
+def test_segment_lines_ignores_unstyled_heading_words():
+    """Test body text that happens to match a heading is not treated as one"""
+    lines = [
+        _line("Education", bold=True),
+        _line("University of Springfield"),
+        _line("references"),
+    ]
+
+    sections = segment_lines(lines)
+
+    assert 'references' not in sections
+    assert sections['education'] == "University of Springfield\nreferences"
+
+def test_segment_lines_uses_positions():
+    """Test plain headings are found by the gap above them and indented ones are ignored"""
+    lines = [
+        _line("Jane Roe", x=40, y=760),
+        _line("jane@example.com", x=40, y=748),
+        # Plain text, but spaced off from the header and flush left
+        _line("Experience", x=40, y=724),
+        _line("Acme Corp - Engineer", x=40, y=712),
+        # Capitalised like a heading, but indented under the job
+        _line("PROJECTS", x=52, y=700),
+        _line("Rewrote billing", x=52, y=688),
+        _line("Education", x=40, y=676),
+        _line("University of Springfield", x=40, y=664),
+    ]
+
+    sections = segment_lines(lines)
+
+    assert sections[HEADER_SECTION] == "Jane Roe\njane@example.com"
+    assert sections['workExperience'] == "Acme Corp - Engineer\nPROJECTS\nRewrote billing\nEducation\nUniversity of Springfield"
+    assert 'projects' not in sections and 'education' not in sections
+
+def test_extract_skills():
+    """Test skill list extraction without an LLM call"""
+    sections = {'skills': "Languages: Python, Go; SQL\n• Docker • Kubernetes\npython"}
+
+    assert extract_skills(sections) == ["Python", "Go", "SQL", "Docker", "Kubernetes"]
+    assert extract_skills({}) == []
+
+def test_sections_text_keeps_headings():
+    """Test rebuilt resume text labels every section but the header"""
+    sections = {
+        HEADER_SECTION: "Jane Doe\njane@example.com",
+        'workExperience': "Acme - Engineer",
+        'education': "University of Springfield",
+        'skills': "Python, Go",
+    }
+
+    assert sections_text(sections, exclude=('skills',)) == (
+        "Jane Doe\njane@example.com\n\n"
+        "EXPERIENCE\nAcme - Engineer\n\n"
+        "EDUCATION\nUniversity of Springfield"
+    )
+
+def test_parse_pdf_sections_sample():
+    """Test segmentation of the sample resume PDF"""
+    test_file = os.path.join(os.path.dirname(__file__), 'test_data/sample_resume.pdf')
+
+    with open(test_file, 'rb') as pdf:
+        extracted_text, sections = parse_pdf_sections(pdf)
+    with open(test_file, 'rb') as pdf:
+        flat_text = parse_pdf_file(pdf)
+
+    # Flat text is unchanged from the plain extraction
+    assert extracted_text == flat_text
+
+    assert "Homer Simpson" in sections[HEADER_SECTION]
+    assert "University of Springfield" in sections['education']
+    assert "Springfield Inn" in sections['workExperience']
+    assert "University of Springfield" not in sections['workExperience']
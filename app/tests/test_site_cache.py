@@ -0,0 +1,52 @@
+import gzip
+import pytest
+from app.extensions import db
+from app.models.temp import UserSite
+from app.utils import site_cache, site_store
+
+@pytest.fixture(autouse=True)
+def database_pages(db_app, monkeypatch):
+    """Keep generated pages in user_sites rather than the site store"""
+    monkeypatch.setattr(site_store, '_store', None)
+
+def test_etag_and_304(db_app, make_site, site_html):
+    """Test served sites carry an ETag and Cache-Control, and a matching If-None-Match gets 304"""
+    site = make_site()
+    client = db_app.test_client()
+
+    response = client.get('/web/serve_site/jane-doe')
+    assert response.status_code == 200
+    assert response.headers['ETag'] == f'W/"{site.etag}"'
+    assert response.headers['Cache-Control'] == site_cache.SITE_CACHE_CONTROL
+    assert response.get_data(as_text=True) == site_html
+
+    not_modified = client.get('/web/serve_site/jane-doe', headers={'If-None-Match': response.headers['ETag']})
+    assert not_modified.status_code == 304
+    assert not_modified.get_data() == b''
+
+def test_precompressed_variant_by_accept_encoding(db_app, make_site, site_html):
+    """Test the gzip body stored at generation is sent to clients that accept it"""
+    make_site()
+    client = db_app.test_client()
+
+    response = client.get('/web/serve_site/jane-doe', headers={'Accept-Encoding': 'gzip, deflate'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert gzip.decompress(response.get_data()).decode('utf-8') == site_html
+
+    identity = client.get('/web/serve_site/jane-doe', headers={'Accept-Encoding': 'gzip;q=0'})
+    assert 'Content-Encoding' not in identity.headers
+
+def test_hot_sites_skip_the_database(db_app, make_site, site_html):
+    """Test repeat hits are served from the in-process cache until the site is regenerated"""
+    site = make_site()
+    client = db_app.test_client()
+    client.get('/web/serve_site/jane-doe')
+
+    # Changed behind the cache's back: still served from memory
+    db.session.execute(db.update(UserSite).values(html_content="<html>changed</html>", etag=None))
+    db.session.commit()
+    assert client.get('/web/serve_site/Jane-Doe').get_data(as_text=True) == site_html
+
+    site_cache.invalidate_site(site.subdomain)
+    assert client.get('/web/serve_site/jane-doe').get_data(as_text=True) == "<html>changed</html>"
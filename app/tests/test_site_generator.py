@@ -0,0 +1,46 @@
+import datetime
+from app.extensions import db
+from app.models.temp import Resume, UserSite
+from app.services.site_generator import SiteTemplateRegistry, render_site
+from app.web import sanitize_input
+
+RESUME = {
+    "userInfo": {"firstName": "Jane", "lastName": "<script>Doe</script>", "email": "jane@example.com"},
+    "summary": "Backend engineer",
+    "skills": ["Python", "SQL"]
+}
+
+def test_themes_are_compiled_once(tmp_path):
+    """Test the registry compiles each theme once and reuses the template objects"""
+    registry = SiteTemplateRegistry(cache_dir=str(tmp_path)).load()
+    assert registry.get(1) is registry.get(1)
+    assert registry.get(1) is not registry.get(2)
+    # Bytecode is written for new processes to reuse
+    assert any(tmp_path.iterdir())
+
+def test_render_escapes_and_falls_back_to_default_theme():
+    """Test resume content is escaped and unknown theme ids use the default theme"""
+    html = render_site(RESUME, 1, generation_date="January 01, 2026")
+    assert "&lt;script&gt;Doe&lt;/script&gt;" in html
+    assert "<script>" not in html
+    assert "Generated on January 01, 2026" in html
+    assert render_site(RESUME, 99, generation_date="January 01, 2026") == html
+
+    minimal = render_site(RESUME, 2, generation_date="January 01, 2026")
+    assert minimal != html
+    assert "Backend engineer" in minimal
+
+def test_generate_site_uses_resume_theme(db_app, make_user):
+    """Test the generate endpoint renders with the theme stored on the resume"""
+    user, headers = make_user()
+    now = datetime.datetime.utcnow()
+    db.session.add(Resume(
+        user_id=user.id, serial_number=1, title="Main", template=2,
+        parsed_resume=RESUME, created_at=now, updated_at=now
+    ))
+    db.session.commit()
+
+    response = db_app.test_client().get('/web/generate_personal_site/1', headers=headers)
+    assert response.status_code == 200
+    assert response.json['html'] == render_site(sanitize_input(RESUME), 2)
+    assert UserSite.query.filter_by(user_id=user.id).one().subdomain == response.json['subdomain']
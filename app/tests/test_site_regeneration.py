@@ -0,0 +1,87 @@
+import datetime
+from app.extensions import db
+from app.models.temp import Resume, UserSite
+from app import web
+from app.services.site_generator import site_fingerprint
+
+RESUME = {
+    "userInfo": {"firstName": "Jane", "lastName": "Doe"},
+    "summary": "Backend engineer"
+}
+
+def _add_resume(user, template=1):
+    now = datetime.datetime.utcnow()
+    db.session.add(Resume(
+        user_id=user.id, serial_number=1, title="Main", template=template,
+        parsed_resume=RESUME, created_at=now, updated_at=now
+    ))
+    db.session.commit()
+
+def _count_renders(monkeypatch):
+    calls = []
+    render_site = web.render_site
+    monkeypatch.setattr(web, 'render_site', lambda *args: calls.append(args) or render_site(*args))
+    return calls
+
+def test_fingerprint_ignores_key_order_but_not_theme():
+    """Test the fingerprint depends on resume content and theme, not JSON key order"""
+    reordered = {"summary": "Backend engineer", "userInfo": {"lastName": "Doe", "firstName": "Jane"}}
+    assert site_fingerprint(RESUME, 1) == site_fingerprint(reordered, 1)
+    assert site_fingerprint(RESUME, 1) != site_fingerprint(RESUME, 2)
+    assert site_fingerprint(RESUME, 1) != site_fingerprint(dict(RESUME, summary="Engineer"), 1)
+
+def test_unchanged_resume_is_not_regenerated(db_app, make_user, monkeypatch):
+    """Test regenerating an unchanged resume returns the stored page without rendering"""
+    user, headers = make_user()
+    _add_resume(user)
+    renders = _count_renders(monkeypatch)
+    client = db_app.test_client()
+
+    first = client.get('/web/generate_personal_site/1', headers=headers)
+    updated_at = UserSite.query.one().updated_at
+    second = client.get('/web/generate_personal_site/1', headers=headers)
+
+    assert second.status_code == 200
+    assert second.json == first.json
+    assert len(renders) == 1
+    assert UserSite.query.one().updated_at == updated_at
+
+def test_changed_resume_is_regenerated(db_app, make_user, monkeypatch):
+    """Test editing the resume or switching theme renders the site again"""
+    user, headers = make_user()
+    _add_resume(user)
+    renders = _count_renders(monkeypatch)
+    client = db_app.test_client()
+    client.get('/web/generate_personal_site/1', headers=headers)
+
+    resume = db.session.get(Resume, (user.id, 1))
+    resume.parsed_resume = dict(RESUME, summary="Staff engineer")
+    db.session.commit()
+    response = client.get('/web/generate_personal_site/1', headers=headers)
+    assert "Staff engineer" in response.json['html']
+
+    resume.template = 2
+    db.session.commit()
+    client.get('/web/generate_personal_site/1', headers=headers)
+    assert len(renders) == 3
+
+def test_save_regenerates_site_in_background(db_app, make_user, monkeypatch):
+    """Test saving a resume with a site re-renders it in the background when enabled"""
+    user, headers = make_user()
+    _add_resume(user)
+    client = db_app.test_client()
+    client.get('/web/generate_personal_site/1', headers=headers)
+    monkeypatch.setattr(web, 'SITE_REGENERATE_ON_SAVE', True)
+
+    response = client.put('/api/save_resume', headers=headers, json={
+        "resume_title": "Main",
+        "updated_resume": dict(RESUME, summary="Staff engineer")
+    })
+    assert response.status_code == 200
+    web._regeneration_executor.shutdown(wait=True)
+    monkeypatch.setattr(web, '_regeneration_executor', None)
+
+    db.session.expire_all()
+    assert "Staff engineer" in UserSite.query.one().get_html()
+    # A save that changes nothing is a fingerprint comparison
+    assert not web.regenerate_changed_site(user.id, "Main")
@@ -0,0 +1,76 @@
+import gzip
+from app.utils import site_store
+from app.utils.site_router import SubdomainMap, site_map, site_subdomain
+
+HOST = "jane-doe.resume.mintmelon.ca"
+
+def test_site_subdomain():
+    """Test only valid, unreserved subdomains of the site domain are routed"""
+    assert site_subdomain("Jane-Doe.resume.mintmelon.ca:443") == "jane-doe"
+    assert site_subdomain("jane-doe.resume.mintmelon.ca.") == "jane-doe"
+    assert site_subdomain("www.resume.mintmelon.ca") is None
+    assert site_subdomain("api.resume.mintmelon.ca") is None
+    assert site_subdomain("a.b.resume.mintmelon.ca") is None
+    assert site_subdomain("resume.mintmelon.ca") is None
+    assert site_subdomain("localhost:5001") is None
+
+def test_host_serves_site_without_queries(db_app, make_site, record_queries, site_html):
+    """Test a warm map serves a site by Host header without touching the database"""
+    make_site()
+    site_map.warm()
+    client = db_app.test_client()
+    with record_queries() as statements:
+        response = client.get('/', headers={'Host': HOST, 'Accept-Encoding': 'gzip'})
+        missing = client.get('/', headers={'Host': 'john-smith.resume.mintmelon.ca'})
+        other_path = client.get('/about', headers={'Host': HOST})
+
+    assert statements == []
+    assert response.status_code == 200
+    assert gzip.decompress(response.get_data()).decode('utf-8') == site_html
+    assert missing.status_code == 404
+    assert other_path.status_code == 404
+
+def test_other_hosts_reach_the_app(db_app):
+    """Test reserved and foreign hosts are not treated as sites"""
+    client = db_app.test_client()
+    for host in ('api.resume.mintmelon.ca', 'www.resume.mintmelon.ca', 'localhost'):
+        response = client.get('/', headers={'Host': host})
+        assert response.get_data(as_text=True) == "Flask App is Running!"
+
+def test_database_sites_are_served_by_host(db_app, make_site, record_queries, site_html, monkeypatch):
+    """Test sites kept in the database are routed and served from the hot cache"""
+    monkeypatch.setattr(site_store, '_store', None)
+    make_site()
+    client = db_app.test_client()
+    assert client.get('/', headers={'Host': HOST}).get_data(as_text=True) == site_html
+    with record_queries() as statements:
+        response = client.get('/', headers={'Host': HOST})
+    assert statements == []
+    assert response.get_data(as_text=True) == site_html
+
+def test_publish_updates_map(db_app, make_site):
+    """Test pages published by this process are routable immediately"""
+    site_map.warm()
+    assert "jane-doe" not in site_map
+    site = make_site()
+    assert site_map.get("jane-doe") == site.etag
+
+def test_poll_picks_up_other_workers(db_app, make_site, record_queries):
+    """Test poll reads sites published elsewhere once the interval has passed"""
+    now = [0.0]
+    subdomains = SubdomainMap(poll_interval=5, timer=lambda: now[0])
+    subdomains.warm()
+    site = make_site(publish=False)
+
+    subdomains.poll()
+    assert "jane-doe" not in subdomains
+
+    now[0] = 6.0
+    subdomains.poll()
+    assert subdomains.get("jane-doe") == site.etag
+
+    # Nothing changed: a single MAX() query
+    now[0] = 12.0
+    with record_queries() as statements:
+        subdomains.poll()
+    assert len(statements) == 1
@@ -0,0 +1,132 @@
+import gzip
+import os
+import time
+import pytest
+from flask import Flask
+from app.extensions import db
+from app.models.temp import UserSite
+from app.utils import site_store
+from app.utils.site_store import LocalSiteStore, publish_site
+
+def test_pages_are_content_addressed(tmp_path, site_html):
+    """Test identical pages share one blob and no temporary files are left behind"""
+    store = LocalSiteStore(str(tmp_path))
+    etag = store.put(site_html)
+    assert store.put(site_html) == etag
+
+    blob_dir = os.path.dirname(store.path(etag, 'identity'))
+    assert f"{etag}.html" in os.listdir(blob_dir)
+    assert f"{etag}.html.gz" in os.listdir(blob_dir)
+    assert not [name for name in os.listdir(blob_dir) if name.startswith('.tmp-')]
+    with open(store.path(etag, 'identity'), encoding='utf-8') as f:
+        assert f.read() == site_html
+
+def test_row_keeps_only_the_hash(db_app, make_site, monkeypatch):
+    """Test with a durable store generated pages go to the store and the row keeps the hash"""
+    monkeypatch.setattr(site_store, 'SITE_STORE_DURABLE', True)
+    site = make_site()
+    row = db.session.execute(db.select(UserSite.html_content, UserSite.html_gzip, UserSite.etag)).one()
+    assert row.html_content is None and row.html_gzip is None
+    assert row.etag == site.etag
+    assert site_store.get_site_store().lookup("Jane-Doe").etag == site.etag
+
+def test_rows_keep_pages_until_the_store_is_durable(db_app, make_site, monkeypatch, tmp_path, site_html):
+    """Test a page still serves from its row after the store is lost, e.g. on a new host"""
+    make_site()
+    assert db.session.execute(db.select(UserSite.html_content)).scalar() == site_html
+
+    monkeypatch.setattr(site_store, '_store', LocalSiteStore(str(tmp_path / 'new_host')))
+    response = db_app.test_client().get('/web/serve_site/jane-doe')
+
+    assert response.status_code == 200
+    assert response.get_data(as_text=True) == site_html
+
+def test_store_path_required_outside_development(monkeypatch):
+    """Test a production app refuses the default, non-persistent store path"""
+    app = Flask(__name__)
+    monkeypatch.delenv('SITE_STORE_PATH', raising=False)
+    with pytest.raises(Exception, match="SITE_STORE_PATH"):
+        site_store.check_site_store_config(app)
+
+    monkeypatch.setenv('SITE_STORE_PATH', '/data/site_store')
+    site_store.check_site_store_config(app)
+    app.debug = True
+    monkeypatch.delenv('SITE_STORE_PATH')
+    site_store.check_site_store_config(app)
+
+def test_serving_published_sites_skips_the_database(db_app, make_site, record_queries, site_html):
+    """Test serve_site answers from the store without a single query"""
+    make_site()
+    client = db_app.test_client()
+    with record_queries() as statements:
+        response = client.get('/web/serve_site/jane-doe', headers={'Accept-Encoding': 'gzip'})
+        not_modified = client.get('/web/serve_site/jane-doe', headers={'If-None-Match': response.headers['ETag']})
+
+    assert statements == []
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(response.get_data()).decode('utf-8') == site_html
+    assert not_modified.status_code == 304
+
+def test_regeneration_switches_page(db_app, make_site):
+    """Test a regenerated site serves the new page"""
+    site = make_site()
+    client = db_app.test_client()
+    client.get('/web/serve_site/jane-doe')
+
+    site.set_html("<html>new</html>")
+    db.session.commit()
+    publish_site(site.subdomain, site.etag)
+    assert client.get('/web/serve_site/jane-doe').get_data(as_text=True) == "<html>new</html>"
+
+def test_unpublished_page_is_recovered_from_the_row(db_app, make_site, site_html):
+    """Test a committed page whose name was never published is served and published"""
+    make_site(publish=False)
+
+    response = db_app.test_client().get('/web/serve_site/jane-doe')
+    assert response.get_data(as_text=True) == site_html
+    assert site_store.get_site_store().lookup("jane-doe") is not None
+
+def test_accel_redirect(db_app, monkeypatch, make_site):
+    """Test the body is left to the proxy when X-Accel-Redirect is configured"""
+    site = make_site()
+    monkeypatch.setattr(site_store, 'SITE_ACCEL_REDIRECT_PREFIX', '/_sites/')
+
+    response = db_app.test_client().get('/web/serve_site/jane-doe', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['X-Accel-Redirect'] == f"/_sites/{site.etag[:2]}/{site.etag}.html"
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_data() == b''
+
+def test_prune_keeps_served_pages(tmp_path, site_html):
+    """Test prune deletes only old pages that are no longer referenced"""
+    store = LocalSiteStore(str(tmp_path))
+    kept, dropped = store.put(site_html), store.put("<html>old</html>")
+    old = time.time() - 7200
+    for etag in (kept, dropped):
+        os.utime(store.path(etag, 'identity'), (old, old))
+
+    store.prune({kept})
+    assert os.path.exists(store.path(kept, 'identity'))
+    assert not os.path.exists(store.path(dropped, 'identity'))
+
+def test_put_refreshes_existing_blob(tmp_path, site_html):
+    """Test storing a page again protects its old blob from prune"""
+    store = LocalSiteStore(str(tmp_path))
+    etag = store.put(site_html)
+    old = time.time() - 7200
+    os.utime(store.path(etag, 'identity'), (old, old))
+
+    assert store.put(site_html) == etag
+    store.prune(set())
+    assert os.path.exists(store.path(etag, 'identity'))
+
+def test_restore_sites_command(db_app, make_site, monkeypatch, site_html):
+    """Test restore-sites copies store pages back into their rows"""
+    monkeypatch.setattr(site_store, 'SITE_STORE_DURABLE', True)
+    make_site()
+
+    result = db_app.test_cli_runner().invoke(args=['storage', 'restore-sites'])
+    assert "Restored 1 pages, 0 missing" in result.output
+
+    row = db.session.execute(db.select(UserSite.html_content, UserSite.html_gzip)).one()
+    assert row.html_content == site_html
+    assert gzip.decompress(row.html_gzip).decode('utf-8') == site_html
@@ -0,0 +1,79 @@
+import pytest
+from sqlalchemy.exc import IntegrityError
+from app.extensions import db
+from app.models.temp import UserSite
+from app.utils import subdomain_utils
+from app.utils.subdomain_utils import claim_subdomain, generate_unique_subdomain, is_subdomain_conflict, is_valid_subdomain
+
+@pytest.fixture
+def add_sites(make_site):
+    def _add_sites(*subdomains):
+        for i, subdomain in enumerate(subdomains):
+            make_site(subdomain, user_id=100 + i, publish=False)
+    return _add_sites
+
+def test_first_free_candidate_in_one_query(add_sites, record_queries):
+    """Test the allocator finds the first free numbered name with a single SELECT"""
+    add_sites("jane-doe", "Jane-Doe1", "jane-doe2", "jane-doerte")
+    with record_queries() as statements:
+        subdomain = generate_unique_subdomain(1, "Jane Doe")
+
+    assert subdomain == "jane-doe3"
+    assert len(statements) == 1
+    # Served by ix_user_sites_subdomain_lower
+    plan = db.session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statements[0][0]}", statements[0][1]).all()
+    assert all('ix_user_sites_subdomain_lower' in row[-1] for row in plan)
+
+def test_random_suffix_is_checked(add_sites):
+    """Test the random fallback is used once numbered names run out and is still valid"""
+    add_sites("jane-doe", *(f"jane-doe{i}" for i in range(1, 10)))
+    subdomain = generate_unique_subdomain(1, "Jane Doe")
+    assert subdomain.startswith("jane-doe-") and len(subdomain) == len("jane-doe-") + 6
+    assert is_valid_subdomain(subdomain)
+
+def test_reserved_and_short_names_are_prefixed(db_app):
+    """Test names that would be reserved or too short become valid subdomains"""
+    assert generate_unique_subdomain(1, "Admin") == "user-admin"
+    assert generate_unique_subdomain(1, "Al") == "user-al"
+    assert generate_unique_subdomain(1, "   ") == "user"
+
+def test_claim_retries_when_subdomain_is_taken_concurrently(add_sites, monkeypatch):
+    """Test a subdomain claimed between picking and inserting falls through to the next one"""
+    add_sites("jane-doe")
+    picks = []
+    pick = subdomain_utils.generate_unique_subdomain
+    def stale_pick(user_id, username, exclude=()):
+        # The first pick behaves as if it ran before the other request committed
+        picks.append(exclude)
+        return "jane-doe" if len(picks) == 1 else pick(user_id, username, exclude)
+    monkeypatch.setattr(subdomain_utils, 'generate_unique_subdomain', stale_pick)
+
+    site = UserSite(user_id=1, resume_serial=1, html_content="<html></html>")
+    def claim(subdomain):
+        site.subdomain = subdomain
+        db.session.add(site)
+
+    assert claim_subdomain(1, "Jane Doe", claim) == "jane-doe1"
+    db.session.commit()
+    assert picks[1] == {"jane-doe"}
+    assert UserSite.query.filter_by(user_id=1).one().subdomain == "jane-doe1"
+
+def test_claim_reraises_other_conflicts(add_sites):
+    """Test a conflict on another unique key is not mistaken for a taken subdomain"""
+    add_sites("jane-doe")
+    def claim(subdomain):
+        # Same (user_id, resume_serial) as the existing site
+        db.session.add(UserSite(user_id=100, resume_serial=1, subdomain=subdomain, html_content="<html></html>"))
+
+    with pytest.raises(IntegrityError):
+        claim_subdomain(1, "Jane Doe", claim)
+
+def test_subdomain_conflict_messages():
+    """Test duplicate key errors are recognised across databases"""
+    assert is_subdomain_conflict(Exception("UNIQUE constraint failed: user_sites.subdomain"))
+    assert is_subdomain_conflict(Exception("UNIQUE constraint failed: index 'ix_user_sites_subdomain_lower'"))
+    assert is_subdomain_conflict(Exception("(1062, \"Duplicate entry 'jane-doe' for key 'user_sites.subdomain'\")"))
+    assert is_subdomain_conflict(Exception("(1062, \"Duplicate entry 'jane-doe' for key 'subdomain'\")"))
+    assert is_subdomain_conflict(Exception('duplicate key value violates unique constraint "user_sites_subdomain_key"'))
+    assert not is_subdomain_conflict(Exception("UNIQUE constraint failed: user_sites.user_id, user_sites.resume_serial"))
+    assert not is_subdomain_conflict(Exception("(1062, \"Duplicate entry '1-1' for key 'user_sites.uix_user_resume'\")"))
@@ -0,0 +1,92 @@
+from app.extensions import db
+from app.models.temp import User
+from app.utils import user_cache
+from app.utils.lru_cache import TTLCache
+
+def test_ttl_cache_expiry_and_lru():
+    """Test entries expire after their TTL and the least recently used is evicted"""
+    now = [0.0]
+    cache = TTLCache(maxsize=2, ttl=10, timer=lambda: now[0])
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    now[0] = 11
+    assert cache.get('a') is None
+
+def test_profile_reads_are_cached_and_invalidated(db_app, make_user):
+    """Test profile reads skip the database until the profile is updated"""
+    user, headers = make_user()
+    client = db_app.test_client()
+    assert client.get('/api/get_profile', headers=headers).status_code == 200
+
+    # Changed behind the cache's back: still served from the cache
+    db.session.execute(db.update(User).where(User.id == user.id).values(city="Elsewhere"))
+    db.session.commit()
+    assert client.get('/api/get_profile', headers=headers).json['data']['profile']['city'] is None
+
+    response = client.put('/api/put_profile', json={"city": "Berlin"}, headers=headers)
+    assert response.status_code == 200
+    fresh = db_app.test_client()
+    assert fresh.get('/api/get_profile', headers=headers).json['data']['profile']['city'] == "Berlin"
+
+def test_email_change_invalidates_login_lookup(db_app, make_user):
+    """Test login follows an email change instead of a stale cached mapping"""
+    user, headers = make_user("old@example.com")
+    client = db_app.test_client()
+    credentials = {"email": "old@example.com", "password": "testpassword123"}
+    assert client.post('/api/login', json=credentials).status_code == 200
+
+    assert client.put('/api/put_profile', json={"email": "new@example.com"}, headers=headers).status_code == 200
+
+    assert client.post('/api/login', json=credentials).status_code == 401
+    credentials['email'] = "new@example.com"
+    assert client.post('/api/login', json=credentials).status_code == 200
+
+def test_register_duplicate_relies_on_constraint(db_app):
+    """Test registering an existing email is rejected by the unique constraint"""
+    client = db_app.test_client()
+    credentials = {"email": "dup@example.com", "password": "secret123"}
+
+    assert client.post('/api/register', json=credentials).status_code == 201
+    response = client.post('/api/register', json=credentials)
+
+    assert response.status_code == 400
+    assert response.json['error'] == "Email already registered"
+    assert user_cache.get_user_by_email("dup@example.com") is not None
+
+def test_shared_backend_is_read_through(db_app, make_user, monkeypatch):
+    """Test records found in the shared backend are used without a query"""
+    class DictBackend:
+        def __init__(self):
+            self.values = {}
+        def get(self, key):
+            return self.values.get(key)
+        def set(self, key, value):
+            self.values[key] = value
+        def delete(self, *keys):
+            for key in keys:
+                self.values.pop(key, None)
+
+    shared = DictBackend()
+    monkeypatch.setattr(user_cache, '_shared', shared)
+    user, _ = make_user()
+    user_cache.get_user(user.id)
+    user_cache.clear_user_cache()
+    shared.values[f"id:{user.id}"] = dict(shared.values[f"id:{user.id}"], bio="From shared cache")
+
+    assert user_cache.get_user(user.id)['bio'] == "From shared cache"
+    user_cache.invalidate_user(user.id, user.email)
+    assert shared.values == {}
+
+def test_password_hash_is_not_cached(db_app, make_user):
+    """Test cached user records leave out the password hash and login still works"""
+    user, _ = make_user()
+
+    assert 'password' not in user_cache.get_user(user.id)
+    assert 'password' not in user_cache.get_user_by_email(user.email)
+    response = db_app.test_client().post('/api/login', json={"email": user.email, "password": "testpassword123"})
+    assert response.status_code == 200
@@ -0,0 +1,89 @@
+import copy
+
+# Minimal RFC 6902 JSON Patch: the add/remove/replace operations produced by make_patch
+
+
+def _escape(token):
+    return str(token).replace('~', '~0').replace('/', '~1')
+
+
+def _unescape(token):
+    return token.replace('~1', '/').replace('~0', '~')
+
+
+def _diff(source, target, path, ops):
+    if type(source) is not type(target):
+        ops.append({'op': 'replace', 'path': path, 'value': target})
+    elif isinstance(source, dict):
+        for key in source:
+            if key not in target:
+                ops.append({'op': 'remove', 'path': f"{path}/{_escape(key)}"})
+        for key, value in target.items():
+            if key not in source:
+                ops.append({'op': 'add', 'path': f"{path}/{_escape(key)}", 'value': value})
+            else:
+                _diff(source[key], value, f"{path}/{_escape(key)}", ops)
+    elif isinstance(source, list):
+        common = min(len(source), len(target))
+        for index in range(common):
+            _diff(source[index], target[index], f"{path}/{index}", ops)
+        # Remove from the end so earlier indexes stay valid while applying
+        for index in range(len(source) - 1, common - 1, -1):
+            ops.append({'op': 'remove', 'path': f"{path}/{index}"})
+        for value in target[common:]:
+            ops.append({'op': 'add', 'path': f"{path}/-", 'value': value})
+    elif source != target:
+        ops.append({'op': 'replace', 'path': path, 'value': target})
+
+
+def make_patch(source, target):
+    """List of JSON Patch operations turning source into target; empty if they are equal."""
+    ops = []
+    _diff(source, target, '', ops)
+    return ops
+
+
+def _resolve(document, path):
+    """Container and final token for a JSON pointer."""
+    tokens = [_unescape(token) for token in path.split('/')[1:]]
+    parent = document
+    for token in tokens[:-1]:
+        parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+    return parent, tokens[-1]
+
+
+def apply_patch(document, patch, in_place=False):
+    """Apply JSON Patch operations to document and return the result.
+
+    The document is copied first unless in_place is set; the root may still be
+    replaced, so always use the return value.
+    """
+    if not in_place:
+        document = copy.deepcopy(document)
+    for operation in patch:
+        op, path = operation['op'], operation['path']
+        if path == '':
+            if op == 'remove':
+                raise ValueError("Cannot remove the document root")
+            document = copy.deepcopy(operation['value'])
+            continue
+
+        parent, token = _resolve(document, path)
+        if isinstance(parent, list):
+            if op == 'add':
+                index = len(parent) if token == '-' else int(token)
+                parent.insert(index, copy.deepcopy(operation['value']))
+            elif op == 'remove':
+                del parent[int(token)]
+            elif op == 'replace':
+                parent[int(token)] = copy.deepcopy(operation['value'])
+            else:
+                raise ValueError(f"Unsupported patch operation: {op}")
+        else:
+            if op in ('add', 'replace'):
+                parent[token] = copy.deepcopy(operation['value'])
+            elif op == 'remove':
+                del parent[token]
+            else:
+                raise ValueError(f"Unsupported patch operation: {op}")
+    return document
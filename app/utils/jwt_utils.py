@@ -1,9 +1,17 @@
 import jwt  # This is PyJWT
+import hashlib
 import os
+import threading
+import time
+import uuid
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 from functools import wraps
 from flask import request, jsonify
+from sqlalchemy import delete, select
+from app.extensions import db
+from app.models.temp import RevokedToken
+from app.utils.lru_cache import TTLCache
 
 load_dotenv()
 
@@ -11,24 +19,94 @@ JWT_SECRET = os.getenv('JWT_SECRET', 'your-secret-key')
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRATION_DELTA = timedelta(days=1)
 
+# Verified tokens kept in memory; entries expire with the token itself
+JWT_CACHE_SIZE = int(os.getenv('JWT_CACHE_SIZE', '10000'))
+# Check tokens against revoked_tokens, reloaded at most every JWT_REVOCATION_REFRESH seconds
+JWT_REVOCATION_ENABLED = os.getenv('JWT_REVOCATION_ENABLED', '1') == '1'
+JWT_REVOCATION_REFRESH = float(os.getenv('JWT_REVOCATION_REFRESH', '30'))
+
+_token_cache = TTLCache(maxsize=JWT_CACHE_SIZE)
+_revocation_lock = threading.Lock()
+_revocation = {'jtis': frozenset(), 'loaded_at': None}
+
 def generate_token(user_id: int, email: str) -> str:
     """Generate JWT token"""
     payload = {
         'user_id': user_id,
         'email': email,
-        'exp': datetime.utcnow() + JWT_EXPIRATION_DELTA
+        'exp': datetime.utcnow() + JWT_EXPIRATION_DELTA,
+        'jti': uuid.uuid4().hex
     }
     return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
 
+def _token_key(token: str) -> bytes:
+    # Keyed by digest so the cache never holds usable tokens
+    return hashlib.sha256(token.encode()).digest()
+
+def _revoked_jtis() -> frozenset:
+    """Revoked token ids, reloaded from the database when the copy is stale."""
+    loaded_at = _revocation['loaded_at']
+    if loaded_at is not None and time.monotonic() - loaded_at < JWT_REVOCATION_REFRESH:
+        return _revocation['jtis']
+    # One request reloads while the others keep using the current set
+    if _revocation_lock.acquire(blocking=loaded_at is None):
+        try:
+            jtis = db.session.execute(
+                select(RevokedToken.jti).where(RevokedToken.expires_at > datetime.utcnow())
+            ).scalars()
+            _revocation['jtis'] = frozenset(jtis)
+        except Exception as e:
+            print(f"Failed to refresh revoked tokens: {str(e)}")
+        finally:
+            # A failed reload is retried after the usual interval, not on every request
+            _revocation['loaded_at'] = time.monotonic()
+            _revocation_lock.release()
+    return _revocation['jtis']
+
 def verify_token(token: str) -> dict:
-    """Verify JWT token"""
-    try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        return payload
-    except jwt.ExpiredSignatureError:
-        raise Exception('Token has expired')
-    except jwt.InvalidTokenError:
-        raise Exception('Invalid token')
+    """Verify JWT token
+    
+    Tokens that verified before are served from an in-memory cache until
+    they expire; revocation is checked on every call.
+    """
+    key = _token_key(token)
+    payload = _token_cache.get(key)
+    if payload is None:
+        try:
+            payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+        except jwt.ExpiredSignatureError:
+            raise Exception('Token has expired')
+        except jwt.InvalidTokenError:
+            raise Exception('Invalid token')
+        if 'exp' in payload:
+            _token_cache.set(key, payload, ttl=payload['exp'] - time.time())
+    
+    if JWT_REVOCATION_ENABLED and payload.get('jti') in _revoked_jtis():
+        raise Exception('Token has been revoked')
+    return payload
+
+def revoke_token(token: str, payload: dict) -> bool:
+    """Revoke a token before it expires. The caller commits.
+
+    Returns False for tokens issued without a jti, which cannot be revoked
+    and stay valid until they expire.
+    """
+    _token_cache.delete(_token_key(token))
+    if not payload.get('jti') or 'exp' not in payload:
+        return False
+    expires_at = datetime.utcfromtimestamp(payload['exp'])
+    db.session.merge(RevokedToken(jti=payload['jti'], expires_at=expires_at))
+    # Purge entries for tokens that have expired anyway
+    db.session.execute(delete(RevokedToken).where(RevokedToken.expires_at <= datetime.utcnow()))
+    # Apply locally right away; other workers pick it up on their next refresh
+    _revocation['jtis'] = _revocation['jtis'] | {payload['jti']}
+    return True
+
+def clear_token_cache():
+    """Forget verified tokens and the revocation set (used by tests)."""
+    _token_cache.clear()
+    _revocation['jtis'] = frozenset()
+    _revocation['loaded_at'] = None
 
 def token_required(f):
     @wraps(f)
@@ -51,6 +129,7 @@ def token_required(f):
             payload = verify_token(token)
             # Add user info to request
             request.user = payload
+            request.token = token
             
         except Exception as e:
             return jsonify({"error": str(e)}), 401
@@ -1,5 +1,7 @@
 import io
 from pypdf import PdfReader
+from app.utils.section_segmenter import segment_reader
+from app.utils.pdf_guard import extract_pdf_guarded
 
 def parse_pdf_file(pdf_file):
     """
@@ -15,4 +17,23 @@ def parse_pdf_file(pdf_file):
                 extracted_text += page_text + "\n"
         return extracted_text
     except Exception as e:
-        raise Exception(f"Failed to parse PDF: {str(e)}")
\ No newline at end of file
+        raise Exception(f"Failed to parse PDF: {str(e)}")
+
+def parse_pdf_sections(pdf_file):
+    """
+    Extracts text from an uploaded PDF file along with a map of its labelled sections.
+    """
+    try:
+        pdf_stream = io.BytesIO(pdf_file.read())
+        reader = PdfReader(pdf_stream)
+        return segment_reader(reader)
+    except Exception as e:
+        raise Exception(f"Failed to parse PDF: {str(e)}")
+
+
+def parse_pdf_guarded(pdf_file, limits=None):
+    """
+    Extracts text and sections from an uploaded PDF file under time, memory and size limits.
+    Returns the extraction result dict; 'partial' is set when a limit was hit.
+    """
+    return extract_pdf_guarded(pdf_file.read(), limits)
@@ -0,0 +1,178 @@
+import io
+import multiprocessing
+import os
+import signal
+import time
+from pypdf import PdfReader
+from app.utils.section_segmenter import extract_page, segment_lines
+
+# Reasons an extraction can stop early
+REASON_TIMEOUT = 'timeout'
+REASON_CPU_LIMIT = 'cpu_limit'
+REASON_MEMORY_LIMIT = 'memory_limit'
+REASON_MAX_PAGES = 'max_pages'
+REASON_MAX_OBJECTS = 'max_objects'
+REASON_ERROR = 'error'
+
+
+def get_pdf_limits():
+    """Per-document extraction limits, configurable through the environment."""
+    return {
+        'timeout': float(os.getenv('PDF_EXTRACT_TIMEOUT', '20')),  # Wall-clock seconds
+        'cpu_seconds': int(os.getenv('PDF_EXTRACT_CPU_SECONDS', '15')),
+        'max_memory_mb': int(os.getenv('PDF_EXTRACT_MAX_MEMORY_MB', '512')),  # On top of the parent
+        'max_pages': int(os.getenv('PDF_MAX_PAGES', '20')),
+        'max_objects': int(os.getenv('PDF_MAX_OBJECTS', '50000')),
+    }
+
+
+def _apply_resource_limits(limits):
+    """Cap CPU time and memory of the current (child) process."""
+    try:
+        import resource
+    except ImportError:  # Not available on Windows
+        return
+
+    cpu = limits['cpu_seconds']
+    if cpu:
+        # SIGXCPU at the soft limit, SIGKILL one second later
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+
+    memory = limits['max_memory_mb']
+    if memory:
+        # RLIMIT_RSS is not enforced by Linux, so cap the address space instead.
+        # A forked child starts with its parent's mappings, so the cap is on top of those.
+        limit = _address_space_bytes() + memory * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _address_space_bytes():
+    """Current virtual memory size of this process, 0 if it cannot be read."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def _extract_worker(pdf_bytes, limits, conn):
+    """Child process: extract page by page, streaming each result to the parent."""
+    try:
+        _apply_resource_limits(limits)
+        reader = PdfReader(io.BytesIO(pdf_bytes))
+
+        # The xref size is a cheap upper bound on the number of objects
+        objects = int(reader.trailer.get('/Size', 0))
+        total_pages = len(reader.pages)
+        conn.send(('meta', total_pages, objects))
+        if limits['max_objects'] and objects > limits['max_objects']:
+            conn.send(('stop', REASON_MAX_OBJECTS))
+            return
+
+        for page_number, page in enumerate(reader.pages):
+            if limits['max_pages'] and page_number >= limits['max_pages']:
+                conn.send(('stop', REASON_MAX_PAGES))
+                return
+            page_text, lines = extract_page(page, page_number)
+            conn.send(('page', page_text, lines))
+
+        conn.send(('done',))
+    except MemoryError:
+        conn.send(('stop', REASON_MEMORY_LIMIT))
+    except Exception as e:
+        conn.send(('error', str(e)))
+    finally:
+        conn.close()
+
+
+def _context():
+    # Workers are multithreaded (DB pools, hashing and site executors), and forking
+    # one can copy a held lock or its open sockets into the child. forkserver forks
+    # from a clean single-threaded server instead; 'fork' stays an explicit opt-in.
+    method = os.getenv('PDF_EXTRACT_START_METHOD')
+    if not method:
+        method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    ctx = multiprocessing.get_context(method)
+    if method == 'forkserver':
+        # Children fork from a server that already imported pypdf and the segmenter
+        ctx.set_forkserver_preload([__name__])
+    return ctx
+
+
+def extract_pdf_guarded(pdf_bytes, limits=None):
+    """Extract text and sections from PDF bytes in a resource-limited child process.
+
+    Pages are streamed back as they are extracted, so a document that hits a
+    limit still yields everything extracted before that point. Returns a dict
+    with the flat text, the section map, page counts and, when extraction
+    stopped early, partial=True and the reason.
+    """
+    limits = {**get_pdf_limits(), **(limits or {})}
+    result = {
+        'text': "",
+        'sections': {},
+        'pages_total': None,
+        'pages_extracted': 0,
+        'partial': False,
+        'reason': None,
+        'details': None,
+    }
+    lines = []
+
+    ctx = _context()
+    parent_conn, child_conn = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=_extract_worker, args=(pdf_bytes, limits, child_conn), daemon=True)
+    process.start()
+    child_conn.close()
+
+    deadline = time.monotonic() + limits['timeout']
+    finished = False
+    try:
+        while not finished:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                result['reason'] = REASON_TIMEOUT
+                break
+            if not parent_conn.poll(remaining):
+                continue
+            try:
+                message = parent_conn.recv()
+            except EOFError:
+                # Child died without reporting, e.g. killed by the CPU limit
+                break
+
+            kind = message[0]
+            if kind == 'meta':
+                result['pages_total'] = message[1]
+            elif kind == 'page':
+                page_text, page_lines = message[1], message[2]
+                if page_text:
+                    result['text'] += page_text + "\n"
+                lines.extend(page_lines)
+                result['pages_extracted'] += 1
+            elif kind == 'stop':
+                result['reason'] = message[1]
+                finished = True
+            elif kind == 'error':
+                result['reason'] = REASON_ERROR
+                result['details'] = message[1]
+                finished = True
+            elif kind == 'done':
+                finished = True
+    finally:
+        if process.is_alive():
+            process.kill()
+        process.join()
+        parent_conn.close()
+
+    if not finished and result['reason'] is None:
+        killed_by = -process.exitcode if process.exitcode and process.exitcode < 0 else None
+        if killed_by in (getattr(signal, 'SIGXCPU', None), signal.SIGKILL):
+            result['reason'] = REASON_CPU_LIMIT
+        else:
+            result['reason'] = REASON_ERROR
+            result['details'] = f"Extraction process exited with code {process.exitcode}"
+
+    result['partial'] = result['reason'] is not None
+    result['sections'] = segment_lines(lines)
+    return result
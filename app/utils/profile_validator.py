@@ -1,5 +1,5 @@
 from flask import Request, jsonify
-from app.models.temp import User
+from app.utils.user_cache import get_user_by_email
 
 class ProfileValidator:
     @staticmethod
@@ -10,11 +10,8 @@ class ProfileValidator:
             
         # Check email uniqueness if being updated
         if 'email' in data:
-            existing_user = User.query.filter(
-                User.email == data['email'],
-                User.id != user_id
-            ).first()
-            if existing_user:
+            existing_user = get_user_by_email(data['email'])
+            if existing_user and existing_user['id'] != user_id:
                 return False, "Email already in use", 400
                 
         return True, data, 200 
\ No newline at end of file
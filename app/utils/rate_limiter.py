@@ -0,0 +1,322 @@
+import math
+import os
+import sqlite3
+import threading
+import time
+from functools import wraps
+from flask import request, jsonify, make_response
+from app.utils.lru_cache import TTLCache
+
+try:
+    import redis
+except ImportError:  # The Redis backend is optional
+    redis = None
+
+# memory (per process), sqlite:///path/to/file.db (shared by the workers on a host) or redis://...
+RATE_LIMIT_STORAGE_URL = os.getenv('RATE_LIMIT_STORAGE_URL', 'memory')
+# Keys tracked by the in-process backend before the least recently used are dropped
+RATE_LIMIT_MEMORY_KEYS = int(os.getenv('RATE_LIMIT_MEMORY_KEYS', '100000'))
+RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', '1') == '1'
+
+
+class RateLimitResult:
+    """Outcome of a rate limit check, with the values for the RateLimit-* headers."""
+
+    def __init__(self, allowed, limit, remaining, reset_after, retry_after):
+        self.allowed = allowed
+        self.limit = limit
+        self.remaining = remaining
+        self.reset_after = reset_after
+        self.retry_after = retry_after
+
+    def headers(self, period):
+        headers = {
+            'RateLimit-Limit': str(self.limit),
+            'RateLimit-Remaining': str(self.remaining),
+            'RateLimit-Reset': str(math.ceil(self.reset_after)),
+            'RateLimit-Policy': f"{self.limit};w={int(period)}",
+        }
+        if not self.allowed:
+            headers['Retry-After'] = str(math.ceil(self.retry_after))
+        return headers
+
+
+def _gcra(tat, now, cost, emission_interval, tolerance, force=False):
+    """Generic cell rate algorithm step.
+
+    tat is the stored theoretical arrival time (None for a new key). Returns
+    (allowed, new tat to store or None to leave it unchanged, the tat the
+    result is based on). With force the cost is recorded even when it goes
+    over the limit, pushing later requests back.
+    """
+    tat = max(tat or now, now)
+    new_tat = tat + emission_interval * cost
+    allowed = new_tat - tolerance <= now
+    if allowed or force:
+        return allowed, new_tat, new_tat
+    return allowed, None, tat
+
+
+class MemoryBackend:
+    """Per-process state with LRU eviction; keys also expire once their bucket is full again."""
+
+    def __init__(self, max_keys=RATE_LIMIT_MEMORY_KEYS):
+        self._states = TTLCache(maxsize=max_keys)
+        # Concurrency slot leases: key -> {token: expiry}
+        self._slots = {}
+        self._lock = threading.Lock()
+
+    def apply(self, key, now, cost, emission_interval, tolerance, force=False):
+        with self._lock:
+            allowed, new_tat, tat = _gcra(self._states.get(key), now, cost, emission_interval, tolerance, force)
+            if new_tat is not None:
+                self._states.set(key, new_tat, ttl=max(new_tat - now, 0))
+        return allowed, tat
+
+    def acquire_slot(self, key, token, limit, now, lease):
+        with self._lock:
+            slots = {held: expiry for held, expiry in self._slots.get(key, {}).items() if expiry > now}
+            allowed = len(slots) < limit
+            if allowed:
+                slots[token] = now + lease
+            self._slots[key] = slots
+        return allowed
+
+    def release_slot(self, key, token):
+        with self._lock:
+            self._slots.get(key, {}).pop(token, None)
+
+    def slots_in_use(self, key, now):
+        with self._lock:
+            return sum(1 for expiry in self._slots.get(key, {}).values() if expiry > now)
+
+    def clear(self):
+        with self._lock:
+            self._states.clear()
+            self._slots.clear()
+
+
+class SQLiteBackend:
+    """State in a SQLite file, so every worker on a host shares the same limits."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._calls = 0
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limits (key TEXT PRIMARY KEY, tat REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS concurrency_slots "
+                "(key TEXT NOT NULL, token TEXT NOT NULL, expires REAL NOT NULL, PRIMARY KEY (key, token))"
+            )
+
+    def _connect(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def apply(self, key, now, cost, emission_interval, tolerance, force=False):
+        connection = self._connect()
+        # BEGIN IMMEDIATE takes the write lock up front, making the read-modify-write atomic
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute("SELECT tat FROM rate_limits WHERE key = ?", (key,)).fetchone()
+            allowed, new_tat, tat = _gcra(row[0] if row else None, now, cost, emission_interval, tolerance, force)
+            if new_tat is not None:
+                connection.execute(
+                    "INSERT INTO rate_limits (key, tat) VALUES (?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET tat = excluded.tat",
+                    (key, new_tat)
+                )
+            self._calls += 1
+            if self._calls % 1000 == 0:
+                # Buckets that refilled completely carry no state
+                connection.execute("DELETE FROM rate_limits WHERE tat < ?", (now,))
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        return allowed, tat
+
+    def acquire_slot(self, key, token, limit, now, lease):
+        connection = self._connect()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            # Leases of workers that died holding a slot run out
+            connection.execute("DELETE FROM concurrency_slots WHERE key = ? AND expires <= ?", (key, now))
+            in_use = connection.execute("SELECT COUNT(*) FROM concurrency_slots WHERE key = ?", (key,)).fetchone()[0]
+            allowed = in_use < limit
+            if allowed:
+                connection.execute(
+                    "INSERT INTO concurrency_slots (key, token, expires) VALUES (?, ?, ?)", (key, token, now + lease)
+                )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        return allowed
+
+    def release_slot(self, key, token):
+        self._connect().execute("DELETE FROM concurrency_slots WHERE key = ? AND token = ?", (key, token))
+
+    def slots_in_use(self, key, now):
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM concurrency_slots WHERE key = ? AND expires > ?", (key, now)
+        ).fetchone()[0]
+
+    def clear(self):
+        connection = self._connect()
+        connection.execute("DELETE FROM rate_limits")
+        connection.execute("DELETE FROM concurrency_slots")
+
+
+class RedisBackend:
+    """State in Redis, shared by every worker and host."""
+
+    # Same step as _gcra, run atomically on the server
+    SCRIPT = """
+    local now, cost, interval, tolerance, force = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3]), tonumber(ARGV[4]), ARGV[5] == '1'
+    local tat = math.max(tonumber(redis.call('GET', KEYS[1]) or now), now)
+    local new_tat = tat + interval * cost
+    local allowed = new_tat - tolerance <= now
+    if allowed or force then
+        redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.max(math.ceil((new_tat - now) * 1000), 1))
+        return {allowed and 1 or 0, tostring(new_tat)}
+    end
+    return {0, tostring(tat)}
+    """
+    # Concurrency slots as a sorted set of lease tokens scored by expiry
+    SLOT_SCRIPT = """
+    local now, limit, expires, token, lease = tonumber(ARGV[1]), tonumber(ARGV[2]), ARGV[3], ARGV[4], tonumber(ARGV[5])
+    redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+    if redis.call('ZCARD', KEYS[1]) < limit then
+        redis.call('ZADD', KEYS[1], expires, token)
+        redis.call('PEXPIRE', KEYS[1], math.max(math.ceil(lease * 1000), 1))
+        return 1
+    end
+    return 0
+    """
+
+    def __init__(self, url):
+        if redis is None:
+            raise Exception("RATE_LIMIT_STORAGE_URL points at Redis but the redis package is not installed")
+        self.client = redis.Redis.from_url(url)
+        self._script = self.client.register_script(self.SCRIPT)
+        self._slot_script = self.client.register_script(self.SLOT_SCRIPT)
+
+    def apply(self, key, now, cost, emission_interval, tolerance, force=False):
+        allowed, tat = self._script(
+            keys=[f"rate_limit:{key}"],
+            args=[now, cost, emission_interval, tolerance, '1' if force else '0']
+        )
+        return bool(allowed), float(tat)
+
+    def acquire_slot(self, key, token, limit, now, lease):
+        return bool(self._slot_script(
+            keys=[f"concurrency:{key}"], args=[now, limit, now + lease, token, lease]
+        ))
+
+    def release_slot(self, key, token):
+        self.client.zrem(f"concurrency:{key}", token)
+
+    def slots_in_use(self, key, now):
+        return self.client.zcount(f"concurrency:{key}", f"({now}", "+inf")
+
+    def clear(self):
+        for pattern in ("rate_limit:*", "concurrency:*"):
+            for key in self.client.scan_iter(pattern):
+                self.client.delete(key)
+
+
+def create_backend(url):
+    if url == 'memory':
+        return MemoryBackend()
+    if url.startswith('sqlite:///'):
+        return SQLiteBackend(url[len('sqlite:///'):])
+    if url.startswith(('redis://', 'rediss://')):
+        return RedisBackend(url)
+    raise ValueError(f"Unsupported rate limit storage: {url}")
+
+
+class RateLimiter:
+    """Token bucket limits (as GCRA) on top of a pluggable state backend."""
+
+    def __init__(self, backend=None, timer=time.time):
+        self._backend = backend
+        self._timer = timer
+
+    @property
+    def backend(self):
+        # Created on first use so worker processes open their own connections
+        if self._backend is None:
+            self._backend = create_backend(RATE_LIMIT_STORAGE_URL)
+        return self._backend
+
+    def hit(self, key, limit, period, burst=None, cost=1, force=False):
+        """Spend `cost` from the bucket for key.
+
+        The bucket refills at limit/period per second and holds up to burst
+        (default limit). With force the cost is charged even when the bucket
+        runs dry, which is how usage measured after the fact is billed.
+        Backend failures let the request through.
+        """
+        burst = burst or limit
+        emission_interval = period / limit
+        tolerance = emission_interval * burst
+        now = self._timer()
+        try:
+            allowed, tat = self.backend.apply(key, now, cost, emission_interval, tolerance, force)
+        except Exception as e:
+            print(f"Rate limit backend unavailable, allowing request: {str(e)}")
+            return RateLimitResult(True, burst, burst, 0, 0)
+
+        # The epsilon keeps float error from rounding a whole request away
+        remaining = max(int((tolerance - (tat - now)) / emission_interval + 1e-9), 0)
+        reset_after = max(tat - now, 0)
+        retry_after = 0 if allowed else max(tat + emission_interval * cost - tolerance - now, 0)
+        return RateLimitResult(allowed, burst, remaining, reset_after, retry_after)
+
+
+limiter = RateLimiter()
+
+
+def default_identity():
+    """Authenticated user id when token_required already ran, the client address otherwise."""
+    user = getattr(request, 'user', None)
+    if user and user.get('user_id') is not None:
+        return f"user:{user['user_id']}"
+    return f"ip:{request.remote_addr}"
+
+
+def rate_limit(limit, period, burst=None, identity=default_identity, scope=None):
+    """Limit a route to `limit` requests per `period` seconds for each caller.
+
+    Works on any route. Callers are identified by `identity` (user id or
+    client address by default) and limits are kept per route unless routes
+    share a scope. Responses carry RateLimit-* headers; rejected requests get
+    429 with Retry-After.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            if not RATE_LIMIT_ENABLED:
+                return f(*args, **kwargs)
+
+            key = f"{scope or request.endpoint}:{identity()}"
+            result = limiter.hit(key, limit, period, burst=burst)
+            if not result.allowed:
+                return jsonify({
+                    "error": "Rate limit exceeded. Try again later.",
+                    "retry_after": math.ceil(result.retry_after)
+                }), 429, result.headers(period)
+
+            response = make_response(f(*args, **kwargs))
+            response.headers.extend(result.headers(period))
+            return response
+        return decorated
+    return decorator
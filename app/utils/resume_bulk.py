@@ -0,0 +1,199 @@
+import datetime
+import json
+import os
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from app.extensions import db
+from app.models.temp import Resume, ResumeVersion
+from app.utils import resume_history
+from app.utils.resume_serial import allocate_resume_serial
+
+# Rows fetched per round trip while exporting, and inserted per commit while importing
+EXPORT_BATCH_SIZE = int(os.getenv('BULK_EXPORT_BATCH_SIZE', '500'))
+IMPORT_BATCH_SIZE = int(os.getenv('BULK_IMPORT_BATCH_SIZE', '500'))
+# At most this many line errors are returned; the count is always exact
+MAX_REPORTED_ERRORS = 1000
+
+TITLE_MAX_LENGTH = Resume.__table__.c.title.type.length
+
+
+def export_lines(user_ids=None, batch_size=None):
+    """Yield one NDJSON line per resume, streamed from a server-side cursor.
+
+    Only batch_size rows are held in memory at a time. user_ids limits the
+    export to those users; None exports every resume.
+    """
+    query = select(
+        Resume.user_id,
+        Resume.serial_number,
+        Resume.title,
+        Resume.template,
+        Resume.parsed_resume,
+        Resume.created_at,
+        Resume.updated_at
+    ).order_by(Resume.user_id, Resume.serial_number)
+    if user_ids is not None:
+        query = query.where(Resume.user_id.in_(user_ids))
+
+    result = db.session.execute(query.execution_options(yield_per=batch_size or EXPORT_BATCH_SIZE))
+    for row in result:
+        yield json.dumps({
+            "user_id": row.user_id,
+            "resume_id": row.serial_number,
+            "title": row.title,
+            "template": row.template,
+            "resume": row.parsed_resume,
+            "created_at": row.created_at.isoformat(),
+            "updated_at": row.updated_at.isoformat()
+        }, separators=(',', ':')) + "\n"
+
+
+def _parse_line(raw, now, user_id=None):
+    """Validate one import line; returns (owner user id, resume values) or raises ValueError."""
+    try:
+        item = json.loads(raw)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON: {str(e)}")
+    if not isinstance(item, dict):
+        raise ValueError("Line must be a JSON object")
+
+    owner_id = user_id if user_id is not None else item.get('user_id')
+    if not isinstance(owner_id, int):
+        raise ValueError("user_id is required")
+
+    title = item.get('title')
+    if not isinstance(title, str) or not title.strip():
+        raise ValueError("title is required")
+    if len(title) > TITLE_MAX_LENGTH:
+        raise ValueError(f"title must be at most {TITLE_MAX_LENGTH} characters")
+    if not isinstance(item.get('resume'), dict):
+        raise ValueError("resume must be a JSON object")
+    template = item.get('template', 1)
+    if not isinstance(template, int):
+        raise ValueError("template must be an integer")
+
+    created_at = now
+    if item.get('created_at'):
+        try:
+            created_at = datetime.datetime.fromisoformat(item['created_at'])
+        except (TypeError, ValueError):
+            raise ValueError("created_at must be an ISO 8601 timestamp")
+
+    return owner_id, {
+        'title': title,
+        'parsed_resume': item['resume'],
+        'template': template,
+        'created_at': created_at,
+        'updated_at': now
+    }
+
+
+def _insert_batch(user_id, batch):
+    """Insert parsed rows for a user with one serial allocation and one executemany."""
+    first_serial = allocate_resume_serial(user_id, count=len(batch))
+    rows = [
+        dict(values, user_id=user_id, serial_number=first_serial + offset,
+             version=1 if resume_history.HISTORY_ENABLED else 0)
+        for offset, (line_number, values) in enumerate(batch)
+    ]
+    db.session.execute(insert(Resume), rows)
+    if resume_history.HISTORY_ENABLED:
+        db.session.execute(insert(ResumeVersion), [{
+            'user_id': user_id,
+            'resume_serial': row['serial_number'],
+            'version': 1,
+            'is_snapshot': True,
+            'payload': row['parsed_resume'],
+            'created_at': row['updated_at']
+        } for row in rows])
+
+
+class ImportReport:
+    """Outcome of an import: rows imported and per-line errors."""
+
+    def __init__(self):
+        self.imported = 0
+        self.error_count = 0
+        self.errors = []
+
+    def add_error(self, line_number, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line_number, "error": message})
+
+    def to_dict(self):
+        return {"imported": self.imported, "error_count": self.error_count, "errors": self.errors}
+
+
+def import_lines(user_id, lines, batch_size=None):
+    """Import NDJSON resume lines in batched inserts, committing each batch.
+
+    Resumes are imported for user_id, or for the "user_id" on each line when
+    user_id is None (moving an export between deployments). Lines that fail
+    validation, or whose title the user already has, are reported by line
+    number and skipped; the rest are imported. A batch that collides with a
+    concurrent save is retried row by row so only the conflicting lines fail.
+    """
+    batch_size = batch_size or IMPORT_BATCH_SIZE
+    report = ImportReport()
+    now = datetime.datetime.utcnow()
+    # Titles are unique per user; load them once per user instead of checking every line
+    titles = {}
+    batches = {}
+
+    def flush(owner_id):
+        batch = batches.pop(owner_id, [])
+        if not batch:
+            return
+        try:
+            _insert_batch(owner_id, batch)
+            db.session.commit()
+            report.imported += len(batch)
+        except IntegrityError:
+            db.session.rollback()
+            for line_number, values in batch:
+                try:
+                    _insert_batch(owner_id, [(line_number, values)])
+                    db.session.commit()
+                    report.imported += 1
+                except IntegrityError:
+                    db.session.rollback()
+                    report.add_error(line_number, "A resume with this title already exists")
+                except Exception as e:
+                    db.session.rollback()
+                    report.add_error(line_number, str(e))
+        except Exception as e:
+            db.session.rollback()
+            for line_number, values in batch:
+                report.add_error(line_number, str(e))
+
+    for line_number, raw in enumerate(lines, start=1):
+        if isinstance(raw, bytes):
+            raw = raw.decode('utf-8', errors='replace')
+        if not raw.strip():
+            continue
+        try:
+            owner_id, values = _parse_line(raw, now, user_id)
+        except ValueError as e:
+            report.add_error(line_number, str(e))
+            continue
+
+        if owner_id not in titles:
+            titles[owner_id] = set(db.session.execute(
+                select(Resume.title).where(Resume.user_id == owner_id)
+            ).scalars())
+        if values['title'] in titles[owner_id]:
+            report.add_error(line_number, "A resume with this title already exists")
+            continue
+        titles[owner_id].add(values['title'])
+
+        # Exports are ordered by user, so a new owner means the previous one is complete
+        for previous_owner in [key for key in batches if key != owner_id]:
+            flush(previous_owner)
+        batches.setdefault(owner_id, []).append((line_number, values))
+        if len(batches[owner_id]) >= batch_size:
+            flush(owner_id)
+
+    for owner_id in list(batches):
+        flush(owner_id)
+    return report
@@ -0,0 +1,145 @@
+import datetime
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from app.extensions import db
+from app.models.temp import Resume, ResumeVersion
+from app.utils.json_patch import make_patch, apply_patch
+
+# Record a version for every resume save
+HISTORY_ENABLED = os.getenv('RESUME_HISTORY_ENABLED', '1') == '1'
+# A full snapshot is stored every N versions, so materializing applies at most N - 1 patches
+SNAPSHOT_INTERVAL = max(1, int(os.getenv('RESUME_SNAPSHOT_INTERVAL', '20')))
+# Record versions on a background thread after the save has returned
+HISTORY_ASYNC = os.getenv('RESUME_HISTORY_ASYNC', '1') == '1'
+
+_history_executor = None
+
+
+def _size(value):
+    return len(json.dumps(value, separators=(',', ':')))
+
+
+def _add_version(user_id, resume_serial, version, is_snapshot, payload):
+    db.session.add(ResumeVersion(
+        user_id=user_id,
+        resume_serial=resume_serial,
+        version=version,
+        is_snapshot=is_snapshot,
+        payload=payload,
+        created_at=datetime.datetime.utcnow()
+    ))
+
+
+def record_saved_version(user_id, title):
+    """Add the history entry for a resume's saved content and return its version, or None.
+
+    Runs after the save has committed, so the save itself stays a single
+    upsert that bumps the row's version. The content it replaced is rebuilt
+    from history, and the new version is a JSON patch against it, or a full
+    snapshot at the start of every SNAPSHOT_INTERVAL block or when the patch
+    would not be smaller. Saves that land before this runs are recorded as
+    one version. Commits.
+    """
+    resume = db.session.execute(
+        select(Resume.serial_number, Resume.version, Resume.parsed_resume)
+        .where(Resume.user_id == user_id, Resume.title == title)
+    ).first()
+    if resume is None:
+        return None
+    latest = db.session.execute(
+        select(db.func.max(ResumeVersion.version))
+        .where(ResumeVersion.user_id == user_id, ResumeVersion.resume_serial == resume.serial_number)
+    ).scalar() or 0
+    if latest >= resume.version:
+        return None
+
+    previous = materialize_version(user_id, resume.serial_number, latest) if latest else None
+    patch = make_patch(previous, resume.parsed_resume) if previous is not None else None
+    starts_block = (resume.version - 1) // SNAPSHOT_INTERVAL != (latest - 1) // SNAPSHOT_INTERVAL
+    if previous is None or starts_block or _size(patch) >= _size(resume.parsed_resume):
+        _add_version(user_id, resume.serial_number, resume.version, True, resume.parsed_resume)
+    else:
+        _add_version(user_id, resume.serial_number, resume.version, False, patch)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Another worker recorded this version first
+        db.session.rollback()
+        return None
+    return resume.version
+
+
+def _record_in_background(app, user_id, title):
+    with app.app_context():
+        try:
+            record_saved_version(user_id, title)
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error recording resume history: {str(e)}")
+        finally:
+            db.session.remove()
+
+
+def schedule_history(user_id, title):
+    """Record the history entry for a committed save, in the background unless disabled."""
+    if not HISTORY_ENABLED:
+        return None
+    if not HISTORY_ASYNC:
+        return record_saved_version(user_id, title)
+    global _history_executor
+    if _history_executor is None:
+        # One worker keeps a resume's versions recorded in save order
+        _history_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='resume-history')
+    app = current_app._get_current_object()
+    return _history_executor.submit(_record_in_background, app, user_id, title)
+
+
+def list_versions(user_id, resume_serial, limit, before=None):
+    """Newest-first version metadata for a resume, without the payloads."""
+    query = (
+        select(ResumeVersion.version, ResumeVersion.is_snapshot, ResumeVersion.created_at)
+        .where(ResumeVersion.user_id == user_id, ResumeVersion.resume_serial == resume_serial)
+    )
+    if before is not None:
+        query = query.where(ResumeVersion.version < before)
+    return db.session.execute(query.order_by(ResumeVersion.version.desc()).limit(limit)).all()
+
+
+def materialize_version(user_id, resume_serial, version):
+    """Rebuild a resume as it was at a version, or None if that version does not exist.
+
+    Loads the nearest snapshot at or before the version plus the patches
+    after it, in a single query.
+    """
+    snapshot_version = (
+        select(db.func.max(ResumeVersion.version))
+        .where(
+            ResumeVersion.user_id == user_id,
+            ResumeVersion.resume_serial == resume_serial,
+            ResumeVersion.is_snapshot.is_(True),
+            ResumeVersion.version <= version
+        )
+        .scalar_subquery()
+    )
+    rows = db.session.execute(
+        select(ResumeVersion.version, ResumeVersion.is_snapshot, ResumeVersion.payload)
+        .where(
+            ResumeVersion.user_id == user_id,
+            ResumeVersion.resume_serial == resume_serial,
+            ResumeVersion.version >= snapshot_version,
+            ResumeVersion.version <= version
+        )
+        .order_by(ResumeVersion.version)
+    ).all()
+    if not rows or rows[-1].version != version:
+        return None
+
+    document = rows[0].payload
+    for row in rows[1:]:
+        # Payloads are freshly deserialized, so patching in place is safe
+        document = apply_patch(document, row.payload, in_place=True)
+    return document
@@ -0,0 +1,39 @@
+from sqlalchemy import select, update
+from app.extensions import db
+from app.models.temp import User
+
+# Attempts for a save that collides with a concurrent write
+SAVE_RETRIES = 3
+
+
+def allocate_resume_serial(user_id, count=1):
+    """Atomically reserve the next serial number(s) for a user's resumes.
+
+    Bumps the per-user counter in a single UPDATE. Where the database supports
+    UPDATE ... RETURNING the new value comes back in the same round trip;
+    otherwise (MySQL) the UPDATE holds the row lock until commit, so reading
+    the counter back in the same transaction is still race free.
+    Returns the first reserved serial number. Serial numbers are never reused,
+    even after a resume is deleted.
+    """
+    stmt = (
+        update(User)
+        .where(User.id == user_id)
+        .values(last_resume_serial=User.last_resume_serial + count)
+        .execution_options(synchronize_session=False)
+    )
+
+    dialect = db.session.get_bind(mapper=User.__mapper__).dialect
+    if dialect.update_returning:
+        last_serial = db.session.execute(stmt.returning(User.last_resume_serial)).scalar()
+    else:
+        result = db.session.execute(stmt)
+        last_serial = None
+        if result.rowcount:
+            last_serial = db.session.execute(
+                select(User.last_resume_serial).where(User.id == user_id)
+            ).scalar()
+
+    if last_serial is None:
+        raise Exception("User not found")
+    return last_serial - count + 1
@@ -0,0 +1,74 @@
+import datetime
+from sqlalchemy import case, insert, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from app.extensions import db
+from app.models.temp import Resume
+from app.utils.resume_serial import allocate_resume_serial
+from app.utils import resume_history
+
+# Columns overwritten when a resume with the same (user_id, title) is saved again
+UPSERT_COLUMNS = ('parsed_resume', 'template', 'updated_at')
+
+
+def _version_bump(new_content):
+    """Version assignment that advances only when the stored content changes."""
+    return case((Resume.parsed_resume == new_content, Resume.version), else_=Resume.version + 1)
+
+
+def _insert_on_conflict_update(dialect_name, values, history):
+    """Build a native INSERT that updates the existing row on a (user_id, title) conflict."""
+    # MySQL evaluates assignments left to right, so version is compared before content changes
+    if dialect_name in ('postgresql', 'sqlite'):
+        dialect_insert = postgresql.insert if dialect_name == 'postgresql' else sqlite.insert
+        stmt = dialect_insert(Resume).values(**values)
+        assignments = [(column, stmt.excluded[column]) for column in UPSERT_COLUMNS]
+        if history:
+            assignments.insert(0, ('version', _version_bump(stmt.excluded.parsed_resume)))
+        return stmt.on_conflict_do_update(index_elements=['user_id', 'title'], set_=dict(assignments))
+    if dialect_name in ('mysql', 'mariadb'):
+        stmt = mysql.insert(Resume).values(**values)
+        assignments = [(column, stmt.inserted[column]) for column in UPSERT_COLUMNS]
+        if history:
+            assignments.insert(0, ('version', _version_bump(stmt.inserted.parsed_resume)))
+        return stmt.on_duplicate_key_update(assignments)
+    # No native upsert; a racing insert surfaces as an IntegrityError for the caller to retry
+    return insert(Resume).values(**values)
+
+
+def upsert_resume(user_id, title, resume_data, template=1):
+    """Insert or update a user's resume by title without a check-then-act race.
+
+    Saving an existing title (the autosave case) is a single UPDATE. Only when
+    no row matched is a serial number allocated and a native upsert issued,
+    which also absorbs a concurrent insert of the same title from another tab.
+
+    With resume history enabled the same statement advances the row's version
+    when the content changes; resume_history.schedule_history records the
+    version once the caller has committed. The caller commits.
+    """
+    now = datetime.datetime.utcnow()
+    history = resume_history.HISTORY_ENABLED
+    assignments = [('parsed_resume', resume_data), ('template', template), ('updated_at', now)]
+    if history:
+        assignments.insert(0, ('version', _version_bump(resume_data)))
+    result = db.session.execute(
+        update(Resume)
+        .where(Resume.user_id == user_id, Resume.title == title)
+        .ordered_values(*assignments)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount:
+        return
+
+    row = {
+        'user_id': user_id,
+        'serial_number': allocate_resume_serial(user_id),
+        'title': title,
+        'parsed_resume': resume_data,
+        'template': template,
+        'version': 1 if history else 0,
+        'created_at': now,
+        'updated_at': now
+    }
+    dialect_name = db.session.get_bind(mapper=Resume.__mapper__).dialect.name
+    db.session.execute(_insert_on_conflict_update(dialect_name, row, history))
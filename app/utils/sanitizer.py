@@ -0,0 +1,56 @@
+import os
+import re
+from functools import lru_cache
+import bleach
+
+# Distinct strings whose cleaned form is remembered per process
+SANITIZE_CACHE_SIZE = int(os.getenv('SANITIZE_CACHE_SIZE', '50000'))
+
+# Characters bleach.clean may change: markup, plus the carriage returns, control
+# characters, surrogates and noncharacters its HTML tokenizer normalizes.
+# A string without any of them comes back from bleach unchanged.
+_NEEDS_CLEANING = re.compile('[<>&\x00-\x08\x0b-\x1f\x7f-\x9f\ud800-\udfff\ufdd0-\ufdef\ufffe\uffff]')
+
+
+@lru_cache(maxsize=SANITIZE_CACHE_SIZE)
+def _bleach_clean(text):
+    return bleach.clean(text, strip=True)
+
+
+def clean_text(text):
+    """bleach.clean(text, strip=True), skipping bleach for plain text and memoizing the rest."""
+    if not _NEEDS_CLEANING.search(text):
+        return text
+    return _bleach_clean(text)
+
+
+def sanitize(data, fields=None, in_place=False):
+    """Strip markup from every string in a JSON-like tree.
+
+    fields, when given, is the set of dict keys worth keeping (see
+    SiteTemplateRegistry.rendered_fields); other keys are dropped without
+    being cleaned. With in_place the dicts and lists of data are updated
+    and returned instead of copied.
+    """
+    if isinstance(data, str):
+        return clean_text(data)
+    if isinstance(data, dict):
+        if not in_place:
+            return {
+                key: sanitize(value, fields)
+                for key, value in data.items()
+                if fields is None or key in fields
+            }
+        for key in list(data):
+            if fields is not None and key not in fields:
+                del data[key]
+            else:
+                data[key] = sanitize(data[key], fields, in_place=True)
+        return data
+    if isinstance(data, list):
+        if not in_place:
+            return [sanitize(item, fields) for item in data]
+        for index, item in enumerate(data):
+            data[index] = sanitize(item, fields, in_place=True)
+        return data
+    return data
@@ -0,0 +1,240 @@
+import re
+from collections import Counter
+from statistics import median
+
+# Canonical section labels (matching RESUME_TEMPLATE keys) and the headings that map to them
+SECTION_HEADINGS = {
+    'summary': ['summary', 'professional summary', 'profile', 'professional profile',
+                'about me', 'objective', 'career objective'],
+    'workExperience': ['experience', 'work experience', 'professional experience',
+                       'employment', 'employment history', 'work history', 'career history'],
+    'education': ['education', 'academic background', 'education and training'],
+    'skills': ['skills', 'technical skills', 'key skills', 'core competencies',
+               'competencies', 'skills and abilities', 'technologies'],
+    'projects': ['projects', 'personal projects', 'selected projects', 'key projects'],
+    'awards': ['awards', 'honors', 'honours', 'awards and honors', 'achievements',
+               'accomplishments'],
+    'certifications': ['certifications', 'certificates', 'licenses and certifications',
+                       'licenses & certifications'],
+    'publications': ['publications'],
+    'volunteering': ['volunteering', 'volunteer experience', 'volunteer work'],
+    'references': ['references'],
+}
+
+# Lines before the first recognised heading (name, contact details, ...)
+HEADER_SECTION = 'header'
+
+_HEADING_LOOKUP = {
+    alias: label
+    for label, aliases in SECTION_HEADINGS.items()
+    for alias in aliases
+}
+
+_BOLD_FONT_MARKERS = ('bold', 'black', 'heavy', 'semibold', 'demi')
+_MAX_HEADING_WORDS = 5
+# A line this many times the usual line spacing below the previous one is set apart
+_SECTION_GAP_RATIO = 1.5
+# Points a line may start right of the page's left margin and still count as flush
+_MARGIN_TOLERANCE = 2.0
+
+
+def _normalize_heading(text):
+    """Lowercase a candidate heading and strip decoration such as colons."""
+    text = re.sub(r'[:|•\-_]+', ' ', text.lower())
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def _is_bold(font_dict):
+    """Check whether a pypdf font dictionary describes a bold face."""
+    if not font_dict:
+        return False
+    base_font = str(font_dict.get('/BaseFont', '')).lower()
+    return any(marker in base_font for marker in _BOLD_FONT_MARKERS)
+
+
+def _collect_fragments(page, page_number, fragments):
+    """Extract page text while recording position, size and weight of each fragment."""
+    def visitor(text, cm, tm, font_dict, font_size):
+        if not text:
+            return
+        # Apply the current transformation matrix to the text matrix origin
+        x = tm[4] * cm[0] + tm[5] * cm[2] + cm[4]
+        y = tm[4] * cm[1] + tm[5] * cm[3] + cm[5]
+        scale = abs(tm[3] * cm[3]) or 1.0
+        fragments.append({
+            'page': page_number,
+            'x': x,
+            'y': y,
+            'size': round((font_size or 0) * scale, 1),
+            'bold': _is_bold(font_dict),
+            'text': text,
+        })
+
+    return page.extract_text(visitor_text=visitor)
+
+
+def _group_lines(fragments):
+    """Merge fragments into lines, following the order pypdf emitted them in.
+
+    The fragments concatenate to exactly the flat extracted text, so lines keep
+    the spacing pypdf inferred while carrying the font size and weight of the
+    text they contain.
+    """
+    lines = []
+    current = None
+    for fragment in fragments:
+        pieces = fragment['text'].split('\n')
+        for index, piece in enumerate(pieces):
+            if index > 0 or (current and current['page'] != fragment['page']):
+                lines.append(current)
+                current = None
+            if current is None:
+                current = {'page': fragment['page'], 'x': None, 'y': fragment['y'], 'size': 0,
+                           'bold': True, 'text': ''}
+            current['text'] += piece
+            if piece.strip():
+                if current['x'] is None:
+                    # Where the line's first visible text starts
+                    current['x'], current['y'] = fragment['x'], fragment['y']
+                current['size'] = max(current['size'], fragment['size'])
+                current['bold'] = current['bold'] and fragment['bold']
+    lines.append(current)
+
+    result = []
+    for line in lines:
+        if line and line['text'].strip():
+            line['text'] = re.sub(r'\s+', ' ', line['text']).strip()
+            result.append(line)
+    return result
+
+
+def _body_font_size(lines):
+    """Most common font size weighted by characters, i.e. the body text size."""
+    sizes = Counter()
+    for line in lines:
+        sizes[line['size']] += len(line['text'])
+    return sizes.most_common(1)[0][0] if sizes else 0
+
+
+def _annotate_layout(lines):
+    """Mark lines set apart by a larger gap above them and lines indented from the margin.
+
+    PDF y coordinates grow upwards, so the gap to the previous line on the
+    same page is its y minus this line's y. Lines without coordinates are
+    treated as flush and not set apart.
+    """
+    margins = {}
+    for line in lines:
+        if line.get('x') is not None:
+            margins[line['page']] = min(margins.get(line['page'], line['x']), line['x'])
+
+    gaps = []
+    previous = None
+    for line in lines:
+        gap = None
+        if previous is not None and previous['page'] == line['page'] and line.get('y') is not None:
+            gap = previous['y'] - line['y']
+        line['gap'] = gap
+        previous = line if line.get('y') is not None else None
+        if gap and gap > 0:
+            gaps.append(gap)
+    usual_gap = median(gaps) if gaps else 0
+
+    for line in lines:
+        line['set_apart'] = bool(usual_gap and line['gap'] and line['gap'] >= usual_gap * _SECTION_GAP_RATIO)
+        margin = margins.get(line['page'])
+        line['indented'] = line.get('x') is not None and line['x'] > margin + _MARGIN_TOLERANCE
+
+
+def classify_heading(line, body_size):
+    """Return the section label for a heading line, or None for regular text."""
+    text = line['text']
+    normalized = _normalize_heading(text)
+    label = _HEADING_LOOKUP.get(normalized)
+    if not label or len(normalized.split()) > _MAX_HEADING_WORDS:
+        return None
+
+    # Known heading text must also look like a heading: set in a heading font, or
+    # flush with the left margin and either spaced off or explicitly marked
+    font_styled = line.get('bold') or (body_size and line.get('size', 0) >= body_size * 1.15)
+    marked = (
+        (text.isupper() and len(text) > 2)
+        or text.rstrip().endswith(':')
+        or line.get('set_apart')
+    )
+    return label if font_styled or (marked and not line.get('indented')) else None
+
+
+def segment_lines(lines):
+    """Split visual lines into labelled sections.
+
+    Returns a dict mapping section labels to the text under each heading.
+    Text above the first heading is stored under HEADER_SECTION.
+    """
+    body_size = _body_font_size(lines)
+    _annotate_layout(lines)
+    sections = {}
+    current = HEADER_SECTION
+    for line in lines:
+        label = classify_heading(line, body_size)
+        if label:
+            current = label
+            sections.setdefault(current, [])
+            continue
+        sections.setdefault(current, []).append(line['text'])
+    return {label: '\n'.join(body) for label, body in sections.items()}
+
+
+def extract_page(page, page_number):
+    """Extract the flat text and styled lines of a single page."""
+    fragments = []
+    page_text = _collect_fragments(page, page_number, fragments)
+    return page_text, _group_lines(fragments)
+
+
+def segment_reader(reader):
+    """Extract flat text and a section map from a pypdf reader in a single pass."""
+    lines = []
+    extracted_text = ""
+    for page_number, page in enumerate(reader.pages):
+        page_text, page_lines = extract_page(page, page_number)
+        lines.extend(page_lines)
+        if page_text:
+            extracted_text += page_text + "\n"
+    return extracted_text, segment_lines(lines)
+
+
+def extract_skills(sections):
+    """Pull a skill list out of the skills section without calling the LLM."""
+    text = sections.get('skills', '')
+    skills = []
+    seen = set()
+    for line in text.split('\n'):
+        # Drop category prefixes such as "Languages: Python, Go"
+        if ':' in line:
+            line = line.split(':', 1)[1]
+        for item in re.split(r'[,;|•·●▪]|\s{2,}|\s/\s', line):
+            item = item.strip(' .-\t')
+            if not item or len(item) > 50:
+                continue
+            key = item.lower()
+            if key not in seen:
+                seen.add(key)
+                skills.append(item)
+    return skills
+
+
+def sections_text(sections, exclude=()):
+    """Rebuild resume text from segmented sections, each under its canonical heading.
+
+    The headings let the LLM tell experience, education and the rest apart.
+    """
+    blocks = []
+    for label, text in sections.items():
+        if label in exclude:
+            continue
+        if label == HEADER_SECTION:
+            blocks.append(text)
+        else:
+            blocks.append(f"{SECTION_HEADINGS[label][0].upper()}\n{text}")
+    return "\n\n".join(blocks)
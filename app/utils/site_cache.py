@@ -0,0 +1,108 @@
+import gzip
+import hashlib
+import os
+from flask import Response, request
+from app.utils.lru_cache import TTLCache
+
+try:
+    import brotli
+except ImportError:  # Brotli variants are optional; gzip is always available
+    brotli = None
+
+# Cache-Control sent with served sites
+SITE_CACHE_CONTROL = os.getenv('SITE_CACHE_CONTROL', 'public, max-age=300')
+# Hot sites kept in this process; a regeneration invalidates the local copy
+# immediately, other workers pick it up once theirs expires
+SITE_CACHE_SIZE = int(os.getenv('SITE_CACHE_SIZE', '1000'))
+SITE_CACHE_TTL = float(os.getenv('SITE_CACHE_TTL', '60'))
+
+# Preferred first when the client accepts both equally
+ENCODINGS = ('br', 'gzip')
+
+
+def encode_site(html):
+    """ETag and precompressed bodies for a page, computed once when it is generated."""
+    body = html.encode('utf-8')
+    return {
+        'etag': hashlib.sha256(body).hexdigest(),
+        # mtime=0 keeps the output identical for identical pages
+        'html_gzip': gzip.compress(body, compresslevel=9, mtime=0),
+        'html_brotli': brotli.compress(body, quality=11) if brotli is not None else None
+    }
+
+
+class CachedSite:
+    """A site's ETag and response bodies by content coding."""
+
+    __slots__ = ('etag', 'bodies')
+
+    def __init__(self, etag, bodies):
+        self.etag = etag
+        self.bodies = bodies
+
+    @property
+    def encodings(self):
+        return self.bodies.keys()
+
+    def body_response(self, encoding):
+        return Response(self.bodies[encoding], mimetype='text/html')
+
+    @classmethod
+    def from_row(cls, site):
+        html_gzip, html_brotli, etag = site.html_gzip, site.html_brotli, site.etag
+        if etag is None or html_gzip is None:
+            # Sites generated before variants were stored
+            encoded = encode_site(site.html_content)
+            html_gzip, html_brotli, etag = encoded['html_gzip'], encoded['html_brotli'], encoded['etag']
+        bodies = {'identity': site.html_content.encode('utf-8'), 'gzip': html_gzip}
+        if html_brotli is not None:
+            bodies['br'] = html_brotli
+        return cls(etag, bodies)
+
+
+_sites = TTLCache(maxsize=SITE_CACHE_SIZE, ttl=SITE_CACHE_TTL)
+
+
+def get_cached_site(subdomain):
+    return _sites.get(subdomain.lower())
+
+
+def cache_site(subdomain, entry):
+    _sites.set(subdomain.lower(), entry)
+    return entry
+
+
+def invalidate_site(subdomain):
+    _sites.delete(subdomain.lower())
+
+
+def clear_site_cache():
+    _sites.clear()
+
+
+def _choose_encoding(encodings):
+    best, best_quality = 'identity', 0
+    for encoding in ENCODINGS:
+        quality = request.accept_encodings[encoding]
+        if encoding in encodings and quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def site_response(entry):
+    """Response for a site entry, honouring If-None-Match and Accept-Encoding.
+
+    entry is a CachedSite or a site_store.StoredSite.
+    """
+    if request.if_none_match.contains_weak(entry.etag):
+        response = Response(status=304)
+    else:
+        encoding = _choose_encoding(entry.encodings)
+        response = entry.body_response(encoding)
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+    # Weak, since one tag covers every content coding of the page
+    response.set_etag(entry.etag, weak=True)
+    response.headers['Cache-Control'] = SITE_CACHE_CONTROL
+    response.vary.add('Accept-Encoding')
+    return response
@@ -0,0 +1,176 @@
+import datetime
+import os
+import threading
+import time
+from sqlalchemy import func, select
+from werkzeug.exceptions import NotFound
+from app.extensions import db
+from app.models.temp import UserSite
+from app.utils import site_store
+from app.utils.subdomain_utils import SITE_BASE_DOMAIN, is_valid_subdomain
+
+# Serve <subdomain>.SITE_BASE_DOMAIN requests as user sites without a proxy rewrite
+SITE_HOST_ROUTING = os.getenv('SITE_HOST_ROUTING', '1') == '1'
+# Seconds between checks for sites changed by other processes
+SITE_MAP_POLL_INTERVAL = float(os.getenv('SITE_MAP_POLL_INTERVAL', '5'))
+# Changes committed this long before the newest one seen are re-read, covering
+# transactions that commit out of updated_at order
+SITE_MAP_POLL_OVERLAP = datetime.timedelta(seconds=60)
+
+# environ key the middleware passes the mapped page hash to serve_site with
+SITE_ETAG_ENVIRON = 'resume.site_etag'
+SITE_PATHS = ('/', '/index.html')
+
+
+def site_subdomain(host):
+    """The user-site subdomain a Host header addresses, or None for any other host."""
+    host = host.split(':', 1)[0].rstrip('.').lower()
+    suffix = '.' + SITE_BASE_DOMAIN
+    if not host.endswith(suffix):
+        return None
+    subdomain = host[:-len(suffix)]
+    # Reserved names (www, api, ...) and nested hosts belong to the application
+    if '.' in subdomain or not is_valid_subdomain(subdomain):
+        return None
+    return subdomain
+
+
+class SubdomainMap:
+    """Every site's subdomain mapped to the hash of the page it serves.
+
+    Loaded in full by warm() and kept fresh by poll(), which reads only sites
+    whose updated_at moved, and by update() when this process publishes a
+    page. Lookups are a dict access; the map is replaced or updated under a
+    lock and read without one.
+    """
+
+    def __init__(self, poll_interval=SITE_MAP_POLL_INTERVAL, timer=time.monotonic):
+        self.poll_interval = poll_interval
+        self._timer = timer
+        self._sites = {}
+        self._version = None
+        self._next_poll = 0.0
+        self._lock = threading.Lock()
+        self.loaded = False
+
+    def __contains__(self, subdomain):
+        return subdomain in self._sites
+
+    def get(self, subdomain):
+        """Page hash for a subdomain (None for sites stored before hashes were)."""
+        return self._sites.get(subdomain)
+
+    def update(self, subdomain, etag):
+        with self._lock:
+            self._sites[subdomain.lower()] = etag
+
+    def warm(self):
+        """Load every site; needs an app context."""
+        rows = db.session.execute(
+            select(func.lower(UserSite.subdomain), UserSite.etag, UserSite.updated_at)
+        ).all()
+        with self._lock:
+            self._sites = {subdomain: etag for subdomain, etag, _ in rows}
+            self._version = max((row.updated_at for row in rows if row.updated_at), default=None)
+            self._next_poll = self._timer() + self.poll_interval
+            self.loaded = True
+        return len(rows)
+
+    def poll(self):
+        """Pick up sites changed elsewhere; one indexed MAX() per interval when nothing changed.
+
+        Returns without waiting when another thread is already polling.
+        """
+        if self._timer() < self._next_poll or not self._lock.acquire(blocking=False):
+            return
+        try:
+            self._next_poll = self._timer() + self.poll_interval
+            latest = db.session.execute(select(func.max(UserSite.updated_at))).scalar()
+            if latest is None or latest == self._version:
+                return
+            query = select(func.lower(UserSite.subdomain), UserSite.etag)
+            if self._version is not None:
+                query = query.where(UserSite.updated_at >= self._version - SITE_MAP_POLL_OVERLAP)
+            for subdomain, etag in db.session.execute(query):
+                self._sites[subdomain] = etag
+            self._version = latest
+        finally:
+            self._lock.release()
+
+    def clear(self):
+        with self._lock:
+            self._sites = {}
+            self._version = None
+            self._next_poll = 0.0
+            self.loaded = False
+
+
+site_map = SubdomainMap()
+# Pages published by this process are routable immediately
+site_store.publish_listeners.append(site_map.update)
+
+
+class SiteHostMiddleware:
+    """WSGI middleware serving <subdomain>.SITE_BASE_DOMAIN requests as user sites.
+
+    The Host header is validated with is_valid_subdomain and looked up in
+    site_map before anything else; known sites are handed to serve_site with
+    their page hash, unknown ones get a 404. Neither touches the database
+    except for the periodic poll. Other hosts go to the application unchanged.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.wsgi_app = app.wsgi_app
+
+    def __call__(self, environ, start_response):
+        subdomain = site_subdomain(environ.get('HTTP_HOST', ''))
+        if subdomain is None:
+            return self.wsgi_app(environ, start_response)
+        if (environ.get('PATH_INFO') or '/') not in SITE_PATHS:
+            return NotFound()(environ, start_response)
+
+        with self.app.app_context():
+            try:
+                if not site_map.loaded:
+                    site_map.warm()
+                else:
+                    site_map.poll()
+            except Exception as e:
+                # Keep serving from the map we have
+                print(f"Site map refresh failed: {str(e)}")
+            finally:
+                db.session.remove()
+
+        if subdomain not in site_map:
+            # Published on this host by another worker since the last poll
+            store = site_store.get_site_store()
+            entry = store.lookup(subdomain) if store is not None else None
+            if entry is None:
+                return NotFound()(environ, start_response)
+            site_map.update(subdomain, entry.etag)
+
+        environ['PATH_INFO'] = f"/web/serve_site/{subdomain}"
+        environ[SITE_ETAG_ENVIRON] = site_map.get(subdomain)
+        return self.wsgi_app(environ, start_response)
+
+
+def init_site_routing(app):
+    """Route site hosts to serve_site; see SiteHostMiddleware."""
+    if SITE_HOST_ROUTING:
+        app.wsgi_app = SiteHostMiddleware(app)
+
+
+def warm_site_routing(app):
+    """Load the subdomain map before the first request, so it is not paid by a visitor."""
+    if not SITE_HOST_ROUTING:
+        return
+    with app.app_context():
+        try:
+            count = site_map.warm()
+            print(f"Site map warmed with {count} sites")
+        except Exception as e:
+            # The first site request retries
+            print(f"Site map warm-up failed: {str(e)}")
+        finally:
+            db.session.remove()
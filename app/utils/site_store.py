@@ -0,0 +1,178 @@
+import os
+import tempfile
+import time
+from flask import Response, send_file
+from app.utils.site_cache import encode_site, invalidate_site
+
+# 'local' keeps generated pages on disk, 'database' keeps them in user_sites
+SITE_STORE = os.getenv('SITE_STORE', 'local')
+SITE_STORE_PATH = os.getenv('SITE_STORE_PATH') or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'instance', 'site_store'
+)
+# Set once SITE_STORE_PATH is persistent storage shared by every app host; until
+# then each user_sites row also keeps its page, so losing the store loses nothing
+SITE_STORE_DURABLE = os.getenv('SITE_STORE_DURABLE', '0') == '1'
+# When set (e.g. /_sites/), serve_site answers with X-Accel-Redirect to this
+# internal nginx location mapped onto SITE_STORE_PATH/blobs/ instead of the body
+SITE_ACCEL_REDIRECT_PREFIX = os.getenv('SITE_ACCEL_REDIRECT_PREFIX')
+
+# File suffix of each stored content coding; nginx gzip_static/brotli_static
+# find the .gz/.br siblings of the .html file on their own
+SUFFIXES = {'identity': '.html', 'gzip': '.html.gz', 'br': '.html.br'}
+
+
+class StoredSite:
+    """A published page in the local store, served straight from its files."""
+
+    __slots__ = ('etag', 'encodings', '_store')
+
+    def __init__(self, store, etag, encodings):
+        self._store = store
+        self.etag = etag
+        self.encodings = encodings
+
+    def body_response(self, encoding):
+        if SITE_ACCEL_REDIRECT_PREFIX:
+            response = Response(mimetype='text/html')
+            response.headers['X-Accel-Redirect'] = SITE_ACCEL_REDIRECT_PREFIX + self._store.relative_path(self.etag, 'identity')
+            return response
+        # send_file hands the open file to the server's wsgi.file_wrapper (sendfile)
+        return send_file(self._store.path(self.etag, encoding), mimetype='text/html', etag=False, conditional=False)
+
+
+class LocalSiteStore:
+    """Generated pages on the local filesystem, addressed by the sha256 of their HTML.
+
+    blobs/ab/<sha256>.html (+ .gz / .br) hold page content and are never
+    rewritten; names/<subdomain> holds the hash a subdomain currently
+    serves. Every file is written to a temporary name and renamed into place,
+    so readers see either the old or the new file, never a partial one.
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def relative_path(self, etag, encoding):
+        return f"{etag[:2]}/{etag}{SUFFIXES[encoding]}"
+
+    def path(self, etag, encoding):
+        return os.path.join(self.root, 'blobs', self.relative_path(etag, encoding))
+
+    def _name_path(self, subdomain):
+        return os.path.join(self.root, 'names', subdomain.lower())
+
+    def _write_atomic(self, path, data):
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, path)
+        except Exception:
+            os.unlink(temp_path)
+            raise
+
+    def put(self, html, encoded=None):
+        """Write a page and its precompressed variants; returns the page hash."""
+        encoded = encoded or encode_site(html)
+        etag = encoded['etag']
+        bodies = {'identity': html.encode('utf-8'), 'gzip': encoded['html_gzip'], 'br': encoded['html_brotli']}
+        for encoding, body in bodies.items():
+            path = self.path(etag, encoding)
+            if body is None:
+                continue
+            try:
+                # Same hash, same content: an existing blob is already correct, but
+                # it is about to be served again, so prune's min_age must count from now
+                os.utime(path)
+            except FileNotFoundError:
+                self._write_atomic(path, body)
+        return etag
+
+    def publish(self, subdomain, etag):
+        """Point a subdomain at a stored page."""
+        self._write_atomic(self._name_path(subdomain), etag.encode('ascii'))
+
+    def unpublish(self, subdomain):
+        try:
+            os.unlink(self._name_path(subdomain))
+        except FileNotFoundError:
+            pass
+
+    def site(self, etag):
+        """StoredSite for a page hash, or None if the page is not in this store."""
+        if not os.path.exists(self.path(etag, 'identity')):
+            return None
+        if SITE_ACCEL_REDIRECT_PREFIX:
+            # The proxy picks the precompressed sibling itself
+            return StoredSite(self, etag, ('identity',))
+        encodings = tuple(encoding for encoding in SUFFIXES if os.path.exists(self.path(etag, encoding)))
+        return StoredSite(self, etag, encodings)
+
+    def read(self, etag):
+        """HTML of a stored page, or None if it is not in this store."""
+        try:
+            with open(self.path(etag, 'identity'), encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def lookup(self, subdomain):
+        """The StoredSite a subdomain serves, or None if it has not been published here."""
+        try:
+            with open(self._name_path(subdomain), 'rb') as f:
+                etag = f.read().decode('ascii')
+        except FileNotFoundError:
+            return None
+        return self.site(etag)
+
+    def prune(self, keep, min_age=3600):
+        """Delete blobs whose hash is not in keep and that are older than min_age seconds.
+
+        The age check leaves pages written by a generation that has not
+        committed yet alone. Returns the number of files deleted.
+        """
+        deleted = 0
+        cutoff = time.time() - min_age
+        for directory, _, files in os.walk(os.path.join(self.root, 'blobs')):
+            for name in files:
+                path = os.path.join(directory, name)
+                if name.split('.', 1)[0] in keep or os.path.getmtime(path) > cutoff:
+                    continue
+                os.unlink(path)
+                deleted += 1
+        return deleted
+
+
+_store = LocalSiteStore(SITE_STORE_PATH) if SITE_STORE == 'local' else None
+# Called with (subdomain, etag) whenever publish_site makes a page live
+publish_listeners = []
+
+
+def get_site_store():
+    """The configured store, or None when pages are kept in the database."""
+    return _store
+
+
+def check_site_store_config(app):
+    """Refuse to start outside debug and testing without an explicit SITE_STORE_PATH.
+
+    The default path inside the app directory does not survive a redeploy and
+    is not shared between hosts.
+    """
+    if SITE_STORE != 'local' or app.debug or app.testing:
+        return
+    if not os.getenv('SITE_STORE_PATH'):
+        raise Exception("SITE_STORE_PATH must point at a persistent volume (or set SITE_STORE=database)")
+
+
+def publish_site(subdomain, etag):
+    """Make a committed page live: point the store at it and drop this process's cached copy."""
+    if _store is not None and etag is not None:
+        _store.publish(subdomain, etag)
+    invalidate_site(subdomain)
+    for listener in publish_listeners:
+        listener(subdomain, etag)
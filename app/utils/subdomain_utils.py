@@ -1,8 +1,10 @@
+import os
 import re
 import random
 import string
 from app.models.temp import UserSite
 from app.extensions import db
+from sqlalchemy.exc import IntegrityError
 
 def sanitize_username(username):
     """Convert username to a valid subdomain."""
@@ -14,31 +16,86 @@ def sanitize_username(username):
     # Truncate if too long
     return sanitized[:50]  # Safe subdomain length
 
-def generate_unique_subdomain(user_id, username):
-    """Generate a unique subdomain for a user."""
-    base_subdomain = sanitize_username(username)
-    
-    # Check if base subdomain is available
-    subdomain = base_subdomain
-    existing = UserSite.query.filter_by(subdomain=subdomain).first()
-    
-    # If not available, add random suffix
-    if existing:
-        # Try up to 5 times with numbers
-        for i in range(1, 6):
-            subdomain = f"{base_subdomain}{i}"
-            if not UserSite.query.filter_by(subdomain=subdomain).first():
-                return subdomain
-        
-        # If still not unique, add random string
+# User sites are served at <subdomain>.SITE_BASE_DOMAIN
+SITE_BASE_DOMAIN = os.getenv('SITE_BASE_DOMAIN', 'resume.mintmelon.ca').lower()
+
+# Numbered candidates (base1, base2, ...) tried before a random suffix
+SUBDOMAIN_NUMBERED_CANDIDATES = 9
+# Inserts retried when a concurrent request claims the same subdomain first
+SUBDOMAIN_CLAIM_ATTEMPTS = 5
+# How each database names the subdomain's unique keys in a duplicate key error:
+# the case-insensitive index, then the column's own unique constraint
+# (SQLite and MySQL 8 'user_sites.subdomain', PostgreSQL 'user_sites_subdomain_key',
+# older MySQL "for key 'subdomain'")
+SUBDOMAIN_UNIQUE_KEYS = (
+    'ix_user_sites_subdomain_lower', 'user_sites.subdomain', 'user_sites_subdomain_key', "key 'subdomain'"
+)
+
+def _base_subdomain(username):
+    """A valid subdomain derived from the username, before any suffix."""
+    base = sanitize_username(username).strip('-')
+    if not is_valid_subdomain(base):
+        # Too short, reserved or empty
+        base = f"user-{base}".rstrip('-')
+    return base
+
+def generate_unique_subdomain(user_id, username, exclude=()):
+    """Pick a free subdomain for a user with a single query.
+
+    All taken subdomains starting with the base name are fetched at once
+    (a range on ix_user_sites_subdomain_lower); the first of base, base1 ...
+    base9 that is free wins, then a random suffix. The result is not
+    reserved until a row with it is committed; see claim_subdomain.
+    """
+    base = _base_subdomain(username)
+    lowered = db.func.lower(UserSite.subdomain)
+    taken = set(db.session.execute(
+        db.select(lowered).where(
+            # Subdomains only contain [a-z0-9-], all sorting below '~'
+            lowered >= base, lowered < base + '~', lowered.like(f"{base}%")
+        )
+    ).scalars())
+    taken.update(exclude)
+
+    for candidate in [base] + [f"{base}{i}" for i in range(1, SUBDOMAIN_NUMBERED_CANDIDATES + 1)]:
+        if candidate not in taken and is_valid_subdomain(candidate):
+            return candidate
+    while True:
         random_suffix = ''.join(random.choices(string.ascii_lowercase + string.digits, k=6))
-        subdomain = f"{base_subdomain}-{random_suffix}"
-    
-    return subdomain
+        candidate = f"{base}-{random_suffix}"
+        if candidate not in taken:
+            return candidate
+
+def claim_subdomain(user_id, username, claim):
+    """Allocate a subdomain and claim it with claim(subdomain), which adds the site row.
+
+    Each claim is flushed in a savepoint, so a subdomain taken by a
+    concurrent request since it was picked fails on the unique index alone
+    and the next candidate is tried. Returns the subdomain; the caller commits.
+    """
+    rejected = set()
+    for attempt in range(SUBDOMAIN_CLAIM_ATTEMPTS):
+        subdomain = generate_unique_subdomain(user_id, username, exclude=rejected)
+        try:
+            with db.session.begin_nested():
+                claim(subdomain)
+            return subdomain
+        except IntegrityError as e:
+            # Decided from the error: under REPEATABLE READ a SELECT in this
+            # transaction would not see the row that won the race
+            if not is_subdomain_conflict(e):
+                raise
+            rejected.add(subdomain)
+    raise Exception(f"Could not allocate a subdomain after {SUBDOMAIN_CLAIM_ATTEMPTS} attempts")
+
+def is_subdomain_conflict(error):
+    """Whether an IntegrityError was raised by one of the subdomain's unique keys."""
+    message = str(getattr(error, 'orig', error)).lower()
+    return any(key in message for key in SUBDOMAIN_UNIQUE_KEYS)
 
 def get_site_url(subdomain):
     """Get the full URL for a user's site."""
-    return f"https://{subdomain}.resume.mintmelon.ca"
+    return f"https://{subdomain}.{SITE_BASE_DOMAIN}"
 
 def is_valid_subdomain(subdomain):
     """Validate if a subdomain meets requirements."""
@@ -0,0 +1,128 @@
+import json
+import os
+from sqlalchemy import select
+from app.db_routing import recent_own_write
+from app.extensions import db
+from app.models.temp import User
+from app.utils.lru_cache import TTLCache
+
+try:
+    import redis
+except ImportError:  # The shared cache backend is optional
+    redis = None
+
+# Seconds a user record is served from this process without asking the database
+USER_CACHE_TTL = float(os.getenv('USER_CACHE_TTL', '60'))
+USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', '10000'))
+# Optional Redis shared by all workers, so an invalidation reaches every process
+USER_CACHE_REDIS_URL = os.getenv('USER_CACHE_REDIS_URL')
+USER_CACHE_SHARED_TTL = int(os.getenv('USER_CACHE_SHARED_TTL', '600'))
+
+# Columns kept in a cached user record. The password hash is deliberately left
+# out so it never sits in process memory or the shared Redis; login reads it
+# from the database.
+USER_FIELDS = ('id', 'email', 'username', 'first_name', 'last_name', 'city', 'country', 'bio', 'plan')
+
+
+class RedisBackend:
+    """Shared user record store in Redis."""
+
+    def __init__(self, url, ttl):
+        if redis is None:
+            raise Exception("USER_CACHE_REDIS_URL is set but the redis package is not installed")
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+
+    def get(self, key):
+        value = self.client.get(f"user_cache:{key}")
+        return json.loads(value) if value is not None else None
+
+    def set(self, key, value):
+        self.client.set(f"user_cache:{key}", json.dumps(value), ex=self.ttl)
+
+    def delete(self, *keys):
+        if keys:
+            self.client.delete(*(f"user_cache:{key}" for key in keys))
+
+
+_local = TTLCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL)
+_shared = RedisBackend(USER_CACHE_REDIS_URL, USER_CACHE_SHARED_TTL) if USER_CACHE_REDIS_URL else None
+
+
+def _cache_get(key):
+    value = _local.get(key)
+    if value is None and _shared is not None:
+        try:
+            value = _shared.get(key)
+        except Exception as e:
+            print(f"Shared user cache unavailable: {str(e)}")
+            return None
+        if value is not None:
+            _local.set(key, value)
+    return value
+
+
+def _cache_set(key, value):
+    _local.set(key, value)
+    if _shared is not None:
+        try:
+            _shared.set(key, value)
+        except Exception as e:
+            print(f"Shared user cache unavailable: {str(e)}")
+
+
+def _load(condition):
+    row = db.session.execute(
+        select(*(getattr(User, field) for field in USER_FIELDS)).where(condition)
+    ).first()
+    return dict(row._mapping) if row is not None else None
+
+
+def _store(record):
+    _cache_set(f"id:{record['id']}", record)
+    _cache_set(f"email:{record['email']}", record['id'])
+    return record
+
+
+def get_user(user_id):
+    """User record (a dict of USER_FIELDS) by id, or None if there is no such user.
+
+    Read-through: served from the cache unless the client wrote recently,
+    in which case it comes from the database like other read-your-writes reads.
+    """
+    if not recent_own_write():
+        record = _cache_get(f"id:{user_id}")
+        if record is not None:
+            return record
+    record = _load(User.id == user_id)
+    return _store(record) if record is not None else None
+
+
+def get_user_by_email(email):
+    """User record by email, or None if no user has that email."""
+    if not recent_own_write():
+        user_id = _cache_get(f"email:{email}")
+        if user_id is not None:
+            record = get_user(user_id)
+            # Guard against a mapping left behind by an email change elsewhere
+            if record is not None and record['email'] == email:
+                return record
+    record = _load(User.email == email)
+    return _store(record) if record is not None else None
+
+
+def invalidate_user(user_id, *emails):
+    """Drop a user's cached record and the email mappings pointing at it."""
+    keys = [f"id:{user_id}"] + [f"email:{email}" for email in emails if email]
+    for key in keys:
+        _local.delete(key)
+    if _shared is not None:
+        try:
+            _shared.delete(*keys)
+        except Exception as e:
+            print(f"Shared user cache unavailable: {str(e)}")
+
+
+def clear_user_cache():
+    """Empty this process's cache (the shared backend is left alone)."""
+    _local.clear()
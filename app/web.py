@@ -1,66 +1,36 @@
-from flask import Blueprint, request, jsonify, render_template_string, Response
+from flask import Blueprint, request, jsonify, current_app
 from app.extensions import db
 from app.utils.jwt_utils import token_required
+from app.db_routing import read_only
+from app.utils.rate_limiter import rate_limit
 from app.models.temp import Resume
 from app.models.temp import UserSite
-from app.utils.subdomain_utils import generate_unique_subdomain, get_site_url
+from app.utils.subdomain_utils import claim_subdomain, get_site_url
+from app.services.site_generator import registry, render_site, site_fingerprint
+from app.utils.sanitizer import sanitize
+from app.utils.site_cache import CachedSite, get_cached_site, cache_site, site_response
+from app.utils.site_store import get_site_store, publish_site
+from app.utils.site_router import SITE_ETAG_ENVIRON
 import html
-import bleach
-from functools import wraps
-import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+import os
 import re
 import traceback
 
-# Dictionary to store API request counts
-request_counter = {}
 RATE_LIMIT = 10  # Maximum requests per minute
 RATE_WINDOW = 60  # Time window in seconds
 
-def rate_limit(f):
-    """Rate limiting decorator for API endpoints."""
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        # Get user IP or ID for rate limiting
-        identifier = request.user.get('user_id', request.remote_addr)
-        
-        # Get current timestamp
-        now = time.time()
-        
-        # Initialize or get current request info
-        if identifier not in request_counter:
-            request_counter[identifier] = {'count': 0, 'reset_time': now + RATE_WINDOW}
-        
-        # Check if we need to reset the counter
-        if now > request_counter[identifier]['reset_time']:
-            request_counter[identifier] = {'count': 0, 'reset_time': now + RATE_WINDOW}
-        
-        # Check if rate limit exceeded
-        if request_counter[identifier]['count'] >= RATE_LIMIT:
-            return jsonify({
-                "error": "Rate limit exceeded. Try again later.",
-                "retry_after": int(request_counter[identifier]['reset_time'] - now)
-            }), 429
-        
-        # Increment request counter
-        request_counter[identifier]['count'] += 1
-        
-        return f(*args, **kwargs)
-    return decorated
+# Re-render a resume's site in the background when the resume is saved
+SITE_REGENERATE_ON_SAVE = os.getenv('SITE_REGENERATE_ON_SAVE', '0') == '1'
+_regeneration_executor = None
 
 web = Blueprint('web', __name__)
 
 def sanitize_input(data):
     """Sanitize user input to prevent injection attacks."""
-    if isinstance(data, dict):
-        return {k: sanitize_input(v) for k, v in data.items()}
-    elif isinstance(data, list):
-        return [sanitize_input(i) for i in data]
-    elif isinstance(data, str):
-        # Basic XSS protection - remove script tags and dangerous attributes
-        return bleach.clean(data, strip=True)
-    else:
-        return data
+    # Basic XSS protection - remove script tags and dangerous attributes
+    return sanitize(data)
 
 def validate_serial_number(serial):
     """Validate resume serial format."""
@@ -74,9 +44,66 @@ def validate_serial_number(serial):
     except ValueError:
         return False
 
+def _render_resume_site(site, resume, fingerprint):
+    """Render a resume into its site and record what it was rendered from; returns the HTML."""
+    # Sanitize the resume fields the theme renders to prevent XSS. In place is safe:
+    # the JSON column does not track mutations, so the row is never written back
+    sanitized_resume = sanitize(
+        resume.parsed_resume, fields=registry.rendered_fields(resume.template), in_place=True
+    )
+    
+    # Render with the resume's theme from the precompiled registry
+    rendered_html = render_site(sanitized_resume, resume.template)
+    site.set_html(rendered_html)
+    site.fingerprint = fingerprint
+    site.updated_at = datetime.utcnow()
+    return rendered_html
+
+def regenerate_changed_site(user_id, title):
+    """Re-render the site of a user's resume if the resume or its theme changed.
+
+    Returns True when the site was rewritten; resumes without a site are left alone.
+    """
+    resume = Resume.with_content().filter_by(user_id=user_id, title=title).first()
+    if not resume or not resume.parsed_resume:
+        return False
+    site = UserSite.query.filter_by(user_id=user_id, resume_serial=resume.serial_number).first()
+    if not site:
+        return False
+    
+    fingerprint = site_fingerprint(resume.parsed_resume, resume.template)
+    if site.fingerprint == fingerprint:
+        return False
+    _render_resume_site(site, resume, fingerprint)
+    db.session.commit()
+    publish_site(site.subdomain, site.etag)
+    return True
+
+def _regenerate_in_background(app, user_id, title):
+    with app.app_context():
+        try:
+            regenerate_changed_site(user_id, title)
+        except Exception as e:
+            db.session.rollback()
+            print(f"Background site regeneration failed: {str(e)}")
+        finally:
+            db.session.remove()
+
+def schedule_site_regeneration(user_id, title):
+    """Queue regenerate_changed_site after a save when SITE_REGENERATE_ON_SAVE is on.
+
+    Returns the Future, or None when background regeneration is off.
+    """
+    global _regeneration_executor
+    if not SITE_REGENERATE_ON_SAVE:
+        return None
+    if _regeneration_executor is None:
+        _regeneration_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='site-regeneration')
+    return _regeneration_executor.submit(_regenerate_in_background, current_app._get_current_object(), user_id, title)
+
 @web.route('/web/generate_personal_site/<serial_number>', methods=['GET'])
 @token_required
-@rate_limit
+@rate_limit(RATE_LIMIT, RATE_WINDOW)
 def generate_personal_site(serial_number):
     """Generate a personal website based on the user's resume.
     
@@ -99,7 +126,7 @@ def generate_personal_site(serial_number):
         serial_number_int = int(serial_number)
         
         # Fetch the user's resume using the serial_number
-        resume = Resume.query.filter_by(user_id=user_id, serial_number=serial_number_int).first()
+        resume = Resume.with_content().filter_by(user_id=user_id, serial_number=serial_number_int).first()
         
         if not resume:
             return jsonify({"error": "Resume not found"}), 404
@@ -110,256 +137,41 @@ def generate_personal_site(serial_number):
         if not parsed_resume:
             return jsonify({"error": "No parsed resume data available"}), 404
         
-        # Sanitize all resume data to prevent XSS
-        sanitized_resume = sanitize_input(parsed_resume)
-        
-        # Add current date to template context
-        sanitized_resume['generation_date'] = datetime.now().strftime("%B %d, %Y")
-        
-        # HTML template using Jinja2 syntax with updated field mappings
-        html_template = """
-        <!DOCTYPE html>
-        <html lang="en">
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>{{ userInfo.firstName }} {{ userInfo.lastName }}</title>
-            <style>
-                body {
-                    font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-                    line-height: 1.6;
-                    color: #333;
-                    max-width: 1200px;
-                    margin: 0 auto;
-                    padding: 20px;
-                    background-color: #f8f9fa;
-                }
-                header {
-                    background-color: #343a40;
-                    color: white;
-                    padding: 2rem;
-                    text-align: center;
-                    border-radius: 5px;
-                    margin-bottom: 2rem;
-                }
-                h1 {
-                    margin-bottom: 0.5rem;
-                    font-size: 2.5rem;
-                }
-                h3 {
-                    font-weight: normal;
-                    margin-top: 0.5rem;
-                    font-style: italic;
-                }
-                .contact-info {
-                    margin-top: 1rem;
-                    font-size: 1.1rem;
-                }
-                section {
-                    background-color: white;
-                    padding: 2rem;
-                    margin-bottom: 2rem;
-                    border-radius: 5px;
-                    box-shadow: 0 2px 5px rgba(0,0,0,0.1);
-                }
-                h2 {
-                    border-bottom: 2px solid #007bff;
-                    padding-bottom: 0.5rem;
-                    margin-bottom: 1.5rem;
-                    color: #007bff;
-                }
-                .experience-item, .education-item, .project-item, .skill-item {
-                    margin-bottom: 1.5rem;
-                }
-                .company-name, .school-name, .project-title {
-                    font-weight: bold;
-                    font-size: 1.2rem;
-                }
-                .job-title, .degree, .project-role {
-                    font-weight: bold;
-                    color: #343a40;
-                }
-                .date {
-                    color: #6c757d;
-                    font-style: italic;
-                }
-                .skill-list {
-                    display: flex;
-                    flex-direction: column;
-                    gap: 10px;
-                }
-                .skill-item {
-                    background-color: #e9ecef;
-                    padding: 10px 15px;
-                    border-radius: 5px;
-                    font-size: 1rem;
-                }
-                footer {
-                    text-align: center;
-                    padding: 1rem;
-                    color: #6c757d;
-                    font-size: 0.9rem;
-                }
-                @media (max-width: 768px) {
-                    body {
-                        padding: 10px;
-                    }
-                    header, section {
-                        padding: 1.5rem;
-                    }
-                }
-            </style>
-        </head>
-        <body>
-            <header>
-                <h1>{{ userInfo.firstName }} {{ userInfo.lastName }}</h1>
-                {% if userInfo.headLine %}<h3>{{ userInfo.headLine }}</h3>{% endif %}
-                <div class="contact-info">
-                    {% if userInfo.email %}{{ userInfo.email }}{% endif %}
-                    {% if userInfo.phoneNumber %} | {{ userInfo.phoneNumber }}{% endif %}
-                    {% if userInfo.websiteOrOtherProfileURL %} | <a href="{{ userInfo.websiteOrOtherProfileURL }}" style="color: white;">Portfolio</a>{% endif %}
-                    {% if userInfo.linkedInURL %} | <a href="{{ userInfo.linkedInURL }}" style="color: white;">LinkedIn</a>{% endif %}
-                </div>
-            </header>
-            
-            {% if summary %}
-            <section>
-                <h2>About Me</h2>
-                <p>{{ summary }}</p>
-            </section>
-            {% endif %}
-            
-            {% if workExperience and workExperience|length > 0 %}
-            <section>
-                <h2>Professional Experience</h2>
-                {% for job in workExperience %}
-                <div class="experience-item">
-                    <div class="company-name">{{ job.company }}</div>
-                    <div class="job-title">{{ job.title }}</div>
-                    <div class="date">
-                        {{ job.fromDate }} - {% if job.isPresent %}Present{% else %}{{ job.toDate }}{% endif %}
-                        {% if job.city or job.country %} | {{ job.city }}{% if job.city and job.country %}, {% endif %}{{ job.country }}{% endif %}
-                    </div>
-                    {% if job.description %}
-                    <p>{{ job.description }}</p>
-                    {% endif %}
-                </div>
-                {% endfor %}
-            </section>
-            {% endif %}
-            
-            {% if project and project|length > 0 %}
-            <section>
-                <h2>Projects</h2>
-                {% for proj in project %}
-                <div class="project-item">
-                    <div class="project-title">{{ proj.title }}</div>
-                    <div class="project-role">{{ proj.projectRole }}</div>
-                    <div class="date">
-                        {{ proj.fromDate }} - {% if proj.isPresent %}Present{% else %}{{ proj.toDate }}{% endif %}
-                    </div>
-                    {% if proj.description %}
-                    <p>{{ proj.description }}</p>
-                    {% endif %}
-                </div>
-                {% endfor %}
-            </section>
-            {% endif %}
-            
-            {% if education and education|length > 0 %}
-            <section>
-                <h2>Education</h2>
-                {% for edu in education %}
-                <div class="education-item">
-                    <div class="school-name">{{ edu.institutionName }}</div>
-                    <div class="degree">{{ edu.degree }} {% if edu.fieldOfStudy %}in {{ edu.fieldOfStudy }}{% endif %}</div>
-                    <div class="date">
-                        {% if edu.fromDate %}{{ edu.fromDate }} - {% endif %}
-                        {% if edu.isPresent %}Present{% else %}{{ edu.toDate }}{% endif %}
-                        {% if edu.city or edu.country %} | {{ edu.city }}{% if edu.city and edu.country %}, {% endif %}{{ edu.country }}{% endif %}
-                    </div>
-                    {% if edu.description %}
-                    <p>{{ edu.description }}</p>
-                    {% endif %}
-                </div>
-                {% endfor %}
-            </section>
-            {% endif %}
-            
-            {% if skills and skills|length > 0 %}
-            <section>
-                <h2>Skills</h2>
-                <div class="skill-list">
-                    {% for skill in skills %}
-                    <div class="skill-item">{{ skill }}</div>
-                    {% endfor %}
-                </div>
-            </section>
-            {% endif %}
-            
-            {% if certifications and certifications|length > 0 %}
-            <section>
-                <h2>Certifications</h2>
-                <ul>
-                    {% for cert in certifications %}
-                    <li>{{ cert.name }} {% if cert.issuer %}({{ cert.issuer }}){% endif %}</li>
-                    {% endfor %}
-                </ul>
-            </section>
-            {% endif %}
-            
-            <footer>
-                <p>Generated on {{ generation_date }}</p>
-            </footer>
-        </body>
-        </html>
-        """
-        
-        # Add current date to template context
-        sanitized_resume['generation_date'] = datetime.now().strftime("%B %d, %Y")
-
-        
-        
-        # Render the template using render_template_string
-        rendered_html = render_template_string(html_template, **sanitized_resume)
-        
-        # Return the HTML directly to be rendered in the browser
-        # return Response(rendered_html, mimetype='text/html')
-        # test
-        # return jsonify({
-        #     "status": 200,
-        #     "html": rendered_html,
-        # }), 200
-        
-        
-        
-
-        # Generate a unique subdomain based on user's name
-        username = f"{sanitized_resume.get('userInfo', {}).get('firstName', '')} {sanitized_resume.get('userInfo', {}).get('lastName', '')}"
-        if not username.strip():
-            username = f"user{user_id}"
-        
         # Check if a site already exists for this user and resume
         existing_site = UserSite.query.filter_by(user_id=user_id, resume_serial=serial_number_int).first()
         
-        if existing_site:
+        # Nothing changed since the last generation: hand back the stored page
+        fingerprint = site_fingerprint(parsed_resume, resume.template)
+        rendered_html = None
+        if existing_site and existing_site.fingerprint == fingerprint:
+            rendered_html = existing_site.get_html()
+        
+        if rendered_html is not None:
+            subdomain = existing_site.subdomain
+        elif existing_site:
             # Update existing site
-            existing_site.html_content = rendered_html
-            existing_site.updated_at = datetime.utcnow()
+            rendered_html = _render_resume_site(existing_site, resume, fingerprint)
             subdomain = existing_site.subdomain
+            db.session.commit()
+            publish_site(subdomain, existing_site.etag)
         else:
-            # Create new subdomain and site
-            subdomain = generate_unique_subdomain(user_id, username)
-            new_site = UserSite(
-                user_id=user_id,
-                resume_serial=serial_number_int,
-                subdomain=subdomain,
-                html_content=rendered_html
-            )
-            db.session.add(new_site)
-        
-        # Commit changes to database
-        db.session.commit()
+            # Generate a unique subdomain based on user's name
+            user_info = sanitize_input(parsed_resume.get('userInfo') or {})
+            username = f"{user_info.get('firstName', '')} {user_info.get('lastName', '')}"
+            if not username.strip():
+                username = f"user{user_id}"
+            
+            # Create the site, then claim a unique subdomain for it
+            site = UserSite(user_id=user_id, resume_serial=serial_number_int)
+            rendered_html = _render_resume_site(site, resume, fingerprint)
+            
+            def claim(candidate):
+                site.subdomain = candidate
+                db.session.add(site)
+            
+            subdomain = claim_subdomain(user_id, username, claim)
+            db.session.commit()
+            publish_site(subdomain, site.etag)
         
         # Generate the full URL
         site_url = get_site_url(subdomain)
@@ -384,6 +196,7 @@ def generate_personal_site(serial_number):
         }), 500
 
 @web.route('/web/serve_site/<subdomain>', methods=['GET'])
+@read_only
 def serve_site(subdomain):
     """Serve a user's website by subdomain.
     
@@ -394,14 +207,38 @@ def serve_site(subdomain):
         if not re.match(r'^[a-zA-Z0-9-]+$', subdomain):
             return jsonify({"error": "Invalid subdomain format"}), 400
             
-        # Fetch the user's site
-        site = UserSite.query.filter_by(subdomain=subdomain.lower()).first()
-        
-        if not site:
-            return jsonify({"error": "Site not found"}), 404
+        # Published pages come straight from the site store, hot database-backed
+        # pages from memory; neither touches the database
+        store = get_site_store()
+        # Page hash from the subdomain map when the request came in on the site's host
+        mapped_etag = request.environ.get(SITE_ETAG_ENVIRON)
+        entry = None
+        if store is not None:
+            entry = store.lookup(subdomain) or (store.site(mapped_etag) if mapped_etag else None)
+        if entry is None:
+            entry = get_cached_site(subdomain)
+            if entry is not None and mapped_etag and entry.etag != mapped_etag:
+                # Regenerated by another process since it was cached here
+                entry = None
+        if entry is None:
+            site = UserSite.with_content().filter(UserSite.matches_subdomain(subdomain)).first()
+            
+            if not site:
+                return jsonify({"error": "Site not found"}), 404
+            
+            if store is not None and site.etag and store.site(site.etag) is not None:
+                # Committed but never published here, e.g. the process died in between
+                store.publish(site.subdomain, site.etag)
+                entry = store.site(site.etag)
+            elif site.html_content is not None:
+                # Database-backed, or the store on this host does not have the page
+                entry = cache_site(subdomain, CachedSite.from_row(site))
+            else:
+                print(f"Page {site.etag} for site {site.subdomain} is missing from the site store")
+                return jsonify({"error": "Site not found"}), 404
             
-        # Return the HTML content
-        return Response(site.html_content, mimetype='text/html')
+        # ETag / 304 and the precompressed body the client accepts
+        return site_response(entry)
         
     except Exception as e:
         # Log the error for debugging
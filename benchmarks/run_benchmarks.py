@@ -0,0 +1,215 @@
+"""Benchmarks for the PDF-to-structured-resume pipeline.
+
+Times PDF extraction, the end-to-end parse (with a stubbed LLM) and the
+/api/pdfupload view on synthetic resumes, and writes the results as JSON so
+runs can be compared across commits.
+
+Usage:
+    python -m benchmarks.run_benchmarks --output bench.json
+    python -m benchmarks.run_benchmarks --baseline bench.json
+"""
+import argparse
+import datetime
+import io
+import json
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from unittest import mock
+
+from flask import Flask
+
+from app.response_template.resume_schema import RESUME_TEMPLATE
+from app.services.resume_ai import ResumeAI
+from app.utils.parse_pdf import parse_pdf_file, parse_pdf_sections
+from benchmarks.pdf_generator import FONT_FAMILIES, generate_resume_pdf
+
+DEFAULT_PAGES = [1, 2, 5]
+DEFAULT_NOISE = [0.0, 0.5]
+
+
+class _StubMessage:
+    def __init__(self, content):
+        self.content = content
+
+
+class _StubChoice:
+    def __init__(self, content):
+        self.message = _StubMessage(content)
+
+
+class _StubResponse:
+    def __init__(self, content):
+        self.choices = [_StubChoice(content)]
+
+
+class StubOpenAI:
+    """Stand-in for the OpenAI client that answers instantly with a filled template."""
+
+    def __init__(self, *args, **kwargs):
+        self.chat = self
+        self.completions = self
+        self._content = "```json\n" + json.dumps(RESUME_TEMPLATE) + "\n```"
+
+    def create(self, **kwargs):
+        return _StubResponse(self._content)
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of samples."""
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB."""
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and kilobytes elsewhere
+    return usage / (1024 * 1024) if sys.platform == 'darwin' else usage / 1024
+
+
+def summarize(samples, pages):
+    """Latency percentiles (ms) and throughput for a list of timings in seconds."""
+    total = sum(samples)
+    return {
+        "iterations": len(samples),
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 95) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3),
+        "mean_ms": round(statistics.mean(samples) * 1000, 3),
+        "pages_per_sec": round(pages * len(samples) / total, 2) if total else None,
+    }
+
+
+def time_calls(func, iterations, warmup=2):
+    """Run func repeatedly and return the wall-clock duration of each call."""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def make_upload_client():
+    """Flask test client with only the API blueprint registered."""
+    from app.server import api
+
+    app = Flask(__name__)
+    app.config['TESTING'] = True
+    app.register_blueprint(api)
+    return app.test_client()
+
+
+def bench_document(pdf_bytes, pages, iterations, client):
+    """Benchmark every pipeline stage for one synthetic document."""
+    def extract():
+        parse_pdf_file(io.BytesIO(pdf_bytes))
+
+    def segment():
+        parse_pdf_sections(io.BytesIO(pdf_bytes))
+
+    def end_to_end():
+        extracted_text, sections = parse_pdf_sections(io.BytesIO(pdf_bytes))
+        ResumeAI(extracted_text, sections).parse()
+
+    def upload_view():
+        response = client.post(
+            '/api/pdfupload',
+            data={'file': (io.BytesIO(pdf_bytes), 'resume.pdf')},
+            content_type='multipart/form-data'
+        )
+        if response.status_code != 200:
+            raise RuntimeError(f"Upload failed: {response.get_json()}")
+
+    return {
+        "parse_pdf_file": summarize(time_calls(extract, iterations), pages),
+        "parse_pdf_sections": summarize(time_calls(segment, iterations), pages),
+        "end_to_end_parse": summarize(time_calls(end_to_end, iterations), pages),
+        "pdfupload_view": summarize(time_calls(upload_view, iterations), pages),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+def run(pages_list, fonts, noise_levels, iterations):
+    """Run the full matrix of synthetic documents and return the JSON report."""
+    cases = []
+    with mock.patch('app.services.resume_ai.OpenAI', StubOpenAI):
+        client = make_upload_client()
+        for pages in pages_list:
+            for font in fonts:
+                for noise in noise_levels:
+                    pdf_bytes = generate_resume_pdf(pages=pages, font=font, noise=noise)
+                    cases.append({
+                        "name": f"{pages}p-{font}-noise{noise}",
+                        "pages": pages,
+                        "font": font,
+                        "noise": noise,
+                        "size_bytes": len(pdf_bytes),
+                        "results": bench_document(pdf_bytes, pages, iterations, client),
+                    })
+
+    return {
+        "commit": git_revision(),
+        "timestamp": datetime.datetime.now(datetime.UTC).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "iterations": iterations,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "cases": cases,
+    }
+
+
+def compare(report, baseline):
+    """Print the p50 change of every case/stage against a previous report."""
+    previous = {case["name"]: case["results"] for case in baseline.get("cases", [])}
+    print(f"Comparing {report['commit']} against {baseline.get('commit')}")
+    for case in report["cases"]:
+        for stage, result in case["results"].items():
+            before = previous.get(case["name"], {}).get(stage)
+            if not before:
+                continue
+            change = (result["p50_ms"] - before["p50_ms"]) / before["p50_ms"] * 100
+            print(f"  {case['name']:<28} {stage:<20} "
+                  f"{before['p50_ms']:>9.2f}ms -> {result['p50_ms']:>9.2f}ms ({change:+.1f}%)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--pages', type=int, nargs='+', default=DEFAULT_PAGES)
+    parser.add_argument('--fonts', nargs='+', choices=sorted(FONT_FAMILIES), default=['helvetica'])
+    parser.add_argument('--noise', type=float, nargs='+', default=DEFAULT_NOISE)
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--output', help="Write the JSON report to this file")
+    parser.add_argument('--baseline', help="JSON report of a previous run to compare against")
+    args = parser.parse_args(argv)
+
+    report = run(args.pages, args.fonts, args.noise, args.iterations)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(report, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
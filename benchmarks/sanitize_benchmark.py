@@ -0,0 +1,115 @@
+"""Microbenchmark of resume sanitization for site generation.
+
+Compares the previous sanitize_input (bleach.clean on every string of a full
+copy) against app.utils.sanitizer on synthetic resumes: plain copy, rendered
+fields only, and in place, each with a cold and a warm memo cache.
+
+Usage:
+    python -m benchmarks.sanitize_benchmark --entries 5 20 --iterations 200
+"""
+import argparse
+import copy
+import json
+import random
+
+import bleach
+
+from app.services.site_generator import registry
+from app.utils import sanitizer
+from benchmarks.pdf_generator import BULLETS, COMPANIES, FIRST_NAMES, LAST_NAMES, SCHOOLS, SKILLS, TITLES
+from benchmarks.run_benchmarks import summarize, time_calls
+
+
+def legacy_sanitize(data):
+    """sanitize_input as it was before app.utils.sanitizer."""
+    if isinstance(data, dict):
+        return {k: legacy_sanitize(v) for k, v in data.items()}
+    elif isinstance(data, list):
+        return [legacy_sanitize(i) for i in data]
+    elif isinstance(data, str):
+        return bleach.clean(data, strip=True)
+    else:
+        return data
+
+
+def make_resume(entries, seed=0):
+    """Parsed resume with `entries` jobs, projects and schools, a few fields carrying markup."""
+    rng = random.Random(seed)
+
+    def dates():
+        return {"fromDate": f"20{rng.randint(10, 19)}-0{rng.randint(1, 9)}",
+                "toDate": f"202{rng.randint(0, 4)}-1{rng.randint(0, 2)}",
+                "isPresent": rng.random() < 0.2}
+
+    return {
+        "userInfo": {
+            "firstName": rng.choice(FIRST_NAMES), "lastName": rng.choice(LAST_NAMES),
+            "headLine": "Engineer & <b>builder</b>", "email": "someone@example.com",
+            "phoneNumber": "555-0100", "linkedInURL": "", "websiteOrOtherProfileURL": "",
+            "city": "Springfield", "country": "USA"
+        },
+        "summary": " ".join(rng.sample(BULLETS, 3)),
+        "workExperience": [dict(dates(), company=rng.choice(COMPANIES), title=rng.choice(TITLES),
+                                city="Springfield", country="USA", description=" ".join(rng.sample(BULLETS, 2)))
+                           for _ in range(entries)],
+        "project": [dict(dates(), title=f"Project {i}", projectRole="Lead",
+                         description=f"Rewrote the <i>billing</i> service, part {i}")
+                    for i in range(entries)],
+        "education": [dict(dates(), institutionName=rng.choice(SCHOOLS), degree="BSc",
+                           fieldOfStudy="Computer Science", city="", country="", description="")
+                      for _ in range(entries)],
+        "skills": rng.sample(SKILLS, 8),
+        "certifications": [{"name": "AWS Certified", "issuer": "Amazon"}],
+        # Present in parsed resumes but never rendered by the themes
+        "extractedSections": {"raw": [" ".join(BULLETS)] * entries},
+    }
+
+
+def run(entries_list, iterations):
+    fields = registry.rendered_fields(1)
+    cases = []
+    for entries in entries_list:
+        resume = make_resume(entries)
+        copies = [copy.deepcopy(resume) for _ in range(iterations + 2)]
+
+        def in_place():
+            sanitizer.sanitize(copies.pop(), fields=fields, in_place=True)
+
+        def cold(func):
+            def run_cold():
+                sanitizer._bleach_clean.cache_clear()
+                func()
+            return run_cold
+
+        results = {
+            "legacy": summarize(time_calls(lambda: legacy_sanitize(resume), iterations), 1),
+            "copy_cold": summarize(time_calls(cold(lambda: sanitizer.sanitize(resume)), iterations), 1),
+            "copy_warm": summarize(time_calls(lambda: sanitizer.sanitize(resume), iterations), 1),
+            "rendered_fields_warm": summarize(time_calls(lambda: sanitizer.sanitize(resume, fields=fields), iterations), 1),
+            "in_place_warm": summarize(time_calls(in_place, iterations), 1),
+        }
+        cases.append({"name": f"{entries}_entries", "results": results})
+    return {"iterations": iterations, "cases": cases}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--entries', type=int, nargs='+', default=[5, 20])
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--output', help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    report = run(args.entries, args.iterations)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    for case in report["cases"]:
+        legacy = case["results"]["legacy"]["p50_ms"]
+        for name, result in case["results"].items():
+            print(f"  {case['name']:<12} {name:<22} {result['p50_ms']:>9.3f}ms "
+                  f"({legacy / result['p50_ms']:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
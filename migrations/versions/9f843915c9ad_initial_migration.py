@@ -1,4 +1,4 @@
-"""Initial migration
+"""Use composite key for resumes
 
 Revision ID: 9f843915c9ad
 Revises: d7c7301cd2d8
@@ -0,0 +1,26 @@
+"""user plan
+
+Revision ID: b4e7a2c8d5f1
+Revises: a8d3f6b1c9e2
+Create Date: 2026-10-19 15:21:48.372019
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4e7a2c8d5f1'
+down_revision = 'a8d3f6b1c9e2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('plan', sa.String(length=20), nullable=False, server_default='free'))
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('plan')
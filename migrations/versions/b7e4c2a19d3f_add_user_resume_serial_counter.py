@@ -0,0 +1,32 @@
+"""add per-user resume serial counter
+
+Revision ID: b7e4c2a19d3f
+Revises: a1b2c3d4e5f6
+Create Date: 2026-10-19 09:12:41.208113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e4c2a19d3f'
+down_revision = 'a1b2c3d4e5f6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('last_resume_serial', sa.Integer(), nullable=False, server_default='0'))
+
+    # Start each counter after the highest serial already in use
+    op.execute(
+        "UPDATE users SET last_resume_serial = COALESCE("
+        "(SELECT MAX(resumes.serial_number) FROM resumes WHERE resumes.user_id = users.id), 0)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('last_resume_serial')
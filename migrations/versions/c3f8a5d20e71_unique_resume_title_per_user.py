@@ -0,0 +1,57 @@
+"""unique resume title per user
+
+Revision ID: c3f8a5d20e71
+Revises: b7e4c2a19d3f
+Create Date: 2026-10-19 10:03:18.554902
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3f8a5d20e71'
+down_revision = 'b7e4c2a19d3f'
+branch_labels = None
+depends_on = None
+
+
+def _rename_duplicate_titles():
+    # The old check-then-insert save could create two resumes with one title; the
+    # oldest keeps it and later ones get their serial number appended
+    resumes = sa.table('resumes', sa.column('user_id'), sa.column('serial_number'), sa.column('title'))
+    connection = op.get_bind()
+    rows = connection.execute(
+        sa.select(resumes.c.user_id, resumes.c.serial_number, resumes.c.title)
+        .order_by(resumes.c.user_id, resumes.c.serial_number)
+    ).all()
+    taken = {(row.user_id, row.title) for row in rows}
+    seen = set()
+    for user_id, serial_number, title in rows:
+        if (user_id, title) not in seen:
+            seen.add((user_id, title))
+            continue
+        suffix = f" ({serial_number})"
+        new_title = title[:100 - len(suffix)] + suffix
+        while (user_id, new_title) in taken:
+            suffix = f" ({serial_number}){suffix}"
+            new_title = title[:100 - len(suffix)] + suffix
+        taken.add((user_id, new_title))
+        seen.add((user_id, new_title))
+        connection.execute(
+            resumes.update()
+            .where(resumes.c.user_id == user_id, resumes.c.serial_number == serial_number)
+            .values(title=new_title)
+        )
+
+
+def upgrade():
+    # save_resume upserts on (user_id, title); the conflict target must be a unique index
+    _rename_duplicate_titles()
+    with op.batch_alter_table('resumes', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_resumes_user_title', ['user_id', 'title'])
+
+
+def downgrade():
+    with op.batch_alter_table('resumes', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_resumes_user_title', type_='unique')
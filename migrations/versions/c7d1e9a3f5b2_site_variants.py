@@ -0,0 +1,43 @@
+"""site etag and precompressed variants
+
+Revision ID: c7d1e9a3f5b2
+Revises: b4e7a2c8d5f1
+Create Date: 2026-10-19 16:05:37.218864
+
+Existing sites get their ETag and variants computed when first served, or
+stored on their next regeneration.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7d1e9a3f5b2'
+down_revision = 'b4e7a2c8d5f1'
+branch_labels = None
+depends_on = None
+
+
+def _binary_type():
+    return sa.LargeBinary().with_variant(mysql.LONGBLOB(), 'mysql', 'mariadb')
+
+
+def upgrade():
+    with op.batch_alter_table('user_sites', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('etag', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('html_gzip', _binary_type(), nullable=True))
+        batch_op.add_column(sa.Column('html_brotli', _binary_type(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('user_sites', schema=None) as batch_op:
+        batch_op.drop_column('html_brotli')
+        batch_op.drop_column('html_gzip')
+        batch_op.drop_column('etag')
+
+    # SQLite batch mode rebuilds the table without indexes it cannot reflect
+    if op.get_bind().dialect.name == 'sqlite':
+        op.create_index('ix_user_sites_subdomain_lower', 'user_sites',
+                        [sa.func.lower(sa.column('subdomain'))], unique=True, if_not_exists=True)
@@ -1,7 +1,7 @@
 """create user sites table
 
 Revision ID: a1b2c3d4e5f6
-Revises: previous_revision_id
+Revises: 9f843915c9ad
 Create Date: 2023-10-10 12:34:56.789012
 
 """
@@ -10,7 +10,7 @@ import sqlalchemy as sa
 
 # revision identifiers
 revision = 'a1b2c3d4e5f6'
-down_revision = '9f843915c9ad'  # replace with actual previous revision
+down_revision = '9f843915c9ad'
 branch_labels = None
 depends_on = None
 
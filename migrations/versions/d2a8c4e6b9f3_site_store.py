@@ -0,0 +1,55 @@
+"""site html may live in the site store
+
+Revision ID: d2a8c4e6b9f3
+Revises: c7d1e9a3f5b2
+Create Date: 2026-10-19 16:48:12.604391
+
+Existing pages stay in user_sites.html_content and keep being served from
+there until their next regeneration writes them to the site store.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2a8c4e6b9f3'
+down_revision = 'c7d1e9a3f5b2'
+branch_labels = None
+depends_on = None
+
+
+def _binary_type(bind):
+    if bind.dialect.name in ('mysql', 'mariadb'):
+        return mysql.LONGBLOB()
+    return sa.LargeBinary()
+
+
+def _restore_expression_indexes(bind):
+    # SQLite batch mode rebuilds the table without indexes it cannot reflect
+    if bind.dialect.name == 'sqlite':
+        op.create_index('ix_user_sites_subdomain_lower', 'user_sites',
+                        [sa.func.lower(sa.column('subdomain'))], unique=True, if_not_exists=True)
+
+
+def upgrade():
+    bind = op.get_bind()
+    with op.batch_alter_table('user_sites', schema=None) as batch_op:
+        batch_op.alter_column('html_content', existing_type=_binary_type(bind), nullable=True)
+    _restore_expression_indexes(bind)
+
+
+def downgrade():
+    bind = op.get_bind()
+    stored_elsewhere = bind.execute(
+        sa.text("SELECT COUNT(*) FROM user_sites WHERE html_content IS NULL")
+    ).scalar()
+    if stored_elsewhere:
+        raise Exception(
+            f"{stored_elsewhere} sites keep their page only in the site store; run "
+            "'flask storage restore-sites' (and regenerate or delete any it reports missing) first"
+        )
+    with op.batch_alter_table('user_sites', schema=None) as batch_op:
+        batch_op.alter_column('html_content', existing_type=_binary_type(bind), nullable=False)
+    _restore_expression_indexes(bind)
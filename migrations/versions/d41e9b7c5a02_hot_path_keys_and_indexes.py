@@ -0,0 +1,76 @@
+"""hot path keys and indexes
+
+Revision ID: d41e9b7c5a02
+Revises: c3f8a5d20e71
+Create Date: 2026-10-19 11:26:07.931540
+
+Brings databases created either by this migration chain or by db.create_all()
+to the same keys and indexes:
+- composite primary keys on resumes and job_descriptions, which the earlier
+  revisions dropped the surrogate id for but never created
+- ix_resumes_user_created for keyset pagination of the resume list
+- a unique index on lower(subdomain) for case-insensitive site lookups
+Existing constraints and indexes are detected and left alone.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd41e9b7c5a02'
+down_revision = 'c3f8a5d20e71'
+branch_labels = None
+depends_on = None
+
+
+def _has_primary_key(inspector, table):
+    return bool(inspector.get_pk_constraint(table).get('constrained_columns'))
+
+
+def _index_names(bind, inspector, table):
+    if bind.dialect.name == 'sqlite':
+        # SQLite's inspector skips expression-based indexes
+        return set(bind.execute(
+            sa.text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :table"),
+            {'table': table}
+        ).scalars())
+    return {index['name'] for index in inspector.get_indexes(table)}
+
+
+def _supports_functional_indexes(bind):
+    return not (bind.dialect.name == 'mysql' and getattr(bind.dialect, 'is_mariadb', False))
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    for table, name in (('resumes', 'pk_resumes'), ('job_descriptions', 'pk_job_descriptions')):
+        if not _has_primary_key(inspector, table):
+            with op.batch_alter_table(table, schema=None) as batch_op:
+                batch_op.create_primary_key(name, ['user_id', 'serial_number'])
+
+    if 'ix_resumes_user_created' not in _index_names(bind, inspector, 'resumes'):
+        op.create_index(
+            'ix_resumes_user_created', 'resumes', ['user_id', 'created_at', 'serial_number']
+        )
+
+    if ('ix_user_sites_subdomain_lower' not in _index_names(bind, inspector, 'user_sites')
+            and _supports_functional_indexes(bind)):
+        # An expression rather than text() so MySQL gets the doubled parentheses
+        # its functional key parts require: ((lower(subdomain)))
+        op.create_index(
+            'ix_user_sites_subdomain_lower', 'user_sites', [sa.func.lower(sa.column('subdomain'))], unique=True
+        )
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    if 'ix_user_sites_subdomain_lower' in _index_names(bind, inspector, 'user_sites'):
+        op.drop_index('ix_user_sites_subdomain_lower', table_name='user_sites')
+    if 'ix_resumes_user_created' in _index_names(bind, inspector, 'resumes'):
+        op.drop_index('ix_resumes_user_created', table_name='resumes')
+    # The composite primary keys match the models and are kept
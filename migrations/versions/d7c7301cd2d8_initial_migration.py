@@ -1,4 +1,4 @@
-"""Initial migration
+"""Use composite key for job descriptions
 
 Revision ID: d7c7301cd2d8
 Revises: 02dfd41ec2cd
@@ -0,0 +1,39 @@
+"""resume version history
+
+Revision ID: e5a9c1f7b2d4
+Revises: d41e9b7c5a02
+Create Date: 2026-10-19 12:14:40.218733
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a9c1f7b2d4'
+down_revision = 'd41e9b7c5a02'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('resumes', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), nullable=False, server_default='0'))
+
+    # Existing resumes keep version 0; their content becomes version 1 on the next save
+    op.create_table('resume_versions',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('resume_serial', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('is_snapshot', sa.Boolean(), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id', 'resume_serial'], ['resumes.user_id', 'resumes.serial_number'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'resume_serial', 'version')
+    )
+
+
+def downgrade():
+    op.drop_table('resume_versions')
+    with op.batch_alter_table('resumes', schema=None) as batch_op:
+        batch_op.drop_column('version')
@@ -0,0 +1,31 @@
+"""site fingerprint
+
+Revision ID: e8b3f1a7c4d6
+Revises: d2a8c4e6b9f3
+Create Date: 2026-10-19 17:26:40.115832
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8b3f1a7c4d6'
+down_revision = 'd2a8c4e6b9f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user_sites', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('fingerprint', sa.String(length=64), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('user_sites', schema=None) as batch_op:
+        batch_op.drop_column('fingerprint')
+
+    # SQLite batch mode rebuilds the table without indexes it cannot reflect
+    if op.get_bind().dialect.name == 'sqlite':
+        op.create_index('ix_user_sites_subdomain_lower', 'user_sites',
+                        [sa.func.lower(sa.column('subdomain'))], unique=True, if_not_exists=True)
@@ -0,0 +1,65 @@
+"""compressed resume and site storage
+
+Revision ID: f2b6d8e4a1c3
+Revises: e5a9c1f7b2d4
+Create Date: 2026-10-19 13:02:51.640127
+
+Existing values are kept as plain UTF-8 text, which the compressed column
+types read transparently. Run `flask storage compress` afterwards to
+compress them in the background.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2b6d8e4a1c3'
+down_revision = 'e5a9c1f7b2d4'
+branch_labels = None
+depends_on = None
+
+COLUMNS = (('resumes', 'parsed_resume', sa.JSON()), ('user_sites', 'html_content', sa.Text()))
+
+
+def _binary_type(bind):
+    if bind.dialect.name in ('mysql', 'mariadb'):
+        return mysql.LONGBLOB()
+    return sa.LargeBinary()
+
+
+def _restore_expression_indexes(bind):
+    # SQLite batch mode rebuilds the table without indexes it cannot reflect
+    if bind.dialect.name == 'sqlite':
+        op.create_index('ix_user_sites_subdomain_lower', 'user_sites',
+                        [sa.func.lower(sa.column('subdomain'))], unique=True, if_not_exists=True)
+
+
+def upgrade():
+    bind = op.get_bind()
+    for table, column, old_type in COLUMNS:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column(
+                column,
+                existing_type=old_type,
+                type_=_binary_type(bind),
+                existing_nullable=False,
+                postgresql_using=f"convert_to({column}::text, 'UTF8')"
+            )
+    _restore_expression_indexes(bind)
+
+
+def downgrade():
+    # Compressed rows must be decompressed first; only plain text converts back
+    bind = op.get_bind()
+    for table, column, old_type in COLUMNS:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column(
+                column,
+                existing_type=_binary_type(bind),
+                type_=old_type,
+                existing_nullable=False,
+                postgresql_using=f"convert_from({column}, 'UTF8')::{'json' if isinstance(old_type, sa.JSON) else 'text'}"
+            )
+    _restore_expression_indexes(bind)
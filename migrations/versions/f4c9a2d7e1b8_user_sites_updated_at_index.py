@@ -0,0 +1,26 @@
+"""index user_sites.updated_at
+
+Revision ID: f4c9a2d7e1b8
+Revises: e8b3f1a7c4d6
+Create Date: 2026-10-19 18:10:05.482917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4c9a2d7e1b8'
+down_revision = 'e8b3f1a7c4d6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user_sites', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_user_sites_updated_at'), ['updated_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('user_sites', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_user_sites_updated_at'))
@@ -1,6 +1,8 @@
 from app import create_app
+from app.utils.site_router import warm_site_routing
 
 app = create_app()
+warm_site_routing(app)
 
 if __name__ == '__main__':
     app.run(debug=True) 